@@ -1,36 +1,156 @@
-def distance(s, t):
+# Characters per machine word: a shorter string up to this length always takes the bit-parallel path
+WORD_SIZE = 64
+
+
+def distance(s, t, max_dist=None):
     """
     Compute the Levenshtein distance between two strings s and t.
-    
+
+    Memory is linear in the shorter string, and with a limit the computation stops as soon as the
+    distance is known to exceed it. A shorter string of up to WORD_SIZE characters fits one machine
+    word and is compared with bit vectors (Myers' algorithm); so are longer strings, on Python's
+    multi-word integers, unless a small limit leaves a band of at most WORD_SIZE cells around the
+    diagonal, which two rolling rows compute cheaper (Ukkonen).
+
     Parameters:
     s (str): The first string.
     t (str): The second string.
-    
+    max_dist (int, optional): Only distances up to max_dist are of interest. Defaults to None (no limit).
+
     Returns:
-    int: The Levenshtein distance between s and t.
+    int: The Levenshtein distance between s and t, or max_dist + 1 if it is greater than max_dist.
     """
+    if s == t:
+        return 0
+    if max_dist is not None and max_dist < 0:
+        return max_dist + 1
+
+    # Keep t the shorter string, the rows and bit vectors are as long as t
+    if len(s) < len(t):
+        s, t = t, s
+
+    # A common prefix and suffix do not change the distance
+    start = 0
+    end = min(len(s), len(t))
+    while start < end and s[start] == t[start]:
+        start += 1
+    while end > start and s[end - 1 + len(s) - len(t)] == t[end - 1]:
+        end -= 1
+    s = s[start:end + len(s) - len(t)]
+    t = t[start:end]
+
     m, n = len(s), len(t)
-    
-    # Create a matrix (m+1) x (n+1)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    # Initialize the first row and column
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-    
-    # Fill the matrix
+    limit = m if max_dist is None else max_dist
+
+    # At least one insertion per extra character
+    if m - n > limit:
+        return limit + 1
+    if n == 0:
+        return m
+
+    if n <= WORD_SIZE or 2 * limit + 1 > WORD_SIZE:
+        dist = _bit_parallel(t, s, limit)
+    else:
+        dist = _banded(s, t, limit)
+    return min(dist, limit + 1)
+
+
+def _bit_parallel(pattern, text, limit):
+    """
+    Compute the distance of a pattern and a text with bit vectors (Myers / Hyyrö).
+
+    Bit i of the vectors holds the vertical difference D[i + 1][j] - D[i][j] of the current column j,
+    split into the +1 (pv) and -1 (mv) bits; the score follows the last row.
+
+    Parameters:
+    pattern (str): The shorter string, not empty; one bit per character.
+    text (str): The longer string.
+    limit (int): Stop once the distance is known to be greater.
+
+    Returns:
+    int: The distance, or a value greater than limit.
+    """
+    m = len(pattern)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    # Positions of every character in the pattern
+    peq = {}
+    for i, c in enumerate(pattern):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    pv = mask
+    mv = 0
+    score = m
+    remaining = len(text)
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+
+        # Each remaining column lowers the score by at most one
+        remaining -= 1
+        if score - remaining > limit:
+            return limit + 1
+
+        # Row 0 grows by one per column
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+
+    return score
+
+
+def _banded(s, t, limit):
+    """
+    Compute the distance of s and the shorter string t with two rolling rows, only within limit of the diagonal.
+
+    Parameters:
+    s (str): The longer string.
+    t (str): The shorter string.
+    limit (int): Stop once the distance is known to be greater.
+
+    Returns:
+    int: The distance, or a value greater than limit.
+    """
+    m, n = len(s), len(t)
+    outside = limit + 1
+
+    # Cells outside the band count as more than the limit
+    previous = [j if j <= limit else outside for j in range(n + 1)]
+    current = [outside] * (n + 1)
     for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if s[i - 1] == t[j - 1]:
-                cost = 0
+        lo = max(1, i - limit)
+        hi = min(n, i + limit)
+        current[lo - 1] = i if lo == 1 else outside
+
+        c = s[i - 1]
+        row_min = current[lo - 1]
+        for j in range(lo, hi + 1):
+            if c == t[j - 1]:
+                cell = previous[j - 1]            # Match
             else:
-                cost = 1
-            dp[i][j] = min(
-                dp[i - 1][j] + 1,      # Deletion
-                dp[i][j - 1] + 1,      # Insertion
-                dp[i - 1][j - 1] + cost  # Substitution
-            )
-    
-    return dp[m][n]
\ No newline at end of file
+                cell = previous[j - 1] + 1        # Substitution
+                if previous[j] < cell:
+                    cell = previous[j] + 1        # Deletion
+                if current[j - 1] < cell:
+                    cell = current[j - 1] + 1     # Insertion
+            current[j] = cell
+            if cell < row_min:
+                row_min = cell
+        if hi < n:
+            current[hi + 1] = outside
+
+        # Distances never decrease from one row to the next along a path
+        if row_min > limit:
+            return outside
+        previous, current = current, previous
+
+    return previous[n]
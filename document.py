@@ -17,13 +17,13 @@ class Document(object):
             author (str, optional): Author of the document. Defaults to "".
             origin (str, optional): Origin of the document. Defaults to "".
         """
+        # Counted up by set_terms and set_filtered_terms, so indexes can tell which documents changed
+        self.terms_version = 0
+        self.filter_version = 0
         self.document_id = document_id  # Unique document ID
         self.title = title  # String containing the title of the document
         self.raw_text = raw_text  # String that holds the complete text of the document.
-        self.terms = terms  # List of terms (strings) in the document.
-        self._filtered_terms = []  # Holds terms without stopwords.
-        self._stemmed_terms = []  # Holds terms that were stemmed with Porter algorithm.
-        self._filtered_stemmed_terms = []  # Terms that were filtered and stemmed.
+        self.terms = terms  # List of terms (strings) in the document, also resets the term variants below.
         self.author = author
         self.origin = origin
 
@@ -32,17 +32,70 @@ class Document(object):
                              "...") if len(self.raw_text) > MAX_PREVIEW_SIZE else self.raw_text
         return 'D' + str(self.document_id).zfill(3) + ': ' + self.title + '("' + shortened_content + '")'
 
+    @property
+    def terms(self):
+        """list: Terms (strings) in the document. Assigning new terms is the same as set_terms."""
+        return self._terms
+
+    @terms.setter
+    def terms(self, terms):
+        self.set_terms(terms)
+
+    def set_terms(self, terms):
+        """Replace the terms of the document; the term variants are derived again on next use.
+
+        Terms edited in place are not noticed, assign the edited list again instead.
+
+        Args:
+            terms (list): The new terms.
+        """
+        self._terms = terms
+        # Term variants are computed on first access and memoized, None until then
+        self._filtered_terms = None  # Holds terms without stopwords.
+        self._stemmed_terms = None  # Holds terms that were stemmed with Porter algorithm.
+        self._filtered_stemmed_terms = None  # Terms that were filtered and stemmed.
+        self.terms_version += 1
+
     def filtered_terms(self):
         """Returns the list of terms in the document without stopwords
+        (by the internal stopword list, unless a stopword filter stored other ones with set_filtered_terms)
         """
+        if self._filtered_terms is None:
+            from my_module import remove_stop_words
+            self._filtered_terms = remove_stop_words(self.terms)
         return self._filtered_terms
-    
+
+    def set_filtered_terms(self, terms):
+        """Store the terms left by a stopword filter; the filtered and stemmed terms are derived again on next use.
+
+        Args:
+            terms (list): The filtered terms.
+        """
+        self._filtered_terms = terms
+        self._filtered_stemmed_terms = None
+        self.filter_version += 1
+
     def stemmed_terms(self):
         """Returns the list of terms in the document after stemming
         """
+        if self._stemmed_terms is None:
+            self._stemmed_terms = _stem_terms(self.terms)
         return self._stemmed_terms
-    
+
     def filtered_stemmed_terms(self):
         """Returns the list of terms in the document after filtering and stemming
         """
+        filtered_terms = self.filtered_terms
+        if not callable(filtered_terms):
+            # Older code replaces the filtered_terms method with a plain list, which may be replaced again
+            return _stem_terms(filtered_terms)
+        if self._filtered_stemmed_terms is None:
+            self._filtered_stemmed_terms = _stem_terms(filtered_terms())
         return self._filtered_stemmed_terms
+
+
+def _stem_terms(terms):
+    """Returns the Porter stems of the lowercased terms."""
+    # Imported here, my_module itself imports Document
+    from my_module import PorterStemmer
+    return PorterStemmer().stem_many([term.lower() for term in terms], workers=1)
@@ -1,11 +1,14 @@
-# python main.py
+# python main.py [--index FILE]
+# python main.py build-index [--catalogue FILE] [--index FILE]
 # This file is a part of Information Retreival system that allows users to interact with parsed documents and search for relevant information based on user queries.
 
 from document import Document
-from my_module import load_collection_from_url, remove_stop_words, remove_stop_words_by_frequency, linear_boolean_search, vector_space_search, precision_recall
+from my_module import load_collection_from_url, load_catalogue, linear_boolean_search, vector_space_search, bm25_search, phrase_search, boolean_query_search, precision_recall, InvertedIndex, QueryCache, TextCache, StopwordFilter, CollectionStats, PorterStemmer, INDEX_FILE
 import re
 import os
 import json
+import time
+import argparse
 
 class TerminalUI:
     """
@@ -25,9 +28,13 @@ class TerminalUI:
         Attributes:
             inputs (dict): Store paramenters entereb by user
             documents (list): Stores parsed Documents objects
+            index (InvertedIndex | None): Search index over documents, built on first search
+            text_cache (TextCache): On-disk cache of downloaded texts
         """
         self.inputs = {}
         self.documents = []
+        self.index = None
+        self.text_cache = TextCache()
         # self.ground_truth = self._load_ground_truth()
 
     def _load_ground_truth(self, file):
@@ -51,6 +58,27 @@ class TerminalUI:
             print(f"Error loading {file} : {e}")
 
         return ground_truth
+
+    def load_index(self, path=INDEX_FILE):
+        """Search a prebuilt index file instead of downloading and parsing the collection.
+
+        Args:
+            path (str, optional): Index file written by the build-index command. Defaults to INDEX_FILE.
+        """
+        start = time.time()
+        self.index = InvertedIndex.load(path, cache=QueryCache())
+        self.documents = self.index.collection
+        print(f"✅ Loaded {len(self.documents)} documents from {path} in {(time.time() - start) * 1000:.1f} ms.")
+
+    def _get_index(self):
+        """Returns the search index over the parsed documents, building it if the documents changed.
+
+        The index is kept while self.documents holds the same documents (see InvertedIndex.for_collection)
+        and re-indexes documents filtered again itself. An index loaded from a file is read-only and kept.
+        """
+        if self.index is None or self.index.index_file is None:
+            self.index = InvertedIndex.for_collection(self.documents, self.index)
+        return self.index
     
 
     def _run_demo(self):
@@ -108,8 +136,11 @@ class TerminalUI:
                 origin=self.inputs['origin'],
                 start_line=self.inputs['start_line'],
                 end_line=self.inputs['end_line'],
-                search_pattern= re.compile(self.inputs['search_pattern'], re.DOTALL) 
+                search_pattern= re.compile(self.inputs['search_pattern'], re.DOTALL),
+                cache=self.text_cache,
+                stream=True
             )
+            self.index = None
             print(f"\n✅ Parsed {len(self.documents)} documents.")
             
             return    
@@ -196,8 +227,10 @@ class TerminalUI:
                 origin=self.inputs['origin'],
                 start_line=self.inputs['start_line'],
                 end_line=self.inputs['end_line'],
-                search_pattern=self.inputs['search_pattern']
+                search_pattern=self.inputs['search_pattern'],
+                cache=self.text_cache
             )
+            self.index = None
             print(f"\n✅ Parsed {len(self.documents)} documents.")
         except Exception as e:
             print(f"❌ Error during parsing: {e}")
@@ -243,11 +276,17 @@ class TerminalUI:
             print("\n🔍 Select the search algorithm")
             print("\n1. Linear Boolean Search")
             print("\n2. TF IDF Vector Space Search")
+            print("\n3. Phrase / Proximity Search (e.g. \"the wolf\" NEAR/3 lamb)")
+            print("\n4. Boolean Query (e.g. wolf AND (lamb OR sheep) AND NOT fox)")
+            print("\n5. BM25 Ranking (titles count double)")
 
-            choice = input("\nSelect an action (1–2): ").strip()
+            choice = input("\nSelect an action (1–5): ").strip()
             
             linear_search = False
             vector_search = False 
+            proximity_search = False
+            query_search = False
+            bm25_ranking = False
 
             
             if choice == '1':
@@ -255,12 +294,24 @@ class TerminalUI:
                 
             elif choice == '2':
                 vector_search = True
+
+            elif choice == '3':
+                proximity_search = True
+
+            elif choice == '4':
+                query_search = True
+
+            elif choice == '5':
+                bm25_ranking = True
             
             else:
-                print("❌ Invalid choice. Please enter a number from 1 to 2.")
+                print("❌ Invalid choice. Please enter a number from 1 to 5.")
                 continue
                         
-            term = input("\nEnter a search term: ").strip().lower()
+            term = input("\nEnter a search term: ").strip()
+            # AND, OR and NOT are operators only in uppercase
+            if not query_search:
+                term = term.lower()
             if not term:
                 print("❌ Search term cannot be empty.")
                 return
@@ -268,15 +319,25 @@ class TerminalUI:
             results = []
             try:
                 if linear_search:
-                    results = linear_boolean_search(term=term, collection=self.documents, stopword_filtered=False)
-                    
+                    results = linear_boolean_search(term=term, collection=self.documents, stopword_filtered=False, index=self._get_index())
+                    results = [(score, doc) for score, doc in results if score != 0]
+                    results.sort(key=lambda x: x[0], reverse=True)
 
                 elif vector_search:
-                    results = vector_space_search(query=term, collection=self.documents, stopword_filtered=False)
+                    # Only the documents that match, already ranked
+                    results = vector_space_search(query=term, collection=self.documents, stopword_filtered=False, index=self._get_index(), hits_only=True)
+
+                elif bm25_ranking:
+                    results = bm25_search(query=term, collection=self.documents, stopword_filtered=False, index=self._get_index(), hits_only=True)
 
+                elif proximity_search:
+                    results = phrase_search(query=term, collection=self.documents, stopword_filtered=False, index=self._get_index())
+                    results = [(score, doc) for score, doc in results if score != 0]
+                    results.sort(key=lambda x: x[0], reverse=True)
 
-                results = [(score, doc) for score, doc in results if score != 0]
-                results.sort(key=lambda x: x[0], reverse=True)
+                elif query_search:
+                    # Every match counts the same
+                    results = [(1, doc) for doc in boolean_query_search(query=term, collection=self.documents, stopword_filtered=False, index=self._get_index())]
 
                 print(f"\n🔍 Results for '{term}': {len(results)} found.")
                 print(f'- Doc_ID : Relevance Score')
@@ -334,17 +395,17 @@ class TerminalUI:
         if method == '1':
             stop_file = input("Enter stopword file path (or press Enter to use internal list): ").strip()
 
-            stopwords = None
+            stopword_filter = None
             if stop_file:
                 if os.path.exists(stop_file):
-                    with open(stop_file, 'r') as f:
-                        stopwords = set(word.strip().lower() for word in f)
+                    stopword_filter = StopwordFilter.from_file(stop_file)
                     print("✅ Stopword file loaded.")
                 else:
                     print("❌ File not found. Using internal stopwords.")
 
-            for doc in self.documents:
-                doc.filtered_terms = remove_stop_words(terms=doc.terms, stopwords=stopwords)
+            if stopword_filter is None:
+                stopword_filter = StopwordFilter.from_file()
+            stopword_filter.filter_collection(self.documents)
             print("✅ Stopword filtering complete.")
 
         elif method == '2':
@@ -358,13 +419,7 @@ class TerminalUI:
                 except ValueError:
                     print("❌ Please enter valid frequencies between 0 and 1.")
 
-            for doc in self.documents:
-                doc.filtered_terms = remove_stop_words_by_frequency(
-                    terms=doc.terms,
-                    collection=self.documents,
-                    low_freq=rare_freq,
-                    high_freq=common_freq
-                )
+            CollectionStats(self.documents).filter_collection(low_freq=rare_freq, high_freq=common_freq)
             print("✅ Frequency-based stopword removal applied.")
 
         doc_id_input = input("Enter document ID to view filtered terms (or press Enter to skip): ").strip()
@@ -373,13 +428,46 @@ class TerminalUI:
             if 0 <= doc_id < len(self.documents):
                 doc = self.documents[doc_id]
                 print(f"\n--- {doc} ---")
-                print(doc.filtered_terms)
+                print(doc.filtered_terms())
             else:
                 print("❌ Invalid document ID.")
         elif doc_id_input:
             print("❌ Please enter a valid numeric ID.")
 
 
+def build_index(catalogue_file, index_file=INDEX_FILE):
+    """
+    Download and parse every book of a catalogue and write its search index to a binary index file.
+
+    Args:
+        catalogue_file (str): JSON catalogue of books, like data/gutenberg.json.
+        index_file (str, optional): Destination of the index file. Defaults to INDEX_FILE.
+    """
+    start = time.time()
+    documents = load_catalogue(catalogue_file, cache=TextCache())
+    print(f"✅ Parsed {len(documents)} documents in {time.time() - start:.1f} s.")
+
+    start = time.time()
+    # Stem all term variants up front, spread over the CPUs
+    PorterStemmer().stem_documents(documents)
+    InvertedIndex(documents).save(index_file)
+    print(f"✅ Wrote {index_file} ({os.path.getsize(index_file) / 1e6:.1f} MB) in {time.time() - start:.1f} s.")
+
+
 # Run the terminal UI
 if __name__ == "__main__":
-    TerminalUI().run()
+    parser = argparse.ArgumentParser(description="Information Retrieval system")
+    parser.add_argument('command', nargs='?', choices=['build-index'],
+                        help="build-index: write the search index of the catalogue to the index file")
+    parser.add_argument('--catalogue', default=os.path.join('data', 'gutenberg.json'),
+                        help="Catalogue of books to index (default: %(default)s)")
+    parser.add_argument('--index', help=f"Index file to write, or to search without parsing (default for build-index: {INDEX_FILE})")
+    args = parser.parse_args()
+
+    if args.command == 'build-index':
+        build_index(args.catalogue, args.index or INDEX_FILE)
+    else:
+        ui = TerminalUI()
+        if args.index:
+            ui.load_index(args.index)
+        ui.run()
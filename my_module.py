@@ -1,337 +1,3595 @@
 from urllib.request import urlopen, Request
-from collections import defaultdict
+from urllib.error import HTTPError, URLError
+from collections import Counter, defaultdict, OrderedDict
+from collections.abc import Mapping
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import attrgetter, itemgetter
+from urllib.parse import urlparse
 from document import Document
 import re
 import math
+import bisect
+import heapq
+import sys
+import os
+import json
+import time
+import hashlib
+import threading
+import shutil
+import io
+import codecs
+import mmap
+import struct
+import unicodedata
+
+# NumPy and SciPy are optional, the vectorized search backend is used only when both are installed
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
 
 # Global constant for punctuation symbols to be removed during tokenization
 PUNCT = '.,!?;:"“”\'()[]{}'
 
+# Internal stopword list, resolved relative to this module instead of the working directory
+STOPWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'helpers', 'stopwords.txt')
+
+# Maximum number of distinct words kept in the shared stem cache
+STEM_CACHE_SIZE = 100000
+
+# Number of distinct words sent to a worker process at once by PorterStemmer.stem_many
+STEM_CHUNK_SIZE = 2000
+
+# Search results kept by a QueryCache and how long a result is served
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_MAX_AGE = 10 * 60
+
+# Number of queries scored at a time by InvertedIndex.search_many, per worker process task or matrix product
+SEARCH_CHUNK_SIZE = 200
+
+# BM25 term frequency saturation and document length normalization, and the weight of a title
+# occurrence relative to one in the text (0.0 ranks by the text alone)
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_TITLE_BOOST = 2.0
+
+# Proximity operator of phrase queries: NEAR/k allows at most k terms between its two sides
+_NEAR_OPERATOR = re.compile(r'\bNEAR/(\d+)\b', re.IGNORECASE)
+
+# Downloaded texts cache: location (relative to this module), size limit and how long an entry is used without revalidation
+TEXT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'texts')
+TEXT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+TEXT_CACHE_MAX_AGE = 24 * 60 * 60
+
+# Bytes read from the source at a time when a book is streamed, and how much text has to follow a
+# chapter before it is split off: the lookahead that ends a chapter may look no further than this
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_LOOKAHEAD = 4096
+
+# Binary index files: default location (relative to this module), magic bytes and format version
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'index.bin')
+INDEX_MAGIC = b'BTUIRIDX'
+INDEX_FORMAT_VERSION = 3
+
+# Index file header, term dictionary record (string offset and length, df, last doc_id, postings
+# offset and length, idf, largest tf / norm, skip table offset and size) and document norm layouts
+_INDEX_HEADER = struct.Struct('<8sIQQ')
+_TERM_RECORD = struct.Struct('<IIIIQIddQI')
+_NORM = struct.Struct('<d')
+
+# Postings between two entries of a postings skip table (part of the index file format)
+POSTINGS_SKIP_INTERVAL = 32
+
+# Relative slack on score upper bounds, so rounding never prunes a document exhaustive scoring would rank
+SCORE_BOUND_MARGIN = 1e-9
+
+
+class TextCache:
+    """
+    An on-disk cache of downloaded texts keyed by URL.
+
+    Entries younger than max_age are served without any network round trip. Older entries are
+    revalidated with If-None-Match / If-Modified-Since, and the least recently used entries are
+    evicted once the cache grows beyond max_bytes. In offline mode only cached texts are served.
+    While the network or the server is down (5xx), stale entries are served as well; a client
+    error like 404 means the URL is wrong or gone, and is raised.
+
+    Attributes:
+        directory (str): Directory holding one body (.txt) and one metadata (.json) file per URL.
+        max_bytes (int): Maximum total size of the cached bodies.
+        max_age (float): Seconds an entry is trusted before it is revalidated.
+        offline (bool): Never access the network.
+    """
+    def __init__(self, directory=TEXT_CACHE_DIR, max_bytes=TEXT_CACHE_MAX_BYTES, max_age=TEXT_CACHE_MAX_AGE, offline=False) -> None:
+        """Initialize the cache; its directory is created when the first text is stored.
+
+        Args:
+            directory (str, optional): Cache directory. Defaults to TEXT_CACHE_DIR.
+            max_bytes (int, optional): Size limit of the cache. Defaults to TEXT_CACHE_MAX_BYTES.
+            max_age (float, optional): Seconds before an entry is revalidated. Defaults to TEXT_CACHE_MAX_AGE.
+            offline (bool, optional): Serve cached texts only. Defaults to False.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        """Returns the body and metadata file paths of the entry for url."""
+        key = os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+        return key + '.txt', key + '.json'
+
+    def _read_meta(self, url):
+        """Returns the metadata of the cached entry for url, or None if it is not (completely) cached."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return meta if os.path.exists(body_path) else None
+
+    def _write_meta(self, url, meta):
+        _, meta_path = self._paths(url)
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    def _read_body(self, url):
+        """Returns the cached body of url and marks the entry as recently used."""
+        body_path, _ = self._paths(url)
+        with open(body_path, 'rb') as f:
+            data = f.read()
+        os.utime(body_path)
+        return data
+
+    def get(self, url):
+        """Returns the cached bytes of url without any freshness check, or None if it is not cached."""
+        return self._read_body(url) if self._read_meta(url) is not None else None
+
+    def put(self, url, data, etag=None, last_modified=None):
+        """Store the bytes downloaded from url together with their validators.
+
+        Args:
+            url (str): Source URL of the text.
+            data (bytes): The downloaded body.
+            etag (str, optional): ETag header of the response. Defaults to None.
+            last_modified (str, optional): Last-Modified header of the response. Defaults to None.
+        """
+        self._store(url, io.BytesIO(data), etag, last_modified)
+
+    def _store(self, url, stream, etag, last_modified):
+        """Copy a binary stream into the entry for url without holding the whole body in memory."""
+        body_path, _ = self._paths(url)
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first, so readers never see a partial body
+        part_path = f"{body_path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(part_path, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+            size = f.tell()
+
+        # Concurrent loaders share one cache, so replacing entries and evictions are serialized
+        with self._lock:
+            os.replace(part_path, body_path)
+            self._write_meta(url, {'url': url, 'etag': etag, 'last_modified': last_modified,
+                                   'checked': time.time(), 'size': size})
+            self._evict(keep=body_path)
+
+    def _validate(self, url):
+        """Make sure an up to date copy of url is cached, downloading or revalidating it if necessary.
+
+        Raises:
+            HTTPError: If the server rejects the request with a client error (4xx), or fails and the text is not cached.
+            URLError: If the text is not cached in offline mode, or cannot be downloaded and is not cached.
+        """
+        meta = self._read_meta(url)
+        if meta is not None and (self.offline or time.time() - meta['checked'] < self.max_age):
+            return
+        if self.offline:
+            raise URLError(f"{url} is not cached and the text cache is offline")
+
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            with urlopen(Request(url, headers=headers)) as res:
+                self._store(url, res, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+        except HTTPError as e:
+            if meta is None or 400 <= e.code < 500:
+                raise
+            if e.code == 304:
+                # Not modified: the cached copy is valid for another max_age
+                meta['checked'] = time.time()
+                self._write_meta(url, meta)
+            # Otherwise the server failed: a stale copy is better than nothing, like without network
+        except URLError:
+            # Network is unavailable: a stale copy is better than nothing
+            if meta is None:
+                raise
+
+    def fetch(self, url):
+        """Returns the bytes at url, from the cache if possible.
+
+        Args:
+            url (str): URL of the text.
+
+        Raises:
+            URLError: If the text is not cached in offline mode, or cannot be downloaded and is not cached.
+
+        Returns:
+            bytes: The body of the text.
+        """
+        self._validate(url)
+        return self._read_body(url)
+
+    def open(self, url):
+        """Returns a binary file object over the cached text at url, downloading it first if necessary.
+
+        Args:
+            url (str): URL of the text.
+
+        Raises:
+            URLError: If the text is not cached in offline mode, or cannot be downloaded and is not cached.
+
+        Returns:
+            BinaryIO: The opened body file; the caller closes it.
+        """
+        self._validate(url)
+        body_path, _ = self._paths(url)
+        os.utime(body_path)
+        return open(body_path, 'rb')
+
+    def size(self):
+        """Returns the total size of the cached bodies in bytes."""
+        return sum(os.path.getsize(path) for path in self._bodies())
+
+    def _bodies(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.txt')]
+
+    def _evict(self, keep=None):
+        """Remove least recently used entries (except keep) until the cache fits into max_bytes."""
+        bodies = sorted(self._bodies(), key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in bodies)
+        for body_path in bodies:
+            if total <= self.max_bytes:
+                break
+            if body_path == keep:
+                continue
+            total -= os.path.getsize(body_path)
+            os.remove(body_path)
+            meta_path = body_path[:-len('.txt')] + '.json'
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+
+
+class Tokenizer:
+    """
+    Splits text into lowercase terms, treating punctuation symbols as whitespace.
+
+    Punctuation is replaced with a precomputed str.translate table and the text is lowercased in one
+    pass. The same tokenizer is used for documents and queries, so both go through one pipeline.
+
+    Attributes:
+        punctuation (str): Symbols that separate terms like whitespace does.
+        normalization (str | None): Unicode normal form (e.g. 'NFKC') applied before splitting.
+    """
+    def __init__(self, punctuation=PUNCT, normalization=None) -> None:
+        """Initialize the tokenizer.
+
+        Args:
+            punctuation (str, optional): Symbols to remove. Defaults to PUNCT.
+            normalization (str, optional): Unicode normal form ('NFC', 'NFKC', 'NFD' or 'NFKD').
+                Defaults to None (no normalization).
+        """
+        self.punctuation = punctuation
+        self.normalization = normalization
+        self._table = str.maketrans({char: ' ' for char in punctuation})
+
+    def tokenize(self, text):
+        """Tokenize the given text into words.
+
+        Args:
+            text (str): The text to tokenize.
+
+        Returns:
+            list[str]: A list of lowercase words extracted from the text.
+        """
+        if self.normalization is not None:
+            text = unicodedata.normalize(self.normalization, text)
+
+        if text.isascii():
+            text = text.translate(self._table)
+        else:
+            # str.translate has no fast path for non-ASCII strings, while replace skips absent symbols cheaply
+            for char in self.punctuation:
+                text = text.replace(char, ' ')
+
+        # Lowercase once for the whole text instead of once per word
+        return text.lower().split()
+
+    __call__ = tokenize
+
+
+# Tokenizer used by parsers and indexes that are not given their own
+DEFAULT_TOKENIZER = Tokenizer()
+
+
+class StopwordFilter:
+    """
+    Removes stopwords from term lists using a frozenset for constant time membership tests.
+
+    Stopword files are read once and shared through from_file, which only reloads a file after it changed.
+
+    Attributes:
+        stopwords (frozenset[str]): The lowercase stopwords.
+    """
+    _files = {}
+
+    def __init__(self, stopwords) -> None:
+        """Initialize the filter.
+
+        Args:
+            stopwords (Iterable[str]): Stopwords; they are matched case-insensitively.
+        """
+        self.stopwords = frozenset(word.lower() for word in stopwords)
+
+    @classmethod
+    def from_file(cls, path=STOPWORDS_FILE):
+        """Returns the filter for a stopword file with one word per line, loading it only on first use.
+
+        Args:
+            path (str, optional): Path of the stopword file. Defaults to the internal list STOPWORDS_FILE.
+
+        Returns:
+            StopwordFilter: The shared filter of the file.
+        """
+        path = os.path.abspath(path)
+        mtime = os.path.getmtime(path)
+        cached = cls._files.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r') as src:
+                cached = (mtime, cls(line.strip() for line in src))
+            cls._files[path] = cached
+        return cached[1]
+
+    def __contains__(self, term):
+        return term.lower() in self.stopwords
+
+    def filter(self, terms):
+        """Returns the lowercase terms that are not stopwords.
+
+        Args:
+            terms (list[str]): The input term list.
+
+        Returns:
+            list[str]: Filtered terms without stopwords.
+        """
+        stopwords = self.stopwords
+        return [term for term in map(str.lower, terms) if term not in stopwords]
+
+    def filter_collection(self, collection):
+        """Store the filtered terms of every document of the collection with doc.set_filtered_terms.
+
+        Args:
+            collection (list[Document]): The documents to filter.
+        """
+        for doc in collection:
+            doc.set_filtered_terms(self.filter(doc.terms))
+
+
+_terms_version = attrgetter('terms_version')
+
+
+class CollectionStats:
+    """
+    Document frequency statistics of a collection, used for frequency-based stopword removal.
+
+    The statistics are computed once per collection. Callers keep them and pass them back to
+    for_collection, which recomputes them only when the collection holds other documents or a
+    document got new terms.
+
+    Attributes:
+        collection (list[Document]): The documents the statistics were computed from.
+        doc_freqs (dict[str, int]): Term -> number of documents containing the term.
+        sorted_freqs (list[int]): All document frequencies in ascending order.
+    """
+
+    def __init__(self, collection) -> None:
+        """Compute the document frequencies of the collection.
+
+        Args:
+            collection (list[Document]): The full document collection.
+        """
+        self.collection = collection
+        # The documents and their terms versions (see Document.set_terms) at the time of counting
+        self._documents = list(collection)
+        self._terms_versions = list(map(_terms_version, collection))
+        self._stopwords = {}
+
+        self.doc_freqs = defaultdict(int)
+        for doc in collection:
+            for term in set(doc.terms):
+                self.doc_freqs[term] += 1
+        self.sorted_freqs = sorted(self.doc_freqs.values())
+
+    def is_stale(self):
+        """Check if the collection changed since the statistics were computed.
+
+        It changed when it holds other documents than then, compared by identity, or one of them got
+        new terms (see Document.set_terms). Both are one pass over the collection in C.
+        """
+        return (self.collection != self._documents
+                or list(map(_terms_version, self.collection)) != self._terms_versions)
+
+    @classmethod
+    def for_collection(cls, collection, stats=None):
+        """Returns the statistics of the collection, reusing the given ones while they are up to date.
+
+        Args:
+            collection (list[Document]): The full document collection.
+            stats (CollectionStats, optional): Statistics from an earlier call. Defaults to None.
+
+        Returns:
+            CollectionStats: Up to date statistics of the collection.
+        """
+        if stats is None or stats.collection is not collection or stats.is_stale():
+            stats = cls(collection)
+        return stats
+
+    def percentile(self, p):
+        """Returns the document frequency at percentile p (0 to 1) of all terms."""
+        return self.sorted_freqs[min(int(p * len(self.sorted_freqs)), len(self.sorted_freqs) - 1)]
+
+    def stopwords(self, low_freq, high_freq):
+        """Returns the terms that are too rare or too common, computed once per pair of thresholds.
+
+        Args:
+            low_freq (float): Lower percentile (e.g., 0.1) to treat terms as too rare.
+            high_freq (float): Upper percentile (e.g., 0.5) to treat terms as too common.
+
+        Returns:
+            frozenset[str]: The stopwords.
+        """
+        key = (low_freq, high_freq)
+        if key not in self._stopwords:
+            if not self.sorted_freqs:
+                self._stopwords[key] = frozenset()
+            else:
+                min_thresold = self.percentile(low_freq)
+                max_thresold = self.percentile(high_freq)
+                self._stopwords[key] = frozenset(
+                    term for term, freq in self.doc_freqs.items() if freq <= min_thresold or freq >= max_thresold
+                )
+        return self._stopwords[key]
+
+    def filter(self, terms, low_freq, high_freq):
+        """Returns the terms that are neither too rare nor too common in the collection."""
+        stopwords = self.stopwords(low_freq, high_freq)
+        return [term for term in terms if term not in stopwords]
+
+    def filter_collection(self, low_freq, high_freq):
+        """Store the frequency filtered terms of every document of the collection with doc.set_filtered_terms."""
+        for doc in self.collection:
+            doc.set_filtered_terms(self.filter(doc.terms, low_freq, high_freq))
+
 
 class gutenbergParser:
     """
     A parser for Project Gutenberg-style plain text books to extract and split chapters into Document objects.
 
-    Attributes:
-        url (str): The source URL of the text file.
-        author (str): The author of the work.
-        origin (str): The source or origin of the collection.
-        start_line (int): The line number to start reading the content from.
-        end_line (int | None): The line number to stop reading at (None for end of file).
-        search_pattern (Pattern): A compiled regex pattern to identify chapters.
-    """
-    def __init__(self,url, author, origin, start_line, end_line, search_pattern) -> None:
-        """Initialize the gutenbergParser with the provided parameters.
+    Attributes:
+        url (str): The source URL of the text file.
+        author (str): The author of the work.
+        origin (str): The source or origin of the collection.
+        start_line (int): The line number to start reading the content from.
+        end_line (int | None): The line number to stop reading at (None for end of file).
+        search_pattern (Pattern): A compiled regex pattern to identify chapters.
+        cache (TextCache | None): On-disk cache of downloaded texts.
+        stream (bool): Read the text incrementally instead of holding the whole book in memory.
+        tokenizer (Tokenizer): Splits chapter texts into terms.
+    """
+    def __init__(self,url, author, origin, start_line, end_line, search_pattern, cache=None, stream=False, tokenizer=None) -> None:
+        """Initialize the gutenbergParser with the provided parameters.
+
+        Args:
+            url (str): URL to download the plain text book.
+            author (str): Name of the author.
+            origin (str): Source of book title.
+            start_line (int): Line number to start parsing from.
+            end_line (int): Line number to sop parsing (None to go till end).
+            search_pattern (Pattern): Regex pattern to identify chapter divisions.
+            cache (TextCache, optional): Cache to serve the text from. Defaults to None (always download).
+            stream (bool, optional): Defer reading to iter_documents, which streams the text chapter
+                by chapter. Defaults to False.
+            tokenizer (Tokenizer, optional): Tokenizer for the chapter texts. Defaults to None (DEFAULT_TOKENIZER).
+        """
+        self.url = url
+        self.author = author
+        self.origin = origin
+        self.start_line = start_line
+        self.end_line = end_line
+        self.search_pattern = search_pattern
+        self.cache = cache
+        self.stream = stream
+        self.tokenizer = tokenizer if tokenizer is not None else DEFAULT_TOKENIZER
+
+        # Full Text Helper Variables (not held in streaming mode)
+        self.full_text = None
+        self.chapter_text = None
+        if not stream:
+            self._load_full_text()
+
+    def _load_full_text(self):
+        self.full_text = self._fetch_full_text()
+        self.chapter_text = '\n'.join(self.full_text.splitlines()[self.start_line: self.end_line])
+
+    
+    def _fetch_full_text(self):
+        """Downloads and returns the full text from the URL as a UTF-8 decoded string.
+        """
+        if self.cache is not None:
+            return self.cache.fetch(self.url).decode('utf-8')
+
+        req = Request(self.url)
+        with urlopen(req) as res:
+            return res.read().decode('utf-8')
+
+    def _open_source(self):
+        """Returns a binary stream over the text, from the cache if there is one."""
+        if self.cache is not None:
+            return self.cache.open(self.url)
+        return urlopen(Request(self.url))
+
+    def _read_window(self):
+        """
+        Reads the text incrementally and yields the lines from start_line to end_line.
+
+        The pieces concatenate to exactly the chapter text of the non-streaming mode (lines as
+        split by str.splitlines and joined with newlines). Reading stops at end_line.
+
+        Yields:
+            tuple[str, bool]: The next piece of the window and whether it is the last one.
+        """
+        start = self.start_line or 0
+        end = self.end_line
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        pending = ''
+        line_number = 0
+        first_line = True
+        done = False
+
+        with self._open_source() as source:
+            while not done:
+                chunk = source.read(STREAM_CHUNK_SIZE)
+                done = not chunk
+                lines = (pending + decoder.decode(chunk, final=done)).splitlines(keepends=True)
+
+                # Keep an unterminated last line (or a '\r' that may be followed by '\n') for the next chunk
+                pending = ''
+                if not done and lines and (lines[-1].endswith('\r') or lines[-1].splitlines()[0] == lines[-1]):
+                    pending = lines.pop()
+
+                pieces = []
+                for line in lines:
+                    if end is not None and line_number >= end:
+                        done = True
+                        break
+                    if line_number >= start:
+                        content = line.splitlines()[0]
+                        pieces.append(content if first_line else '\n' + content)
+                        first_line = False
+                    line_number += 1
+
+                yield ''.join(pieces), done
+    
+    def _split_chapters(self, chapter_text, search_pattern):
+        """
+        Splits the chapter text into separate Document instances using the regex pattern.
+
+        Args:
+            chapter_text (str): The full relevant content.
+            search_pattern (Pattern | None): Compiled regex with groups for chapter title and content.
+                None keeps the whole text as a single document titled with the origin.
+
+        Returns:
+            list[Document]: A list of Document objects representing chapters.
+        """
+        if search_pattern is None:
+            chapter_parts = [(self.origin, chapter_text)]
+        else:
+            chapter_parts = search_pattern.findall(chapter_text)
+
+        documents = []
+        document_id = 0
+
+        for chapter_title, chapter_content in chapter_parts:
+            documents.append(self._make_document(document_id, chapter_title, chapter_content))
+            document_id += 1
+        
+        return documents
+
+    def _make_document(self, document_id, chapter_title, chapter_content):
+        """Create the Document of one chapter."""
+        return Document(
+            document_id= document_id,
+            title = chapter_title,
+            raw_text = chapter_content.strip(),
+            terms = self._tokenize(chapter_content),
+            author=self.author,
+            origin=self.origin)
+
+    def get_documents(self):
+        """
+        Public method to extract and return the list of parsed Document objects.
+
+        Returns:
+            list[Document]: The parsed documents.
+        """
+        if self.stream:
+            self.documents = list(self.iter_documents())
+        else:
+            self.documents = self._split_chapters(chapter_text=self.chapter_text, search_pattern=self.search_pattern)
+
+        return self.documents
+
+    def iter_documents(self):
+        """
+        Generator over the parsed Document objects.
+
+        In streaming mode each chapter is yielded once STREAM_LOOKAHEAD characters of text follow it
+        (or the text ends), so the text held is bounded by the largest chapter instead of copies of the
+        whole book. This needs chapters that end at a lookahead which also accepts the end of the text,
+        like the demo patterns' (?=\\n{5}|$); other patterns raise a ValueError.
+
+        Raises:
+            ValueError: If the pattern cannot be split while streaming.
+
+        Yields:
+            Document: The next parsed chapter.
+        """
+        negative_window = ((self.start_line or 0) < 0) or (self.end_line is not None and self.end_line < 0)
+        if not self.stream or self.search_pattern is None or negative_window:
+            # The whole window is needed at once (or counted from the end of the text)
+            if self.chapter_text is None:
+                self._load_full_text()
+            yield from self._split_chapters(chapter_text=self.chapter_text, search_pattern=self.search_pattern)
+            return
+
+        pattern = self.search_pattern
+        if pattern.groups != 2 or not pattern.pattern.rstrip().endswith('|$)'):
+            raise ValueError(f"Cannot stream with {pattern.pattern!r}: chapters must be two groups (title and text) "
+                             "ending at a lookahead that also accepts the end of the text, like (?=\\n{5}|$)")
+
+        # The buffer starts after the last chapter yielded; an unfinished chapter is scanned again only
+        # once the buffer doubled, so every character is scanned a bounded number of times
+        buffer = ''
+        scanned = 0
+        document_id = 0
+        for piece, at_end in self._read_window():
+            buffer += piece
+            if not at_end and len(buffer) < 2 * scanned:
+                continue
+            consumed = 0
+            for match in pattern.finditer(buffer):
+                # A chapter too close to the end of the buffer may still end elsewhere in the whole text
+                if not at_end and match.end() > len(buffer) - STREAM_LOOKAHEAD:
+                    break
+                chapter_title, chapter_content = match.groups('')
+                yield self._make_document(document_id, chapter_title, chapter_content)
+                document_id += 1
+                consumed = match.end()
+            buffer = buffer[consumed:]
+            scanned = len(buffer)
+
+    def _tokenize(self,content : str) -> list[str]:
+        """Tokenize the given text into words.
+
+        Args:
+            content (str): The text to tokenize.
+
+        Returns:
+            list[str]: A list of words extracted from the text.
+        """
+        return self.tokenizer.tokenize(content)
+    
+
+class StemCache:
+    """
+    A bounded word -> stem cache with least-recently-used eviction.
+
+    Natural language repeats the same few thousand word types over and over, so
+    stemming a collection mostly becomes a dictionary lookup.
+
+    Attributes:
+        maxsize (int): Maximum number of cached words (0 disables caching).
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to be stemmed.
+    """
+    def __init__(self, maxsize=STEM_CACHE_SIZE) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of cached words. Defaults to STEM_CACHE_SIZE.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._stems = OrderedDict()
+
+    def __len__(self):
+        return len(self._stems)
+
+    def get(self, word):
+        """Returns the cached stem of word (marking it as recently used) or None."""
+        try:
+            stem = self._stems[word]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._stems.move_to_end(word)
+        self.hits += 1
+        return stem
+
+    def put(self, word, stem):
+        """Store the stem of word, evicting the least recently used words above maxsize."""
+        if self.maxsize <= 0:
+            return
+        self._stems[word] = stem
+        self._stems.move_to_end(word)
+        while len(self._stems) > self.maxsize:
+            self._stems.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Change the size limit, evicting the least recently used words if necessary."""
+        self.maxsize = maxsize
+        while self._stems and len(self._stems) > max(maxsize, 0):
+            self._stems.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached stems and reset the counters."""
+        self._stems.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Returns the cache statistics.
+
+        Returns:
+            dict: hits, misses, hit_rate, size and maxsize of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._stems),
+            'maxsize': self.maxsize,
+        }
+
+
+# Cache shared by every PorterStemmer that is not given its own
+DEFAULT_STEM_CACHE = StemCache()
+
+
+# Characters that re.IGNORECASE matches against an ASCII letter although str.lower() does not map them to it
+_SUFFIX_FOLD = {'İ': 'i', 'ı': 'i', 'ſ': 's', 'K': 'k'}
+
+
+def _fold_suffix_key(word):
+    """Returns a same-length lowercase copy of word that is used to match suffixes case-insensitively."""
+    if word.isascii():
+        return word.lower()
+    return ''.join(char.lower() if char.isascii() else _SUFFIX_FOLD.get(char, char) for char in word)
+
+
+class _WordShape:
+    """
+    Consonant/vowel mask of a word, computed once and shared by all rule conditions.
+
+    Attributes:
+        consonant (list[bool]): Whether the letter at each index is a consonant.
+        measure (list[int]): measure[k] is the measure (m) of the prefix word[:k].
+        first_vowel (int): Index of the first vowel (len(word) if there is none).
+    """
+    __slots__ = ('consonant', 'measure', 'first_vowel')
+
+    def __init__(self, word) -> None:
+        consonant = []
+        measure = [0]
+        m = 0
+        first_vowel = len(word)
+        for i, char in enumerate(word):
+            letter = char.lower()
+            if letter in 'aeiou':
+                is_consonant = False
+            elif letter == 'y':
+                is_consonant = i == 0 or not consonant[i - 1]
+            else:
+                is_consonant = True
+
+            if is_consonant:
+                # Every vowel -> consonant transition closes one VC sequence
+                if i > 0 and not consonant[i - 1]:
+                    m += 1
+            elif first_vowel > i:
+                first_vowel = i
+
+            consonant.append(is_consonant)
+            measure.append(m)
+
+        self.consonant = consonant
+        self.measure = measure
+        self.first_vowel = first_vowel
+
+    def contains_vowel(self, k):
+        """Check if the prefix of length k contains at least one vowel."""
+        return self.first_vowel < k
+
+    def ends_with_double_consonant(self, word, k):
+        """Check if the prefix of length k ends with a double consonant."""
+        return (k >= 2 and self.consonant[k - 1] and self.consonant[k - 2] and
+                word[k - 1].lower() == word[k - 2].lower())
+
+    def ends_with_cvc(self, word, k):
+        """Check if the prefix of length k ends with consonant-vowel-consonant, where the last consonant is not w, x, or y."""
+        return (k >= 3 and self.consonant[k - 3] and not self.consonant[k - 2] and self.consonant[k - 1] and
+                word[k - 1].lower() not in 'wxy')
+
+
+# Rule conditions on the stem word[:k] that remains after removing a suffix
+def _always(word, shape, k):
+    return True
+
+def _m_gt_0(word, shape, k):
+    return shape.measure[k] > 0
+
+def _m_gt_1(word, shape, k):
+    return shape.measure[k] > 1
+
+def _has_vowel(word, shape, k):
+    return shape.contains_vowel(k)
+
+
+def _compile_step(rules):
+    """Group the rules of one step by the final letters of their suffix, keeping the rule order within a group.
+
+    Returns:
+        tuple[int, dict]: Number of final letters used as key, and key -> list of (suffix, replacement, condition).
+    """
+    key_length = min(len(suffix) for suffix, _, _ in rules)
+    dispatch = {}
+    for rule in rules:
+        dispatch.setdefault(rule[0][-key_length:], []).append(rule)
+    return key_length, dispatch
+
+
+class PorterStemmer:
+    # RULES: (suffix, replacement, condition on the remaining stem)
+    STEP1A_RULES = [
+        ('sses', 'ss', _always),
+        ('ies', 'i', _always),
+        ('ss', 'ss', _always),
+        ('s', '', _always),
+    ]
+
+    STEP1B_RULES = [
+        ('eed', 'ee', _m_gt_0),
+        ('ed', '', _has_vowel),
+        ('ing', '', _has_vowel),
+    ]
+
+    STEP1B_RULES_EXT = [
+        ('at', 'ate'),
+        ('bl', 'ble'),
+        ('iz', 'ize'),
+    ]
+
+    STEP1C_RULES = [
+        ('y', 'i', lambda word, shape, k: shape.contains_vowel(k - 1)),
+    ]
+
+    STEP2_RULES = [
+        ('ational', 'ate', _m_gt_0),
+        ('tional', 'tion', _m_gt_0),
+        ('enci', 'ence', _m_gt_0),
+        ('anci', 'ance', _m_gt_0),
+        ('izer', 'ize', _m_gt_0),
+        ('abli', 'able', _m_gt_0),
+        ('alli', 'al', _m_gt_0),
+        ('entli', 'ent', _m_gt_0),
+        ('eli', 'e', _m_gt_0),
+        ('ousli', 'ous', _m_gt_0),
+        ('ization', 'ize', _m_gt_0),
+        ('ation', 'ate', _m_gt_0),
+        ('ator', 'ate', _m_gt_0),
+        ('alism', 'al', _m_gt_0),
+        ('iveness', 'ive', _m_gt_0),
+        ('fulness', 'ful', _m_gt_0),
+        ('ousness', 'ous', _m_gt_0),
+        ('aliti', 'al', _m_gt_0),
+        ('iviti', 'ive', _m_gt_0),
+        ('biliti', 'ble', _m_gt_0),
+        ('xflurti', 'xti', _m_gt_0),
+    ]
+
+    STEP3_RULES = [
+        ('icate', 'ic', _m_gt_0),
+        ('ative', '', _m_gt_0),
+        ('alize', 'al', _m_gt_0),
+        ('iciti', 'ic', _m_gt_0),
+        ('ical', 'ic', _m_gt_0),
+        ('ful', '', _m_gt_0),
+        ('ness', '', _m_gt_0),
+    ]
+
+    STEP4_RULES = [
+        ('al', '', _m_gt_1),
+        ('ance', '', _m_gt_1),
+        ('ence', '', _m_gt_1),
+        ('er', '', _m_gt_1),
+        ('ic', '', _m_gt_1),
+        ('able', '', _m_gt_1),
+        ('ible', '', _m_gt_1),
+        ('ant', '', _m_gt_1),
+        ('ement', '', _m_gt_1),
+        ('ment', '', _m_gt_1),
+        ('ent', '', _m_gt_1),
+        ('ion', '', lambda word, shape, k: shape.measure[k] > 1 and word[k - 1].lower() in 'st'),
+        ('ou', '', _m_gt_1),
+        ('ism', '', _m_gt_1),
+        ('ate', '', _m_gt_1),
+        ('iti', '', _m_gt_1),
+        ('ous', '', _m_gt_1),
+        ('ive', '', _m_gt_1),
+        ('ize', '', _m_gt_1),
+    ]
+
+    STEP5A_RULES = [
+        ('e', '', lambda word, shape, k: shape.measure[k] > 1 or (shape.measure[k] == 1 and not shape.ends_with_cvc(word, k))),
+    ]
+
+    STEP5B_RULES = [
+        ('ll', '', lambda word, shape, k: shape.measure[k] > 1 and shape.ends_with_double_consonant(word, k) and shape.measure[k - 1] > 1),
+    ]
+
+    # Steps 1C to 5B compiled once into dispatch tables keyed on the final letters of the word
+    SUBRULES = [_compile_step(RULE) for RULE in
+                (STEP1C_RULES, STEP2_RULES, STEP3_RULES, STEP4_RULES, STEP5A_RULES, STEP5B_RULES)]
+
+    def __init__(self, cache=None) -> None:
+        """Initialize the stemmer.
+
+        Args:
+            cache (StemCache, optional): Cache of already stemmed words. Defaults to None, which uses
+                the module wide DEFAULT_STEM_CACHE shared by all stemmers.
+        """
+        self.cache = cache if cache is not None else DEFAULT_STEM_CACHE
+
+    def stem(self, word):
+        """Stem the word based on the Porter Stemmer Rules, using the stem cache for repeated words.
+
+        Args:
+            word (_str_): Input word to be stemmed
+
+        Returns:
+            _str_: stemmed word
+        """
+        if not word:
+            return word
+
+        stem = self.cache.get(word)
+        if stem is None:
+            stem = self._stem(word)
+            self.cache.put(word, stem)
+        return stem
+
+    def stem_many(self, words, workers=None, chunk_size=STEM_CHUNK_SIZE):
+        """Stem a sequence of words, stemming every distinct word only once.
+
+        The vocabulary is deduplicated first. Words missing from the cache are stemmed in a
+        process pool when there is more than one chunk of them, otherwise in this process.
+
+        Args:
+            words (Iterable[str]): Words to stem.
+            workers (int, optional): Number of worker processes. Defaults to None (one per CPU);
+                1 always stems in this process.
+            chunk_size (int, optional): Distinct words per worker task. Defaults to STEM_CHUNK_SIZE.
+
+        Returns:
+            list[str]: The stem of every input word, in input order.
+        """
+        words = list(words)
+        stems = {}
+        missing = []
+        for word in dict.fromkeys(words):
+            stem = self.cache.get(word) if word else word
+            if stem is None:
+                missing.append(word)
+            else:
+                stems[word] = stem
+
+        if missing:
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            if len(chunks) > 1 and workers != 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    missing_stems = [stem for chunk_stems in executor.map(_stem_chunk, chunks) for stem in chunk_stems]
+            else:
+                missing_stems = [self._stem(word) for word in missing]
+
+            for word, stem in zip(missing, missing_stems):
+                self.cache.put(word, stem)
+                stems[word] = stem
+
+        return [stems[word] for word in words]
+
+    def stem_documents(self, collection, workers=None, chunk_size=STEM_CHUNK_SIZE):
+        """Fill the stemmed and filtered+stemmed terms every document is still missing with a single stem_many pass.
+
+        Together with the filtered terms (which documents derive on first access) this precomputes all
+        term variants of a collection, e.g. before indexing it.
+
+        Args:
+            collection (list[Document]): Documents whose _stemmed_terms and _filtered_stemmed_terms are set.
+            workers (int, optional): Number of worker processes, see stem_many. Defaults to None.
+            chunk_size (int, optional): Distinct words per worker task. Defaults to STEM_CHUNK_SIZE.
+        """
+        missing = []
+        for doc in collection:
+            if doc._stemmed_terms is None:
+                missing.append((doc, '_stemmed_terms', doc.terms))
+            if doc._filtered_stemmed_terms is None:
+                missing.append((doc, '_filtered_stemmed_terms', _document_terms(doc, stopword_filtered=True)))
+
+        stems = iter(self.stem_many((t.lower() for _, _, terms in missing for t in terms),
+                                    workers=workers, chunk_size=chunk_size))
+        for doc, attribute, terms in missing:
+            setattr(doc, attribute, [next(stems) for _ in terms])
+
+    def _stem(self, word):
+        """Apply the Porter Stemmer Rules to a non-empty word without consulting the cache."""
+        # Suffixes are matched on a lowercase key, while the stem keeps the letters of the input word
+        key = _fold_suffix_key(word)
+
+        # Apply Step_1A Rules
+        for suffix, replacement, _ in self.STEP1A_RULES:
+            if key.endswith(suffix):
+                k = len(word) - len(suffix)
+                word, key = word[:k] + replacement, key[:k] + replacement
+                break
+
+        # Apply Step_1B Rules
+        shape = _WordShape(word)
+        for i, (suffix, replacement, condition) in enumerate(self.STEP1B_RULES):
+            k = len(word) - len(suffix)
+            applied = key.endswith(suffix) and condition(word, shape, k)
+
+            # Logic that handles special case words like feed, deed, etc.
+            if not applied and suffix in key:
+                return word
+
+            if applied:
+                word, key = word[:k] + replacement, key[:k] + replacement
+                if i in (1, 2):
+                    for ext_suffix, ext_replacement in self.STEP1B_RULES_EXT:
+                        if key.endswith(ext_suffix):
+                            k = len(word) - len(ext_suffix)
+                            word, key = word[:k] + ext_replacement, key[:k] + ext_replacement
+
+                    shape = _WordShape(word)
+                    k = len(word)
+                    if shape.ends_with_double_consonant(word, k) and word[-1].lower() not in 'lsz':
+                        word, key = word[:-1], key[:-1]
+                    elif shape.measure[k] == 1 and shape.ends_with_cvc(word, k):
+                        word, key = word + 'e', key + 'e'
+                shape = _WordShape(word)
+                break
+
+        for key_length, dispatch in self.SUBRULES:
+            for suffix, replacement, condition in dispatch.get(key[-key_length:], ()):
+                if key.endswith(suffix):
+                    k = len(word) - len(suffix)
+                    if condition(word, shape, k):
+                        word, key = word[:k] + replacement, key[:k] + replacement
+                        shape = _WordShape(word)
+                        break
+
+        return word
+
+
+def _stem_chunk(words):
+    """Stem a chunk of distinct words in a worker process of PorterStemmer.stem_many."""
+    stemmer = PorterStemmer(cache=StemCache(maxsize=0))
+    return [stemmer._stem(word) if word else word for word in words]
+
+
+def _read_varint(data, pos):
+    """Decode the varint at data[pos] and return it with the position after it."""
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value = byte & 0x7f
+    shift = 7
+    while True:
+        pos += 1
+        byte = data[pos]
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+def _write_varint(data, value):
+    """Append value to the bytearray data as a varint."""
+    while value > 0x7f:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+class Postings:
+    """
+    Compact postings list of a term: (doc_id, tf) pairs, sorted by doc_id, stored as varints in a bytearray.
+
+    Every posting is the gap to the previous doc_id (the first from 0) followed by the term
+    frequency, both in 7 bit groups with the high bit set on all but the last byte. Most postings
+    take two bytes, where a (doc_id, tf) tuple in a list takes around 100. Iterating decodes lazily.
+
+    Attributes:
+        data (bytearray): The encoded postings.
+        count (int): Number of postings, the document frequency of the term.
+        last (int): The highest doc_id in the list.
+    """
+    __slots__ = ('data', 'count', 'last', '_skips')
+
+    def __init__(self, postings=()) -> None:
+        """Initialize the postings list.
+
+        Args:
+            postings (Iterable[tuple[int, int]], optional): (doc_id, tf) pairs sorted by doc_id. Defaults to ().
+        """
+        self.data = bytearray()
+        self.count = 0
+        self.last = 0
+        self._skips = None
+        for doc_id, tf in postings:
+            self.append(doc_id, tf)
+
+    @classmethod
+    def from_bytes(cls, data, count, last, skips=None):
+        """Wrap already encoded postings, e.g. read from an index file.
+
+        Args:
+            data (bytes): The encoded postings.
+            count (int): Number of postings in data.
+            last (int): The highest doc_id in data.
+            skips (tuple[array, array], optional): The skip table of data. Defaults to None (built on demand).
+
+        Returns:
+            Postings: The postings list.
+        """
+        postings = cls()
+        postings.data = bytearray(data)
+        postings.count = count
+        postings.last = last
+        postings._skips = skips
+        return postings
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Encode a whole postings list at once, faster than appending the postings one by one.
+
+        Args:
+            pairs (list[int]): Flat doc_id, tf, doc_id, tf, ... list, sorted by doc_id.
+
+        Returns:
+            Postings: The postings list.
+        """
+        postings = cls()
+        data = postings.data
+        last = 0
+        values = iter(pairs)
+        for doc_id, tf in zip(values, values):
+            gap = doc_id - last
+            if gap <= 0 and data:
+                raise ValueError(f"doc_id {doc_id} is not after {last}")
+            # Most gaps and term frequencies fit in one byte
+            if gap < 0x80:
+                data.append(gap)
+            else:
+                _write_varint(data, gap)
+            if tf < 0x80:
+                data.append(tf)
+            else:
+                _write_varint(data, tf)
+            last = doc_id
+        postings.count = len(pairs) // 2
+        postings.last = last
+        return postings
+
+    def skips(self):
+        """Returns the skip table of the list, building it on first use.
+
+        Entry j describes posting number (j + 1) * POSTINGS_SKIP_INTERVAL: the doc_id of the posting
+        before it, which its gap is relative to, and its byte offset in data.
+
+        Returns:
+            tuple[array, array]: The doc_ids before and the byte offsets of the skip targets.
+        """
+        if self._skips is None:
+            bases = array('I')
+            offsets = array('I')
+            data = self.data
+            doc_id = pos = 0
+            for i in range(self.count):
+                if i and i % POSTINGS_SKIP_INTERVAL == 0:
+                    bases.append(doc_id)
+                    offsets.append(pos)
+                gap, pos = _read_varint(data, pos)
+                _, pos = _read_varint(data, pos)
+                doc_id += gap
+            self._skips = (bases, offsets)
+        return self._skips
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        doc_id = value = shift = 0
+        gap = None
+        for byte in self.data:
+            if byte & 0x80:
+                value |= (byte & 0x7f) << shift
+                shift += 7
+                continue
+            value |= byte << shift
+            if gap is None:
+                gap = value
+            else:
+                doc_id += gap
+                yield doc_id, value
+                gap = None
+            value = shift = 0
+
+    def __repr__(self):
+        return f"Postings({list(self)!r})"
+
+    def _write(self, value):
+        _write_varint(self.data, value)
+
+    def append(self, doc_id, tf):
+        """Add a posting after the last one.
+
+        Args:
+            doc_id (int): Document id, higher than every doc_id in the list.
+            tf (int): Term frequency of the term in the document.
+        """
+        if self.count and doc_id <= self.last:
+            raise ValueError(f"doc_id {doc_id} is not after {self.last}")
+        self._write(doc_id - self.last)
+        self._write(tf)
+        self.count += 1
+        self.last = doc_id
+        self._skips = None
+
+    def _reencode(self, postings):
+        self.data = bytearray()
+        self.count = 0
+        self.last = 0
+        for doc_id, tf in postings:
+            self.append(doc_id, tf)
+
+    def insert(self, doc_id, tf):
+        """Add a posting at its position by doc_id.
+
+        Args:
+            doc_id (int): Document id, not yet in the list.
+            tf (int): Term frequency of the term in the document.
+        """
+        if not self.count or doc_id > self.last:
+            self.append(doc_id, tf)
+            return
+        postings = list(self)
+        i = bisect.bisect_left(postings, (doc_id,))
+        if i < len(postings) and postings[i][0] == doc_id:
+            raise ValueError(f"doc_id {doc_id} is already in the postings")
+        postings.insert(i, (doc_id, tf))
+        self._reencode(postings)
+
+    def remove(self, doc_id):
+        """Remove the posting of a document.
+
+        Args:
+            doc_id (int): Document id in the list.
+        """
+        postings = list(self)
+        i = bisect.bisect_left(postings, (doc_id,))
+        if i == len(postings) or postings[i][0] != doc_id:
+            raise ValueError(f"doc_id {doc_id} is not in the postings")
+        del postings[i]
+        self._reencode(postings)
+
+
+class _PostingsCursor:
+    """
+    Reads a Postings list one document at a time and skips ahead with its skip table.
+
+    Attributes:
+        doc_id (int): The current doc_id, sys.maxsize once the list is exhausted.
+        tf (int): Term frequency in the current document.
+    """
+    __slots__ = ('data', 'bases', 'offsets', 'pos', 'index', 'doc_id', 'tf')
+
+    def __init__(self, postings) -> None:
+        """Initialize the cursor on the first posting.
+
+        Args:
+            postings (Postings): The postings list to read.
+        """
+        self.data = postings.data
+        self.bases, self.offsets = postings.skips()
+        self.pos = self.index = self.doc_id = self.tf = 0
+        self.next()
+
+    def next(self):
+        """Move to the next posting."""
+        data = self.data
+        pos = self.pos
+        if pos >= len(data):
+            self.doc_id = sys.maxsize
+            return
+        # Gaps and term frequencies mostly fit in one byte
+        gap = data[pos]
+        if gap < 0x80:
+            pos += 1
+        else:
+            gap, pos = _read_varint(data, pos)
+        tf = data[pos]
+        if tf < 0x80:
+            pos += 1
+        else:
+            tf, pos = _read_varint(data, pos)
+        self.pos = pos
+        self.tf = tf
+        self.doc_id += gap
+        self.index += 1
+
+    def advance(self, target):
+        """Move to the first posting with a doc_id of at least target."""
+        if self.doc_id >= target:
+            return
+        # Jump to the last skip target that still comes before target, if it is ahead of the cursor
+        block = bisect.bisect_left(self.bases, target)
+        if block and block * POSTINGS_SKIP_INTERVAL > self.index:
+            self.pos = self.offsets[block - 1]
+            self.doc_id = self.bases[block - 1]
+            self.index = block * POSTINGS_SKIP_INTERVAL
+        while self.doc_id < target:
+            self.next()
+
+
+class _IndexVariant:
+    """
+    Postings, document frequencies and document norms for one term variant (raw, filtered, stemmed or both).
+
+    The variant is updated in place when documents are added or removed. IDFs are derived from
+    the current document frequencies on lookup. Norms are recomputed at the next search, from the
+    forward lists with the current IDFs, like a fresh build: those of the documents whose terms
+    changed df, or of all documents when N changed, since that changes every IDF.
+
+    Attributes:
+        postings (dict[str, Postings]): Term -> compact list of (doc_id, term frequency), sorted by doc_id.
+        doc_terms (list[tuple[str, ...]]): Distinct terms of every document, None for removed documents.
+        doc_tfs (list[tuple[int, ...]]): Term frequencies of every document, in the order of doc_terms.
+        doc_lengths (list[int]): Number of terms of every document, 0 for removed documents.
+        N (int): Number of indexed documents.
+        total_length (int): Number of terms of all documents.
+    """
+    def __init__(self, documents, stopword_filtered=False, stemmed=False) -> None:
+        """Build the postings of the given documents for the requested variant.
+
+        Args:
+            documents (list[Document]): Documents to index, addressed by their position in the list.
+                None entries are skipped but keep their doc_id.
+            stopword_filtered (bool): If True, index doc.filtered_terms instead of doc.terms.
+            stemmed (bool): If True, index the stemmed terms.
+        """
+        self.stopword_filtered = stopword_filtered
+        self.stemmed = stemmed
+        self.postings = {}
+        self.doc_terms = []
+        self.doc_tfs = []
+        self.doc_lengths = []
+        self.N = 0
+        self.total_length = 0
+
+        # Norms with the N they were computed at and the terms whose df changed since, see _flush
+        self._doc_norms = []
+        self._norms_n = 0
+        self._changed_terms = set()
+        self._max_weights = {}
+
+        # Documents come in doc_id order, so every posting goes at the end: collect each term's
+        # postings as a flat [doc_id, tf, ...] list and encode it once
+        pending = {}
+        for doc_id, doc in enumerate(documents):
+            self.doc_terms.append(None)
+            self.doc_tfs.append(None)
+            self.doc_lengths.append(0)
+            if doc is None:
+                continue
+            # Counter counts in C, in the same first-occurrence order as get_term_freq
+            doc_tf = {sys.intern(term): tf for term, tf in Counter(self._terms(doc)).items()}
+            self.doc_terms[doc_id] = tuple(doc_tf)
+            self.doc_tfs[doc_id] = tuple(doc_tf.values())
+            self.doc_lengths[doc_id] = length = sum(self.doc_tfs[doc_id])
+            self.total_length += length
+            self.N += 1
+            for term, tf in doc_tf.items():
+                pairs = pending.get(term)
+                if pairs is None:
+                    pending[term] = [doc_id, tf]
+                else:
+                    pairs += (doc_id, tf)
+        for term, pairs in pending.items():
+            self.postings[term] = Postings.from_pairs(pairs)
+
+        self._doc_norms = [0.0] * len(self.doc_terms)
+        self._flush_norms(range(len(self.doc_terms)))
+
+    def _terms(self, doc):
+        # Stemmed terms are memoized on the document
+        if self.stemmed:
+            return doc.filtered_stemmed_terms() if self.stopword_filtered else doc.stemmed_terms()
+        return list(map(str.lower, _document_terms(doc, self.stopword_filtered)))
+
+    def add(self, doc_id, doc):
+        """Index a document under the given doc_id.
+
+        Args:
+            doc_id (int): Position of the document in the collection; must not be indexed already.
+            doc (Document): The document to index.
+        """
+        # Interned terms are shared between the postings keys and the forward lists
+        doc_tf = {sys.intern(term): tf for term, tf in get_term_freq(self._terms(doc)).items()}
+        while len(self.doc_terms) <= doc_id:
+            self.doc_terms.append(None)
+            self.doc_tfs.append(None)
+            self.doc_lengths.append(0)
+            self._doc_norms.append(0.0)
+        self.doc_terms[doc_id] = tuple(doc_tf)
+        self.doc_tfs[doc_id] = tuple(doc_tf.values())
+        self.doc_lengths[doc_id] = sum(doc_tf.values())
+        self.total_length += self.doc_lengths[doc_id]
+
+        for term, tf in doc_tf.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = Postings()
+            postings.insert(doc_id, tf)
+        self._changed_terms.update(doc_tf)
+
+        self.N += 1
+        self._max_weights.clear()
+
+    def remove(self, doc_id):
+        """Drop a document from the postings.
+
+        Args:
+            doc_id (int): The doc_id the document was indexed under.
+        """
+        doc_terms = self.doc_terms[doc_id]
+        if doc_terms is None:
+            return
+        self.doc_terms[doc_id] = None
+        self.doc_tfs[doc_id] = None
+        self.total_length -= self.doc_lengths[doc_id]
+        self.doc_lengths[doc_id] = 0
+        self._doc_norms[doc_id] = 0.0
+
+        for term in doc_terms:
+            postings = self.postings[term]
+            postings.remove(doc_id)
+            if not postings:
+                del self.postings[term]
+        self._changed_terms.update(doc_terms)
+
+        self.N -= 1
+        self._max_weights.clear()
+
+    def _flush(self):
+        # A new N changes every idf, a new df the idf of one term and so the norms of its documents,
+        # which include the documents added since
+        if self.N != self._norms_n:
+            doc_ids = range(len(self.doc_terms))
+        else:
+            doc_ids = set()
+            for term in self._changed_terms:
+                doc_ids.update(doc_id for doc_id, _ in self.postings.get(term, ()))
+        self._flush_norms(doc_ids)
+
+    def _flush_norms(self, doc_ids):
+        # Summed the same way for every document and every update, so the norms equal those of a fresh build
+        idfs = self.idfs
+        for doc_id in doc_ids:
+            doc_terms = self.doc_terms[doc_id]
+            if doc_terms is None:
+                continue
+            norm = 0.0
+            for term, tf in zip(doc_terms, self.doc_tfs[doc_id]):
+                weight = tf * idfs[term]
+                norm += weight * weight
+            self._doc_norms[doc_id] = math.sqrt(norm) if norm > 0 else 0.0
+        self._norms_n = self.N
+        self._changed_terms.clear()
+
+    def idf(self, term):
+        """Returns the inverse document frequency log(N / df) of a term, 0.0 for unknown terms."""
+        postings = self.postings.get(term)
+        return math.log(self.N / len(postings)) if postings else 0.0
+
+    @property
+    def idfs(self):
+        """dict[str, float]: Term -> inverse document frequency log(N / df)."""
+        return {t: math.log(self.N / len(postings)) for t, postings in self.postings.items()}
+
+    @property
+    def avg_length(self):
+        """float: Average number of terms of the indexed documents."""
+        return self.total_length / self.N if self.N else 0.0
+
+    def norm(self, doc_id):
+        """Returns the Euclidean norm of the tf * idf vector of a document.
+
+        Args:
+            doc_id (int): The doc_id of the document.
+
+        Returns:
+            float: The norm, 0.0 for removed documents.
+        """
+        if self._changed_terms or self.N != self._norms_n:
+            self._flush()
+        return self._doc_norms[doc_id]
+
+    def max_weight(self, term):
+        """Returns the largest tf / norm of a term over its documents, computed on first use until the next update.
+
+        Multiplied by the idf of the term, this bounds the share of any normalized document vector
+        that falls on the term, which is what the pruning in InvertedIndex.search needs.
+        """
+        weight = self._max_weights.get(term)
+        if weight is None:
+            weight = 0.0
+            for doc_id, tf in self.postings.get(term, ()):
+                norm = self.norm(doc_id)
+                if norm != 0.0 and tf / norm > weight:
+                    weight = tf / norm
+            self._max_weights[term] = weight
+        return weight
+
+    @property
+    def doc_norms(self):
+        """list[float]: Norm of every doc_id, recomputed where needed after an update."""
+        if self._changed_terms or self.N != self._norms_n:
+            self._flush()
+        return self._doc_norms
+
+
+class _MatrixVariant:
+    """
+    One term variant of a collection as a CSR doc-term matrix for vectorized vector space search.
+
+    Row d holds the L2 normalized tf * idf vector of document d, so the cosine scores of a query are
+    one sparse matrix-vector product with the normalized query vector, and those of a batch of queries
+    one matrix-matrix product. Scores equal the pure Python search up to floating point rounding.
+
+    Attributes:
+        term_ids (dict[str, int]): Term -> matrix column.
+        matrix (scipy.sparse.csr_matrix): Documents x terms matrix.
+        generation (int): InvertedIndex.generation the matrix was built at.
+    """
+    def __init__(self, variant, n_docs, generation=0) -> None:
+        """Build the matrix from the postings of an index variant.
+
+        Args:
+            variant (_IndexVariant): Postings, IDFs and norms to build from.
+            n_docs (int): Number of rows (doc_ids, including removed documents).
+            generation (int, optional): Generation of the index. Defaults to 0.
+
+        Raises:
+            ImportError: If NumPy or SciPy is not installed.
+        """
+        if np is None:
+            raise ImportError("The vectorized search backend requires NumPy and SciPy")
+        self.generation = generation
+        self.term_ids = {}
+        rows = array('q')
+        columns = array('q')
+        values = array('d')
+        norms = variant.doc_norms
+        for term, postings in variant.postings.items():
+            column = self.term_ids[term] = len(self.term_ids)
+            idf = variant.idf(term)
+            for doc_id, tf in postings:
+                if norms[doc_id] != 0.0:
+                    rows.append(doc_id)
+                    columns.append(column)
+                    values.append(tf * idf / norms[doc_id])
+        self.matrix = sparse.csr_matrix((np.frombuffer(values, dtype=np.float64),
+                                         (np.frombuffer(rows, dtype=np.int64), np.frombuffer(columns, dtype=np.int64))),
+                                        shape=(n_docs, len(self.term_ids)))
+
+    def scores(self, queries):
+        """Score every document against a batch of weighted queries.
+
+        Args:
+            queries (list[tuple[dict[str, float], float]]): Term weights and norm of every query.
+
+        Returns:
+            numpy.ndarray: Documents x queries array of cosine scores.
+        """
+        rows, columns, values = [], [], []
+        for column, (weights, norm) in enumerate(queries):
+            for term, weight in weights.items():
+                row = self.term_ids.get(term)
+                if row is not None and weight != 0.0:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(weight / norm)
+        query_matrix = sparse.csc_matrix((values, (rows, columns)), shape=(len(self.term_ids), len(queries)))
+        return (self.matrix @ query_matrix).toarray()
+
+    @staticmethod
+    def hits(scores, top_k=None):
+        """Select the documents with a nonzero score, only the top_k of them if given.
+
+        Args:
+            scores (numpy.ndarray): Score of every doc_id.
+            top_k (int, optional): Number of hits to keep. Defaults to None (all).
+
+        Returns:
+            list[tuple[float, int]]: (score, doc_id) hits by descending score, ties in doc_id order.
+        """
+        doc_ids = np.flatnonzero(scores > 0.0)
+        if top_k is not None and len(doc_ids) > top_k:
+            if top_k <= 0:
+                return []
+            hit_scores = scores[doc_ids]
+            kth = np.partition(hit_scores, len(hit_scores) - top_k)[len(hit_scores) - top_k]
+            # Everything above the k-th score, then the ties with it in doc_id order
+            above = doc_ids[hit_scores > kth]
+            ties = doc_ids[hit_scores == kth][:top_k - len(above)]
+            doc_ids = np.sort(np.concatenate((above, ties)))
+        hit_scores = scores[doc_ids]
+        order = np.lexsort((doc_ids, -hit_scores))
+        return list(zip(hit_scores[order].tolist(), doc_ids[order].tolist()))
+
+
+def _decode_positions(data, pos, count):
+    """Decode count gap encoded positions from data[pos:]."""
+    positions = []
+    position = 0
+    for _ in range(count):
+        # Gaps between positions mostly fit in one byte
+        gap = data[pos]
+        if gap < 0x80:
+            pos += 1
+        else:
+            gap, pos = _read_varint(data, pos)
+        position += gap
+        positions.append(position)
+    return positions
+
+
+def _follow(starts, positions, offset):
+    """Keep the starts that have a position offset terms after them, merging two sorted lists.
+
+    The shorter list of starts leads, the positions are only probed with binary searches that never move back.
+    """
+    kept = []
+    lo = 0
+    end = len(positions)
+    for start in starts:
+        lo = bisect.bisect_left(positions, start + offset, lo)
+        if lo == end:
+            break
+        if positions[lo] == start + offset:
+            kept.append(start)
+    return kept
+
+
+class _PositionalVariant:
+    """
+    Term positions of one term variant for phrase and proximity queries.
+
+    The positions of a term in a document are stored like postings, as varint gaps, in one bytearray
+    per term that holds the documents in the order of the term's postings list, with the byte offset
+    of every document in an array. A query walks the postings of its terms with their skip tables,
+    led by the rarest term, and decodes positions only in the documents that have every term. Those
+    position lists are then merged, led by the rarest term again, so a phrase costs about as much as
+    the positions of its rarest term.
+
+    Attributes:
+        variant (_IndexVariant): The index variant whose postings the positions follow.
+        positions (dict[str, tuple[bytearray, array]]): Term -> encoded positions and the byte offset
+            of every posting of the term in them.
+        generation (int): InvertedIndex.generation the positions were built at.
+    """
+    def __init__(self, variant, documents, generation=0) -> None:
+        """Record the positions of every term of the variant.
+
+        Args:
+            variant (_IndexVariant): The index variant of the documents.
+            documents (list[Document]): The indexed documents in doc_id order, None for removed ones.
+            generation (int, optional): Generation of the index. Defaults to 0.
+        """
+        self.variant = variant
+        self.generation = generation
+        self.positions = {}
+        for doc in documents:
+            if doc is None:
+                continue
+            doc_positions = defaultdict(list)
+            for position, term in enumerate(variant._terms(doc)):
+                doc_positions[term].append(position)
+            for term, term_positions in doc_positions.items():
+                entry = self.positions.get(term)
+                if entry is None:
+                    entry = self.positions[term] = (bytearray(), array('I'))
+                data, offsets = entry
+                offsets.append(len(data))
+                last = 0
+                for position in term_positions:
+                    _write_varint(data, position - last)
+                    last = position
+
+    def count(self, phrases, distances):
+        """Count the matches of phrases joined by NEAR operators in every document.
+
+        Args:
+            phrases (list[tuple[str, ...]]): The phrases, each a non-empty tuple of terms.
+            distances (list[int]): Most terms allowed between the match so far and the next phrase, in either order.
+
+        Returns:
+            dict[int, int]: doc_id -> number of matches, for the documents with at least one.
+        """
+        postings = self.variant.postings
+        terms = list(dict.fromkeys(term for phrase in phrases for term in phrase))
+        if not all(term in self.positions for term in terms):
+            return {}
+        if len(phrases) == 1 and len(terms) == 1 and len(phrases[0]) == 1:
+            # A single term matches once per occurrence
+            return dict(postings[terms[0]])
+
+        # The rarest term leads, the other cursors skip to its documents
+        terms.sort(key=lambda term: len(postings[term]))
+        cursors = [_PostingsCursor(postings[term]) for term in terms]
+        lead = cursors[0]
+        counts = {}
+        while lead.doc_id != sys.maxsize:
+            doc_id = lead.doc_id
+            for cursor in cursors[1:]:
+                cursor.advance(doc_id)
+                if cursor.doc_id != doc_id:
+                    lead.advance(cursor.doc_id)
+                    break
+            else:
+                doc_positions = {}
+                for term, cursor in zip(terms, cursors):
+                    data, offsets = self.positions[term]
+                    doc_positions[term] = _decode_positions(data, offsets[cursor.index - 1], cursor.tf)
+                count = self._count_matches(phrases, distances, doc_positions)
+                if count:
+                    counts[doc_id] = count
+                lead.next()
+        return counts
+
+    @classmethod
+    def _count_matches(cls, phrases, distances, doc_positions):
+        """Returns the number of distinct (first, last) position spans matching the query in one document."""
+        spans = cls._phrase_spans(phrases[0], doc_positions)
+        for phrase, distance in zip(phrases[1:], distances):
+            if not spans:
+                break
+            spans = cls._near_spans(spans, cls._phrase_spans(phrase, doc_positions), distance)
+        return len(spans)
+
+    @staticmethod
+    def _phrase_spans(phrase, doc_positions):
+        """Returns the (first, last) positions of every occurrence of a phrase, in order."""
+        # Starts of the phrase implied by its rarest term, kept where every other term is at its offset
+        rarest = min(range(len(phrase)), key=lambda i: len(doc_positions[phrase[i]]))
+        starts = [position - rarest for position in doc_positions[phrase[rarest]] if position >= rarest]
+        for offset, term in enumerate(phrase):
+            if offset != rarest and starts:
+                starts = _follow(starts, doc_positions[term], offset)
+        return [(start, start + len(phrase) - 1) for start in starts]
+
+    @staticmethod
+    def _near_spans(left, right, distance):
+        """Returns the spans covering a left and a right span with at most distance terms between them, in either order."""
+        if not right:
+            return []
+        right_starts = [start for start, _ in right]
+        longest = max(end - start for start, end in right)
+        spans = set()
+        for start, end in left:
+            # Right spans starting after the left one ends
+            lo = bisect.bisect_right(right_starts, end)
+            hi = bisect.bisect_right(right_starts, end + 1 + distance)
+            for _, right_end in right[lo:hi]:
+                spans.add((start, right_end))
+            # Right spans ending before the left one starts
+            lo = bisect.bisect_left(right_starts, start - 1 - distance - longest)
+            hi = bisect.bisect_left(right_starts, start)
+            for right_start, right_end in right[lo:hi]:
+                if start - 1 - distance <= right_end < start:
+                    spans.add((right_start, end))
+        return sorted(spans)
+
+
+def _gallop_intersect(small, large):
+    """Returns the doc_ids of the sorted list small that are also in the sorted list large.
+
+    Every lookup gallops ahead of the previous one in steps of 1, 2, 4, ... and binary searches the
+    last step, so it costs the log of the distance skipped instead of the log of the list length.
+    """
+    kept = []
+    lo = 0
+    end = len(large)
+    for doc_id in small:
+        hi = lo
+        step = 1
+        while hi < end and large[hi] < doc_id:
+            lo = hi + 1
+            hi += step
+            step <<= 1
+        lo = bisect.bisect_left(large, doc_id, lo, min(hi, end))
+        if lo == end:
+            break
+        if large[lo] == doc_id:
+            kept.append(doc_id)
+    return kept
+
+
+class _BooleanQueryParser:
+    """
+    Recursive descent parser of boolean queries into a tree of nested tuples.
+
+    From the loosest to the tightest binding:
+        query   := and ('OR' and)*
+        and     := not (['AND'] not)*        adjacent operands are joined by AND
+        not     := 'NOT' not | operand
+        operand := '(' query ')' | '"' phrase query '"' | word
+
+    The operators are uppercase, so the words and, or and not are still terms. The nodes are
+    ('term', term), ('phrase', phrases, distances), ('and', children), ('or', children) and ('not', child),
+    with the words normalized like every query, so equivalent queries give equal trees.
+    """
+    _TOKEN = re.compile(r'"[^"]*"|[()]|[^\s()"]+')
+    _OPERATORS = ('AND', 'OR', 'NOT', '(', ')')
+
+    def __init__(self, index, stemmed=False) -> None:
+        """Initialize the parser.
+
+        Args:
+            index (InvertedIndex): Splits words and phrases into terms with its tokenizer.
+            stemmed (bool, optional): Stem the terms. Defaults to False.
+        """
+        self.index = index
+        self.stemmed = stemmed
+        self.tokens = []
+        self.pos = 0
+
+    def parse(self, query):
+        """Parse a boolean query.
+
+        Args:
+            query (str): The query.
+
+        Returns:
+            tuple | None: The root node, None for a query without terms.
+
+        Raises:
+            ValueError: If the query is malformed.
+        """
+        self.tokens = []
+        for token in self._TOKEN.findall(query):
+            if token in self._OPERATORS:
+                self.tokens.append(token)
+            elif token.startswith('"'):
+                phrases, distances = self.index._phrase_query(token[1:-1], self.stemmed)
+                if phrases[0]:
+                    self.tokens.append(('phrase', phrases, distances))
+            else:
+                # A word the tokenizer splits, like "wolf's", needs all its parts; punctuation alone is dropped
+                terms = self.index._query_terms([token], self.stemmed)[0]
+                if terms:
+                    self.tokens.append(self._join('and', [('term', term) for term in terms]))
+        self.pos = 0
+        if not self.tokens:
+            return None
+        node = self._query()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.pos]!r} in boolean query {query!r}")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    @staticmethod
+    def _join(operator, children):
+        # Nested operators of the same kind are flattened and a single child stands for itself
+        flat = []
+        for child in children:
+            flat.extend(child[1] if child[0] == operator else [child])
+        return flat[0] if len(flat) == 1 else (operator, tuple(flat))
+
+    def _query(self):
+        children = [self._and()]
+        while self._peek() == 'OR':
+            self.pos += 1
+            children.append(self._and())
+        return self._join('or', children)
+
+    def _and(self):
+        children = [self._not()]
+        while self._peek() not in (None, 'OR', ')'):
+            if self._peek() == 'AND':
+                self.pos += 1
+            children.append(self._not())
+        return self._join('and', children)
+
+    def _not(self):
+        if self._peek() == 'NOT':
+            self.pos += 1
+            return ('not', self._not())
+        return self._operand()
+
+    def _operand(self):
+        token = self._peek()
+        if token is None or token in ('AND', 'OR', ')'):
+            raise ValueError(f"Expected a term, phrase or '(' but got {'the end' if token is None else repr(token)}")
+        self.pos += 1
+        if token == '(':
+            node = self._query()
+            if self._peek() != ')':
+                raise ValueError("Missing ')' in boolean query")
+            self.pos += 1
+            return node
+        return token
+
+
+class _TitleField:
+    """
+    Postings and lengths of the document titles, the second field of BM25F ranking.
+
+    Attributes:
+        postings (dict[str, Postings]): Term -> (doc_id, term frequency in the title), sorted by doc_id.
+        doc_lengths (list[int]): Number of title terms of every doc_id.
+        avg_length (float): Average number of title terms of the indexed documents.
+        generation (int): InvertedIndex.generation the field was built at.
+    """
+    def __init__(self, documents, tokenizer, stemmed=False, generation=0) -> None:
+        """Index the titles of the documents.
+
+        Args:
+            documents (list[Document]): The indexed documents in doc_id order, None for removed ones.
+            tokenizer (Tokenizer): Splits the titles into terms, like queries.
+            stemmed (bool, optional): Index stemmed terms. Defaults to False.
+            generation (int, optional): Generation of the index. Defaults to 0.
+        """
+        self.generation = generation
+        self.postings = {}
+        titles = [tokenizer.tokenize(doc.title or "") if doc is not None else [] for doc in documents]
+        if stemmed:
+            stems = iter(PorterStemmer().stem_many([t for terms in titles for t in terms], workers=1))
+            titles = [[next(stems) for _ in terms] for terms in titles]
+        self.doc_lengths = [len(terms) for terms in titles]
+        for doc_id, terms in enumerate(titles):
+            for term, tf in get_term_freq(terms).items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = Postings()
+                postings.append(doc_id, tf)
+        n_docs = sum(doc is not None for doc in documents)
+        self.avg_length = sum(self.doc_lengths) / n_docs if n_docs else 0.0
+
+
+def _bm25_hits(query_terms, index, title=None, k1=BM25_K1, b=BM25_B, title_boost=BM25_TITLE_BOOST):
+    """Score the documents with BM25F, term at a time over the postings of the query terms.
+
+    The term frequencies of a document's text and title are normalized by their length relative to
+    the average of their field, weighted and added before the k1 saturation. IDFs
+    log(1 + (N - df + 0.5) / (df + 0.5)) come from the document frequencies of the text, a term that
+    only occurs in titles does not score. Lengths and averages are kept by the index, so the only
+    work per query is one pass over the postings of its terms.
+
+    Args:
+        query_terms (list[str]): The query terms; a repeated term counts once per occurrence.
+        index (_IndexVariant | _MappedVariant): Text postings, document lengths and N.
+        title (_TitleField, optional): Title postings and lengths. Defaults to None (text only).
+        k1 (float, optional): Term frequency saturation. Defaults to BM25_K1.
+        b (float, optional): Length normalization, 0.0 for none and 1.0 for full. Defaults to BM25_B.
+        title_boost (float, optional): Weight of a title occurrence relative to one in the text. Defaults to BM25_TITLE_BOOST.
+
+    Returns:
+        list[tuple[float, int]]: Score and doc_id of every document with a nonzero score.
+    """
+    scores = {}
+    # Length normalization 1 - b + b * length / average as base + slope * length
+    base = 1.0 - b
+    slope = b / index.avg_length if index.avg_length else 0.0
+    lengths = index.doc_lengths
+    if title is not None and title_boost:
+        title_slope = b / title.avg_length if title.avg_length else 0.0
+        title_lengths = title.doc_lengths
+    else:
+        title = None
+
+    for term, qtf in get_term_freq(query_terms).items():
+        postings = index.postings.get(term)
+        if not postings:
+            continue
+        df = len(postings)
+        weight = qtf * math.log(1.0 + (index.N - df + 0.5) / (df + 0.5))
+
+        tfs = {doc_id: tf / (base + slope * lengths[doc_id]) for doc_id, tf in postings}
+        if title is not None:
+            for doc_id, tf in title.postings.get(term, ()):
+                tfs[doc_id] = tfs.get(doc_id, 0.0) + title_boost * tf / (base + title_slope * title_lengths[doc_id])
+
+        for doc_id, tf in tfs.items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf * (k1 + 1.0) / (k1 + tf)
+
+    return [(score, doc_id) for doc_id, score in scores.items() if score > 0.0]
+
+
+def _top_k_hits(index, query_weights, query_norm, top_k):
+    """Find the top_k hits document at a time, skipping documents that cannot make it (MaxScore).
+
+    Every query term gets an upper bound on the score it can add to a document, from its idf and
+    largest tf / norm. Once the k-th best score is above what the terms with the smallest bounds
+    reach together, those terms are only looked up for documents found through the others, with
+    skips over their postings, and a document is dropped as soon as its partial score plus the
+    bounds of the terms not looked up yet cannot reach the k-th best. The documents that are left
+    are scored like in the exhaustive search, term by term in query order, so scores are equal.
+
+    Args:
+        index (_IndexVariant): The variant to search, or one with the same lookups.
+        query_weights (dict[str, float]): Query term -> augmented tf * idf weight, in query order.
+        query_norm (float): Norm of the query vector.
+        top_k (int): Number of hits to find.
+
+    Returns:
+        list[tuple[float, int]]: Up to top_k hits as (score, doc_id).
+    """
+    if top_k <= 0:
+        return []
+
+    terms = []
+    for position, (term, q_weight) in enumerate(query_weights.items()):
+        postings = index.postings.get(term)
+        if postings and q_weight != 0.0:
+            idf = index.idf(term)
+            terms.append((q_weight * idf * index.max_weight(term) / query_norm, position, q_weight, idf, postings))
+    terms.sort(key=lambda t: t[:2])
+
+    # Parallel lists by ascending bound; cumulative[i] is the most terms 0..i can add to a score together
+    positions = [position for _, position, _, _, _ in terms]
+    weights = [q_weight for _, _, q_weight, _, _ in terms]
+    idfs = [idf for _, _, _, idf, _ in terms]
+    cursors = [_PostingsCursor(postings) for _, _, _, _, postings in terms]
+    cumulative = []
+    total = 0.0
+    for bound, _, _, _, _ in terms:
+        total += bound
+        cumulative.append(total)
+
+    margin = 1.0 + SCORE_BOUND_MARGIN
+    no_contributions = [0.0] * len(query_weights)
+    heap = []
+    threshold = 0.0
+    # Terms before first_essential cannot lift a document into the top_k on their own
+    first_essential = 0
+    essential = list(zip(range(len(cursors)), cursors))
+    while essential:
+        doc_id = min([cursor.doc_id for _, cursor in essential])
+        if doc_id == sys.maxsize:
+            break
+
+        contributions = no_contributions[:]
+        dot = 0.0
+        for i, cursor in essential:
+            if cursor.doc_id == doc_id:
+                contribution = contributions[positions[i]] = weights[i] * (cursor.tf * idfs[i])
+                dot += contribution
+                cursor.next()
+        doc_norm = index.norm(doc_id)
+        if doc_norm == 0.0:
+            continue
+
+        # Look up the other terms, largest bound first, while the document can still make it
+        full = len(heap) == top_k
+        scale = 1.0 / (doc_norm * query_norm)
+        i = first_essential - 1
+        while i >= 0 and not (full and (dot * scale + cumulative[i]) * margin < threshold):
+            cursor = cursors[i]
+            cursor.advance(doc_id)
+            if cursor.doc_id == doc_id:
+                contribution = contributions[positions[i]] = weights[i] * (cursor.tf * idfs[i])
+                dot += contribution
+            i -= 1
+        if i >= 0 or (full and dot * scale * margin < threshold):
+            continue
+
+        # Same summation order as the exhaustive search (adding the 0.0 of absent terms changes nothing)
+        dot = 0.0
+        for contribution in contributions:
+            dot += contribution
+        if not dot:
+            continue
+        hit = (dot / (doc_norm * query_norm), -doc_id)
+        if not full:
+            heapq.heappush(heap, hit)
+        elif hit > heap[0]:
+            heapq.heapreplace(heap, hit)
+        else:
+            continue
+
+        if len(heap) == top_k:
+            threshold = heap[0][0]
+            while first_essential < len(cursors) and cumulative[first_essential] * margin < threshold:
+                first_essential += 1
+                essential = essential[1:]
+
+    return [(score, -neg_doc_id) for score, neg_doc_id in heap]
+
+
+def _score_queries(weighted_queries, index, top_k=None):
+    """Score a batch of queries, decoding the postings of a term shared by several queries only once.
+
+    Queries of more than one term with a top_k go through _top_k_hits, the others are scored term at
+    a time. Every query sums its contributions in its own term order, so its scores are those of a
+    single search.
+
+    Args:
+        weighted_queries (list[tuple[dict[str, float], float]]): Term weights and norm of every query.
+        index (_IndexVariant): The variant to search, or one with the same lookups.
+        top_k (int, optional): Only keep the k best hits of every query. Defaults to None (all).
+
+    Returns:
+        list[list[tuple[float, int]]]: The nonzero (score, doc_id) hits of every query.
+    """
+    pruned = lambda query_weights: top_k is not None and len(query_weights) > 1
+
+    # Decoded postings are kept until the last query using their term
+    pending = defaultdict(int)
+    for query_weights, _ in weighted_queries:
+        if not pruned(query_weights):
+            for term in query_weights:
+                pending[term] += 1
+    decoded = {}
+
+    results = []
+    for query_weights, query_norm in weighted_queries:
+        if query_norm == 0.0:
+            results.append([])
+            continue
+        if pruned(query_weights):
+            results.append(_top_k_hits(index, query_weights, query_norm, top_k))
+            continue
+
+        accum = {}
+        for term, q_weight in query_weights.items():
+            term_postings = decoded.get(term)
+            if term_postings is None:
+                term_postings = index.postings.get(term, [])
+                if pending[term] > 1:
+                    term_postings = decoded[term] = list(term_postings)
+            pending[term] -= 1
+            if not pending[term]:
+                decoded.pop(term, None)
+
+            idf = index.idf(term)
+            for doc_id, doc_tf in term_postings:
+                accum[doc_id] = accum.get(doc_id, 0.0) + q_weight * (doc_tf * idf)
+
+        # Calculate Cosine scores, only documents with a nonzero dot product can score
+        hits = []
+        for doc_id, dot in accum.items():
+            if dot:
+                doc_norm = index.norm(doc_id)
+                if doc_norm != 0.0:
+                    hits.append((dot / (doc_norm * query_norm), doc_id))
+        if top_k is not None:
+            hits = heapq.nlargest(top_k, hits, key=lambda hit: (hit[0], -hit[1]))
+        results.append(hits)
+    return results
+
+
+class _BatchVariant:
+    """
+    The postings, idfs, largest tf / norms and document norms of the terms of a search_many batch.
+
+    Sent to the worker processes of InvertedIndex.search_many instead of the whole variant, it offers
+    the lookups of _IndexVariant that searching needs.
+    """
+    def __init__(self, index, terms) -> None:
+        """
+        Args:
+            index (_IndexVariant): The variant searched.
+            terms (Iterable[str]): Query terms of the batch.
+        """
+        self.postings = {}
+        for term in terms:
+            postings = index.postings.get(term)
+            if postings is not None:
+                self.postings[term] = postings
+        self.idfs = {term: index.idf(term) for term in self.postings}
+        self.max_weights = {term: index.max_weight(term) for term in self.postings}
+        self.doc_norms = index.doc_norms
+
+    def idf(self, term):
+        """Returns the inverse document frequency of a batch term, 0.0 for terms not in the collection."""
+        return self.idfs.get(term, 0.0)
+
+    def max_weight(self, term):
+        """Returns the largest tf / norm of a batch term over its documents, 0.0 for terms not in the collection."""
+        return self.max_weights.get(term, 0.0)
+
+    def norm(self, doc_id):
+        """Returns the norm of the tf * idf vector of a document."""
+        return self.doc_norms[doc_id]
+
+
+# Batch a search_many worker process scores queries against
+_search_batch = None
+
+
+def _init_search_worker(batch):
+    """Receive the _BatchVariant in a worker process of InvertedIndex.search_many."""
+    global _search_batch
+    _search_batch = batch
+
+
+def _search_chunk(weighted_queries, top_k):
+    """Score a chunk of weighted queries in a worker process of InvertedIndex.search_many."""
+    return _score_queries(weighted_queries, _search_batch, top_k)
+
+
+class QueryCache:
+    """
+    A bounded cache of search results with least-recently-used eviction and a time to live.
+
+    InvertedIndex keys the results by the normalized query terms, the search flags and its
+    generation, so a result is never served after the index changed; it just ages out.
+
+    Attributes:
+        maxsize (int): Maximum number of cached results (0 disables caching).
+        max_age (float | None): Seconds a result is served after it was stored, None for no limit.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to be searched, expired results included.
+        expired (int): Number of results dropped because they were older than max_age.
+    """
+    def __init__(self, maxsize=QUERY_CACHE_SIZE, max_age=QUERY_CACHE_MAX_AGE) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of cached results. Defaults to QUERY_CACHE_SIZE.
+            max_age (float, optional): Seconds a result is served. Defaults to QUERY_CACHE_MAX_AGE.
+        """
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        # key -> (time stored, result)
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key):
+        """Returns the cached result for key (marking it as recently used) or None."""
+        try:
+            stored, result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        if self.max_age is not None and time.monotonic() - stored > self.max_age:
+            del self._results[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store the result for key, evicting the least recently used results above maxsize."""
+        if self.maxsize <= 0:
+            return
+        self._results[key] = (time.monotonic(), result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached results and reset the counters."""
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def info(self):
+        """Returns the cache statistics.
+
+        Returns:
+            dict: hits, misses, hit_rate, expired, size, maxsize and max_age of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expired': self.expired,
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+            'max_age': self.max_age,
+        }
+
+
+class FuzzyVocabulary:
+    """
+    The vocabulary of an index variant for finding the terms within a few edits of a query term.
+
+    The sorted terms form an implicit trie: walking them in order, a term shares the rows of the
+    Levenshtein table of its common prefix with the previous term, so only the rows of the rest are
+    computed. Once no cell of a row is within the limit, no term starting with that prefix can be
+    either, and all of them are skipped with one binary search.
+
+    Short prefixes are always within a few edits of something, so the first levels of the trie would
+    be walked completely. Instead the search is split in two (forward-backward, Mihov and Schulz): an
+    alignment within k edits has at most k // 2 of them in the first half of the query term or fewer
+    than the rest in the second half. One walk over the terms bounds the edits in the first half, one
+    over the reversed terms the edits in the second half, and both stay in a few narrow ranges of terms.
+
+    Attributes:
+        terms (list[str]): The vocabulary, sorted.
+        generation (int): InvertedIndex.generation the vocabulary was built at.
+    """
+    def __init__(self, terms, generation=0) -> None:
+        """Initialize the vocabulary.
+
+        Args:
+            terms (Iterable[str]): The distinct terms.
+            generation (int, optional): Generation of the index. Defaults to 0.
+        """
+        self.terms = sorted(terms)
+        self.generation = generation
+        self._reversed_terms = None
+
+    def __len__(self):
+        return len(self.terms)
+
+    @property
+    def reversed_terms(self):
+        """list[str]: Every term spelled backwards, sorted; built on first use."""
+        if self._reversed_terms is None:
+            self._reversed_terms = sorted(term[::-1] for term in self.terms)
+        return self._reversed_terms
+
+    def search(self, term, max_dist):
+        """Find the terms within max_dist edits (insertions, deletions, substitutions) of term.
+
+        Args:
+            term (str): The possibly misspelled term.
+            max_dist (int): Largest Levenshtein distance of a match.
+
+        Returns:
+            list[tuple[str, int]]: Matching terms and their distance, closest first, ties in term order.
+        """
+        if max_dist < 0:
+            return []
+        half = len(term) // 2
+        matches = dict(self._walk(self.terms, term, max_dist, half, max_dist // 2))
+        # Without a first half the forward walk is not bounded at all and found everything
+        if half and max_dist > 0:
+            suffix_dist = max_dist - 1 - max_dist // 2
+            for word, dist in self._walk(self.reversed_terms, term[::-1], max_dist, len(term) - half, suffix_dist):
+                matches[word[::-1]] = dist
+        return sorted(matches.items(), key=lambda match: (match[1], match[0]))
+
+    @staticmethod
+    def _prefix_end(terms, prefix, lo):
+        """Returns the position of the first term after lo that does not start with prefix."""
+        last = ord(prefix[-1])
+        if last == sys.maxunicode:
+            # No string sorts between the prefix and its successor, scan instead
+            while lo < len(terms) and terms[lo].startswith(prefix):
+                lo += 1
+            return lo
+        return bisect.bisect_left(terms, prefix[:-1] + chr(last + 1), lo)
+
+    @classmethod
+    def _walk(cls, terms, term, max_dist, split, split_dist):
+        """Find the terms within max_dist edits of term, for alignments with at most split_dist edits in term[:split].
+
+        Args:
+            terms (list[str]): Sorted terms to walk.
+            term (str): The query term.
+            max_dist (int): Largest distance of a match.
+            split (int): Length of the query prefix with the tighter bound.
+            split_dist (int): Largest number of edits in the query prefix.
+
+        Returns:
+            list[tuple[str, int]]: Matching terms and their distance (the alignments with more edits
+                in the prefix may or may not be found).
+        """
+        n = len(term)
+        outside = max_dist + 1
+        # rows[d][j] is the distance between the first d characters of the current term and term[:j];
+        # split_reached[d] tells whether a path through those rows already left term[:split] within split_dist
+        rows = [[min(j, outside) for j in range(n + 1)]]
+        split_reached = [split <= split_dist]
+        previous_term = ''
+        matches = []
+        i = 0
+        while i < len(terms):
+            word = terms[i]
+            depth = 0
+            shared = min(len(word), len(previous_term), len(rows) - 1)
+            while depth < shared and word[depth] == previous_term[depth]:
+                depth += 1
+            del rows[depth + 1:]
+            del split_reached[depth + 1:]
+            previous_term = word
+
+            for d in range(depth, len(word)):
+                c = word[d]
+                above = rows[d]
+                # Only cells within max_dist of the diagonal can be within max_dist, the others stay above it
+                row = [outside] * (n + 1)
+                lo = d + 1 - max_dist
+                if lo <= 0:
+                    row[0] = d + 1
+                    lo = 1
+                row_min = row[0]
+                for j in range(lo, min(n, d + 1 + max_dist) + 1):
+                    cell = above[j - 1] + (term[j - 1] != c)
+                    if above[j] < cell:
+                        cell = above[j] + 1
+                    if row[j - 1] < cell:
+                        cell = row[j - 1] + 1
+                    row[j] = cell
+                    if cell < row_min:
+                        row_min = cell
+                if row_min > max_dist:
+                    break
+                reached = split_reached[d] or row[split] <= split_dist
+                if not reached and min(row[:split + 1]) > split_dist:
+                    break
+                rows.append(row)
+                split_reached.append(reached)
+            else:
+                if rows[-1][n] <= max_dist:
+                    matches.append((word, rows[-1][n]))
+                i += 1
+                continue
+            i = cls._prefix_end(terms, word[:d + 1], i + 1)
+
+        return matches
+
+
+class InvertedIndex:
+    """
+    A reusable inverted index over a document collection for boolean and TF IDF vector space search.
+
+    The index of each term variant is built on first use and kept, so repeated queries
+    only touch the postings of the query terms instead of re-reading the whole collection.
+    Documents can be added, removed and updated without rebuilding the built variants.
+
+    Attributes:
+        documents (list[Document]): The indexed documents; doc_ids are positions in this list,
+            removed documents leave a None behind so the other doc_ids stay valid.
+        tokenizer (Tokenizer): Splits queries into terms, like the parser splits documents.
+        generation (int): Incremented on every update, so cached results can tell they are stale.
+        index_file (IndexFile | None): The file a loaded index is mapped from, None for an index built in memory.
+        vectorized (bool): Whether vector space queries are scored with NumPy/SciPy (see _MatrixVariant).
+        cache (QueryCache | None): Results of repeated searches, None to always search.
+    """
+    def __init__(self, collection, tokenizer=None, vectorized=False, cache=None) -> None:
+        """Initialize the index over the given collection.
+
+        Args:
+            collection (list[Document]): The documents to index.
+            tokenizer (Tokenizer, optional): Query tokenizer. Defaults to None (DEFAULT_TOKENIZER).
+            vectorized (bool, optional): Score vector space queries with sparse matrix products.
+                Ignored when NumPy or SciPy is not installed. Defaults to False.
+            cache (QueryCache, optional): Cache for search results. Defaults to None (no caching).
+        """
+        self.documents = list(collection)
+        self.tokenizer = tokenizer if tokenizer is not None else DEFAULT_TOKENIZER
+        self.vectorized = vectorized and np is not None
+        self.generation = 0
+        self.index_file = None
+        self.cache = cache
+        self._variants = {}
+        self._matrices = {}
+        self._vocabularies = {}
+        self._positions = {}
+        self._titles = {}
+        self._doc_ids = {id(doc): doc_id for doc_id, doc in enumerate(self.documents)}
+        # Term and filter versions of every document when it was indexed, see _sync
+        self._versions = [self._versions_of(doc) for doc in self.documents]
+        # The list and the documents for_collection keeps the index up to date with, None otherwise
+        self._source = self._members = None
+
+    @classmethod
+    def for_collection(cls, collection, index=None):
+        """Returns an index over the collection, reusing the given one while the list holds the same documents.
+
+        Documents appended to the list are added to the index, any other change of the list builds a new
+        one with a QueryCache. Documents that get new terms or filtered terms are re-indexed by the searches
+        themselves (see _sync).
+
+        Args:
+            collection (list[Document]): The documents to index.
+            index (InvertedIndex, optional): An index from an earlier call. Defaults to None.
+
+        Returns:
+            InvertedIndex: An up to date index over the collection.
+        """
+        if index is None or index._source is not collection:
+            index = None
+        elif len(collection) != len(index._members) or collection != index._members:
+            # Documents are compared by identity, in C, so checking the list is cheap
+            size = len(index._members)
+            if len(collection) > size and collection[:size] == index._members:
+                index.add_documents(collection[size:])
+                index._members = list(collection)
+            else:
+                index = None
+        if index is None:
+            index = cls(collection, cache=QueryCache())
+            index._source = collection
+            index._members = list(collection)
+        return index
+
+    @classmethod
+    def load(cls, path=INDEX_FILE, cache=None):
+        """Open an index written by save. Only the table of contents and the document table are read,
+        everything else is read from the memory mapped file on demand.
+
+        Args:
+            path (str, optional): Path of the index file. Defaults to INDEX_FILE.
+            cache (QueryCache, optional): Cache for search results. Defaults to None (no caching).
+
+        Returns:
+            InvertedIndex: A read-only index with the variants stored in the file.
+        """
+        index_file = IndexFile(path)
+        index = cls(index_file.documents, tokenizer=index_file.tokenizer, cache=cache)
+        index.index_file = index_file
+        index._variants.update(index_file.variants)
+        return index
+
+    def save(self, path=INDEX_FILE, variants=((False, False), (False, True))):
+        """Write the index to a binary index file that load maps into memory.
+
+        Args:
+            path (str, optional): Destination path. Defaults to INDEX_FILE.
+            variants (Iterable[tuple[bool, bool]], optional): (stopword_filtered, stemmed) variants to store.
+                Defaults to the raw and the stemmed terms.
+        """
+        IndexFile.write(self, path, variants)
+
+    @property
+    def collection(self):
+        """list[Document]: The indexed documents without the removed ones, in doc_id order."""
+        return [doc for doc in self.documents if doc is not None]
+
+    def variant(self, stopword_filtered=False, stemmed=False):
+        """Returns the index of the requested term variant, building it on first use.
+
+        Args:
+            stopword_filtered (bool, optional): Index filtered terms. Defaults to False.
+            stemmed (bool, optional): Index stemmed terms. Defaults to False.
+
+        Returns:
+            _IndexVariant: Postings, IDFs and document norms of the variant.
+        """
+        self._sync()
+        key = (bool(stopword_filtered), bool(stemmed))
+        if key not in self._variants:
+            if self.index_file is not None:
+                raise ValueError(f"{self.index_file.path} has no index for stopword_filtered={key[0]}, stemmed={key[1]}")
+            self._variants[key] = _IndexVariant(self.documents, *key)
+        return self._variants[key]
+
+    def matrix(self, stopword_filtered=False, stemmed=False):
+        """Returns the doc-term matrix of the requested term variant, built on first use and after updates.
+
+        Args:
+            stopword_filtered (bool, optional): Use filtered terms. Defaults to False.
+            stemmed (bool, optional): Use stemmed terms. Defaults to False.
+
+        Returns:
+            _MatrixVariant: CSR matrix of the normalized tf * idf document vectors.
+        """
+        key = (bool(stopword_filtered), bool(stemmed))
+        matrix = self._matrices.get(key)
+        if matrix is None or matrix.generation != self.generation:
+            matrix = self._matrices[key] = _MatrixVariant(self.variant(*key), len(self.documents), self.generation)
+        return matrix
+
+    def fuzzy_vocabulary(self, stopword_filtered=False, stemmed=False):
+        """Returns the vocabulary of the requested term variant for fuzzy matching, rebuilt after updates.
+
+        Args:
+            stopword_filtered (bool, optional): Use filtered terms. Defaults to False.
+            stemmed (bool, optional): Use stemmed terms. Defaults to False.
+
+        Returns:
+            FuzzyVocabulary: The sorted terms of the variant.
+        """
+        key = (bool(stopword_filtered), bool(stemmed))
+        vocabulary = self._vocabularies.get(key)
+        if vocabulary is None or vocabulary.generation != self.generation:
+            vocabulary = self._vocabularies[key] = FuzzyVocabulary(self.variant(*key).postings, self.generation)
+        return vocabulary
+
+    def positions(self, stopword_filtered=False, stemmed=False):
+        """Returns the term positions of the requested term variant, built on first use and after updates.
+
+        Args:
+            stopword_filtered (bool, optional): Use filtered terms. Defaults to False.
+            stemmed (bool, optional): Use stemmed terms. Defaults to False.
+
+        Returns:
+            _PositionalVariant: Gap encoded positions of every term in every document.
+
+        Raises:
+            ValueError: If the index was loaded from a file, which stores no positions.
+        """
+        if self.index_file is not None:
+            raise ValueError(f"The index loaded from {self.index_file.path} has no term positions")
+        key = (bool(stopword_filtered), bool(stemmed))
+        positions = self._positions.get(key)
+        if positions is None or positions.generation != self.generation:
+            positions = self._positions[key] = _PositionalVariant(self.variant(*key), self.documents, self.generation)
+        return positions
+
+    def title_field(self, stemmed=False):
+        """Returns the index of the document titles, built on first use and after updates.
+
+        Args:
+            stemmed (bool, optional): Use stemmed terms. Defaults to False.
+
+        Returns:
+            _TitleField: Postings and lengths of the titles.
+        """
+        title = self._titles.get(bool(stemmed))
+        if title is None or title.generation != self.generation:
+            title = self._titles[bool(stemmed)] = _TitleField(self.documents, self.tokenizer, stemmed, self.generation)
+        return title
+
+    def _fuzzy_terms(self, terms, stopword_filtered, stemmed, fuzzy):
+        """Replace every term by the vocabulary terms within fuzzy edits of it, closest first.
+
+        A term without any match is kept, so it still counts like in an exact search.
+        """
+        vocabulary = self.fuzzy_vocabulary(stopword_filtered, stemmed)
+        expanded = []
+        for term in terms:
+            expanded.extend([match for match, _ in vocabulary.search(term, fuzzy)] or [term])
+        return expanded
+
+    @staticmethod
+    def _versions_of(doc):
+        return None if doc is None else (doc.terms_version, doc.filter_version)
+
+    def _sync(self):
+        """Re-index the documents that got new terms or new filtered terms since they were indexed.
+
+        Every search compares the versions of the documents (see Document.set_terms and
+        Document.set_filtered_terms) with the ones they were indexed at, a pass that costs far less
+        than the search itself. Terms edited in place are not noticed.
+        """
+        if self.index_file is not None:
+            return
+        versions = [None if doc is None else (doc.terms_version, doc.filter_version) for doc in self.documents]
+        if versions == self._versions:
+            return
+        changed = []
+        refiltered = []
+        for doc_id, (old, new) in enumerate(zip(self._versions, versions)):
+            if old != new:
+                (changed if old[0] != new[0] else refiltered).append(doc_id)
+        self._versions = versions
+
+        for doc_id in changed:
+            for index in self._variants.values():
+                index.remove(doc_id)
+                index.add(doc_id, self.documents[doc_id])
+        # New filtered terms only concern the filtered variants; re-indexing a few documents is
+        # cheaper than a rebuild, a new filter over the collection is not
+        filtered = [key for key in self._variants if key[0]]
+        if len(refiltered) * 8 > len(self.documents):
+            for key in filtered:
+                del self._variants[key]
+        else:
+            for doc_id in refiltered:
+                for key in filtered:
+                    self._variants[key].remove(doc_id)
+                    self._variants[key].add(doc_id, self.documents[doc_id])
+        self.generation += 1
+
+    def _check_writable(self):
+        if self.index_file is not None:
+            raise ValueError(f"The index loaded from {self.index_file.path} is read-only")
+
+    def _doc_id(self, doc):
+        doc_id = self._doc_ids.get(id(doc))
+        if doc_id is None:
+            raise KeyError(f"Document {doc.document_id} is not indexed")
+        return doc_id
+
+    def add_documents(self, docs):
+        """Append documents to the index, updating the variants that are already built.
+
+        Args:
+            docs (list[Document]): The new documents.
+
+        Returns:
+            list[int]: The doc_ids of the added documents.
+        """
+        self._check_writable()
+        doc_ids = []
+        for doc in docs:
+            if id(doc) in self._doc_ids:
+                raise ValueError(f"Document {doc.document_id} is already indexed")
+            doc_id = len(self.documents)
+            self.documents.append(doc)
+            self._doc_ids[id(doc)] = doc_id
+            self._versions.append(self._versions_of(doc))
+            for index in self._variants.values():
+                index.add(doc_id, doc)
+            doc_ids.append(doc_id)
+        self.generation += 1
+        return doc_ids
+
+    def remove_document(self, doc):
+        """Remove a document from the index.
+
+        Args:
+            doc (Document): A document of the indexed collection.
+        """
+        self._check_writable()
+        doc_id = self._doc_id(doc)
+        for index in self._variants.values():
+            index.remove(doc_id)
+        self.documents[doc_id] = None
+        self._versions[doc_id] = None
+        del self._doc_ids[id(doc)]
+        self.generation += 1
+
+    def update_document(self, doc):
+        """Re-index a document whose terms changed, keeping its doc_id.
+
+        Args:
+            doc (Document): A document of the indexed collection.
+        """
+        self._check_writable()
+        doc_id = self._doc_id(doc)
+        for index in self._variants.values():
+            index.remove(doc_id)
+            index.add(doc_id, doc)
+        self._versions[doc_id] = self._versions_of(doc)
+        self.generation += 1
+
+    def update_filtered_terms(self):
+        """Drop the stopword filtered variants right away; they are rebuilt on next use.
+
+        Searches notice documents filtered again by themselves (see _sync), this only does it eagerly.
+        """
+        self._check_writable()
+        for key in [key for key in self._variants if key[0]]:
+            del self._variants[key]
+            self._matrices.pop(key, None)
+        self.generation += 1
+
+    def _cache_key(self, kind, terms, stopword_filtered, stemmed, *options):
+        """Returns the query cache key of a search: its kind, normalized terms, flags, options and the generation.
+
+        Every search asks for its key first, so documents changed since the last search are re-indexed here.
+        """
+        self._sync()
+        return (kind, terms, bool(stopword_filtered), bool(stemmed)) + options + (self.generation,)
+
+    def _cache_get(self, key):
+        """Returns a copy of the cached result for key, None if it is not cached or there is no cache."""
+        if self.cache is None:
+            return None
+        result = self.cache.get(key)
+        return list(result) if result is not None else None
+
+    def _cache_put(self, key, result):
+        """Store a copy of a result in the query cache, if any, and return the result."""
+        if self.cache is not None:
+            self.cache.put(key, list(result))
+        return result
+
+    def boolean_search(self, term, stopword_filtered=False, stemmed=False, fuzzy=None):
+        """Count the occurrences of a single term in every document.
 
         Args:
-            url (str): URL to download the plain text book.
-            author (str): Name of the author.
-            origin (str): Source of book title.
-            start_line (int): Line number to start parsing from.
-            end_line (int): Line number to sop parsing (None to go till end).
-            search_pattern (Pattern): Regex pattern to identify chapter divisions.
+            term (str): The term to search for.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem the term and search the stemmed document terms. Defaults to False.
+            fuzzy (int, optional): Also count the terms within this many edits of the term. Defaults to None.
+
+        Returns:
+            list[tuple[int, Document]]: Term frequency and Document for every document, in collection order.
         """
-        self.url = url
-        self.author = author
-        self.origin = origin
-        self.start_line = start_line
-        self.end_line = end_line
-        self.search_pattern = search_pattern
+        term = term.lower()
+        if stemmed:
+            term = PorterStemmer().stem(term)
 
-        # Full Text Helper Variables
-        self.full_text = self._fetch_full_text()
-        self.chapter_text = '\n'.join(self.full_text.splitlines()[self.start_line: self.end_line])
+        key = self._cache_key('boolean', term, stopword_filtered, stemmed, fuzzy)
+        result = self._cache_get(key)
+        if result is None:
+            result = self._cache_put(key, self._boolean_scores(term, stopword_filtered, stemmed, fuzzy))
+        return result
 
-    
-    def _fetch_full_text(self):
-        """Downloads and returns the full text from the URL as a UTF-8 decoded string.
+    def _boolean_scores(self, term, stopword_filtered, stemmed, fuzzy):
+        """Returns the boolean_search result of a normalized term."""
+        index = self.variant(stopword_filtered, stemmed)
+        terms = [term] if fuzzy is None else self._fuzzy_terms([term], stopword_filtered, stemmed, fuzzy)
+
+        # One dict lookup, then a walk over the postings of every term
+        scores = [0] * len(self.documents)
+        for term in terms:
+            for doc_id, tf in index.postings.get(term, []):
+                scores[doc_id] += tf
+
+        return [(score, doc) for score, doc in zip(scores, self.documents) if doc is not None]
+
+    def boolean_search_many(self, terms, stopword_filtered=False, stemmed=False, fuzzy=None):
+        """Count the occurrences of each of many single terms in every document, like boolean_search.
+
+        The terms are stemmed in one pass and the postings of a repeated term are walked once.
+
+        Args:
+            terms (Iterable[str]): The terms to search for.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem the terms and search the stemmed document terms. Defaults to False.
+            fuzzy (int, optional): Also count the terms within this many edits of each term. Defaults to None.
+
+        Returns:
+            list[list[tuple[int, Document]]]: The result of boolean_search for every term, in input order.
         """
-        req = Request(self.url)
-        with urlopen(req) as res:
-            return res.read().decode('utf-8')
-    
-    def _split_chapters(self, chapter_text, search_pattern):
+        terms = [term.lower() for term in terms]
+        if stemmed:
+            terms = PorterStemmer().stem_many(terms, workers=1)
+
+        results = {}
+        for term in dict.fromkeys(terms):
+            key = self._cache_key('boolean', term, stopword_filtered, stemmed, fuzzy)
+            result = self._cache_get(key)
+            if result is None:
+                result = self._cache_put(key, self._boolean_scores(term, stopword_filtered, stemmed, fuzzy))
+            results[term] = result
+
+        return [list(results[term]) for term in terms]
+
+    def _phrase_query(self, query, stemmed=False):
+        """Split a phrase query at its NEAR/k operators.
+
+        Returns:
+            tuple[tuple[tuple[str, ...], ...], tuple[int, ...]]: The terms of every phrase and the k of every operator.
         """
-        Splits the chapter text into separate Document instances using the regex pattern.
+        parts = _NEAR_OPERATOR.split(query)
+        phrases = tuple(tuple(terms) for terms in self._query_terms(parts[::2], stemmed))
+        distances = tuple(int(k) for k in parts[1::2])
+        if distances and not all(phrases):
+            raise ValueError(f"NEAR/k needs a phrase on both sides: {query!r}")
+        return phrases, distances
+
+    def phrase_search(self, query, stopword_filtered=False, stemmed=False):
+        """Count the matches of a phrase or proximity query in every document.
+
+        A query is a phrase, its terms in this order and next to each other, or phrases joined by
+        NEAR/k operators, e.g. '"the wolf" NEAR/3 lamb': both sides with at most k terms between them,
+        in either order. Operators apply from left to right, to the span of positions matched so far.
+        Positions count the terms of the searched variant, so with stopword_filtered the removed
+        stopwords neither separate terms nor match.
 
         Args:
-            chapter_text (str): The full relevant content.
-            search_pattern (Pattern): Compiled regex with groups for chapter title and content.
+            query (str): The phrase query.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem the query terms and search the stemmed document terms. Defaults to False.
 
         Returns:
-            list[Document]: A list of Document objects representing chapters.
+            list[tuple[int, Document]]: Number of matches and Document for every document, in collection order.
+
+        Raises:
+            ValueError: If a NEAR/k operator is missing a phrase on either side.
         """
-        chapter_parts = search_pattern.findall(chapter_text)
+        phrases, distances = self._phrase_query(query, stemmed)
+        key = self._cache_key('phrase', phrases, stopword_filtered, stemmed, distances)
+        result = self._cache_get(key)
+        if result is None:
+            counts = self.positions(stopword_filtered, stemmed).count(phrases, distances) if phrases[0] else {}
+            result = self._cache_put(key, [(counts.get(doc_id, 0), doc) for doc_id, doc in enumerate(self.documents)
+                                           if doc is not None])
+        return result
+
+    def boolean_query(self, query, stopword_filtered=False, stemmed=False):
+        """Find the documents matching a boolean query.
+
+        Terms are combined with AND, OR and NOT (uppercase) and grouped with parentheses; adjacent
+        operands are joined by AND, NOT binds tightest and OR loosest. A quoted operand is a phrase
+        query, see phrase_search. Conjunctions start from their rarest operand and check the candidates
+        against the other operands with the skip tables of their postings, or by galloping through the
+        matches of a subquery, so "rare AND common" costs about as much as the postings of the rare
+        term. Only a NOT without a positive operand next to it walks all doc_ids.
 
-        documents = []
-        document_id = 0
+        Args:
+            query (str): The query, e.g. 'wolf AND (lamb OR sheep) AND NOT "the fox"'.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem the query terms and search the stemmed document terms. Defaults to False.
 
-        for chapter_title, chapter_content in chapter_parts:
-            documents.append(Document(
-                document_id= document_id,
-                title = chapter_title,
-                raw_text = chapter_content.strip(),
-                terms = self._tokenize(chapter_content),
-                author=self.author,
-                origin=self.origin)
-            )
-            document_id += 1
-        
-        return documents
+        Returns:
+            list[Document]: The matching documents, in collection order.
 
-    def get_documents(self):
+        Raises:
+            ValueError: If the query is malformed.
         """
-        Public method to extract and return the list of parsed Document objects.
+        tree = _BooleanQueryParser(self, stemmed).parse(query)
+        key = self._cache_key('query', tree, stopword_filtered, stemmed)
+        result = self._cache_get(key)
+        if result is None:
+            doc_ids = self._query_matches(tree, None, stopword_filtered, stemmed) if tree is not None else []
+            result = self._cache_put(key, [self.documents[doc_id] for doc_id in doc_ids])
+        return result
+
+    def _query_size(self, node, index):
+        """Estimate the number of documents matching a boolean query node from document frequencies."""
+        kind = node[0]
+        if kind == 'term':
+            return len(index.postings.get(node[1], ()))
+        if kind == 'phrase':
+            return min(len(index.postings.get(term, ())) for phrase in node[1] for term in phrase)
+        if kind == 'and':
+            return min(self._query_size(child, index) for child in node[1])
+        if kind == 'or':
+            return sum(self._query_size(child, index) for child in node[1])
+        return index.N - self._query_size(node[1], index)
+
+    def _query_matches(self, node, candidates, stopword_filtered, stemmed):
+        """Returns the sorted doc_ids matching a boolean query node.
+
+        Args:
+            node (tuple): A node of _BooleanQueryParser.
+            candidates (list[int] | None): Sorted doc_ids to choose from, None for all documents.
+            stopword_filtered (bool): Search the filtered terms.
+            stemmed (bool): Search the stemmed terms.
 
         Returns:
-            list[Document]: The parsed documents.
+            list[int]: The candidates matching the node, in order.
         """
-        self.documents = self._split_chapters(chapter_text=self.chapter_text, search_pattern=self.search_pattern)
+        kind = node[0]
+        if kind == 'term':
+            postings = self.variant(stopword_filtered, stemmed).postings.get(node[1])
+            if not postings:
+                return []
+            if candidates is None:
+                return [doc_id for doc_id, _ in postings]
+            # Skip through the postings to every candidate
+            cursor = _PostingsCursor(postings)
+            kept = []
+            for doc_id in candidates:
+                cursor.advance(doc_id)
+                if cursor.doc_id == doc_id:
+                    kept.append(doc_id)
+                elif cursor.doc_id == sys.maxsize:
+                    break
+            return kept
+
+        if kind == 'phrase':
+            doc_ids = sorted(self.positions(stopword_filtered, stemmed).count(node[1], node[2]))
+            if candidates is None:
+                return doc_ids
+            return _gallop_intersect(candidates, doc_ids) if len(candidates) <= len(doc_ids) \
+                else _gallop_intersect(doc_ids, candidates)
+
+        if kind == 'and':
+            # Rarest operand first, each one only checks the candidates left by the ones before
+            index = self.variant(stopword_filtered, stemmed)
+            children = sorted(node[1], key=lambda child: (child[0] == 'not', self._query_size(child, index)))
+            for child in children:
+                candidates = self._query_matches(child, candidates, stopword_filtered, stemmed)
+                if not candidates:
+                    return []
+            return candidates
+
+        if kind == 'or':
+            matches = set()
+            for child in node[1]:
+                matches.update(self._query_matches(child, candidates, stopword_filtered, stemmed))
+            return sorted(matches)
+
+        # NOT keeps the candidates its operand does not match
+        if candidates is None:
+            candidates = [doc_id for doc_id, doc in enumerate(self.documents) if doc is not None]
+        excluded = set(self._query_matches(node[1], candidates, stopword_filtered, stemmed))
+        return [doc_id for doc_id in candidates if doc_id not in excluded]
+
+    def _rank(self, hits, top_k=None, hits_only=False, ranked=False):
+        """Order (score, doc_id) hits like a stable sort of all documents by descending score would.
+
+        Ties keep doc_id order and the documents without a hit follow with score 0.0, so the result
+        with top_k is always the head of the full ranking.
 
-        return self.documents
+        Args:
+            hits (list[tuple[float, int]]): Nonzero scores and their doc_ids.
+            top_k (int, optional): Only return the k best documents. Defaults to None (all).
+            hits_only (bool, optional): Leave out the documents without a hit. Defaults to False.
+            ranked (bool, optional): The hits are already in ranking order and at most top_k. Defaults to False.
 
-    def _tokenize(self,content : str) -> list[str]:
-        """Tokenize the given text into words.
+        Returns:
+            list[tuple[float, Document]]: Relevance score and Document, sorted by descending score.
+        """
+        if not ranked:
+            if top_k is None:
+                # Two stable sorts on plain items beat one sort on a computed key
+                hits = sorted(hits, key=itemgetter(1))
+                hits.sort(key=itemgetter(0), reverse=True)
+            else:
+                # Selecting k out of the hits is O(hits log k), only the winners get sorted
+                hits = heapq.nlargest(top_k, hits, key=lambda hit: (hit[0], -hit[1]))
+        result = [(score, self.documents[doc_id]) for score, doc_id in hits]
+
+        if not hits_only and (top_k is None or len(result) < top_k):
+            hit_ids = {doc_id for _, doc_id in hits}
+            for doc_id, doc in enumerate(self.documents):
+                if top_k is not None and len(result) == top_k:
+                    break
+                if doc is not None and doc_id not in hit_ids:
+                    result.append((0.0, doc))
+        return result
+
+    def _query_terms(self, queries, stemmed=False):
+        """Split queries into terms, stemming the words of all of them in one pass.
 
         Args:
-            content (str): The text to tokenize.
+            queries (list[str]): Query strings.
+            stemmed (bool, optional): Stem the query terms. Defaults to False.
 
         Returns:
-            list[str]: A list of words extracted from the text.
+            list[list[str]]: The terms of every query.
         """
-        # Convert text to lower and replace punctuation
-        for punct in PUNCT:
-            content = content.replace(punct,' ')
-        
-        return [word.lower() for word in content.split() if word]
-    
+        term_lists = [self.tokenizer.tokenize(query) for query in queries]
+        if stemmed:
+            stems = iter(PorterStemmer().stem_many([t for terms in term_lists for t in terms], workers=1))
+            term_lists = [[next(stems) for _ in terms] for terms in term_lists]
+        return term_lists
 
-class PorterStemmer:
-    def __init__(self) -> None:
-        # RULES
-        self.STEP1A_RULES = [
-            (r'sses', 'ss', lambda s: True),
-            (r'ies', 'i', lambda s: True),
-            (r'ss', 'ss', lambda s: True),
-            (r's', '', lambda s: True),
-        ]
-
-        self.STEP1B_RULES = [
-            (r'eed', 'ee', lambda s: self._get_measure(s) > 0),
-            (r'ed', '', lambda s: self._contains_vowel(s)),
-            (r'ing', '', lambda s: self._contains_vowel(s)),
-        ]
-
-        self.STEP1B_RULES_EXT = [
-            (r'at$', 'ate'),
-            (r'bl$', 'ble'),
-            (r'iz$', 'ize')
-        ]
-
-        self.STEP1C_RULES = [
-            (r'y$', 'i', lambda s: self._contains_vowel(s[:-1]))
-        ]
-
-        self.STEP2_RULES = [
-            (r'ational$', 'ate', lambda s: self._get_measure(s) > 0),
-            (r'tional$', 'tion', lambda s: self._get_measure(s) > 0),
-            (r'enci$', 'ence', lambda s: self._get_measure(s) > 0),
-            (r'anci$', 'ance', lambda s: self._get_measure(s) > 0),
-            (r'izer$', 'ize', lambda s: self._get_measure(s) > 0),
-            (r'abli$', 'able', lambda s: self._get_measure(s) > 0),
-            (r'alli$', 'al', lambda s: self._get_measure(s) > 0),
-            (r'entli$', 'ent', lambda s: self._get_measure(s) > 0),
-            (r'eli$', 'e', lambda s: self._get_measure(s) > 0),
-            (r'ousli$', 'ous', lambda s: self._get_measure(s) > 0),
-            (r'ization$', 'ize', lambda s: self._get_measure(s) > 0),
-            (r'ation$', 'ate', lambda s: self._get_measure(s) > 0),
-            (r'ator$', 'ate', lambda s: self._get_measure(s) > 0),
-            (r'alism$', 'al', lambda s: self._get_measure(s) > 0),
-            (r'iveness$', 'ive', lambda s: self._get_measure(s) > 0),
-            (r'fulness$', 'ful', lambda s: self._get_measure(s) > 0),
-            (r'ousness$', 'ous', lambda s: self._get_measure(s) > 0),
-            (r'aliti$', 'al', lambda s: self._get_measure(s) > 0),
-            (r'iviti$', 'ive', lambda s: self._get_measure(s) > 0),
-            (r'biliti$', 'ble', lambda s: self._get_measure(s) > 0),
-            (r'xflurti$', 'xti', lambda s: self._get_measure(s) > 0),
-        ]
-
-        self.STEP3_RULES = [
-            (r'icate$', 'ic', lambda s: self._get_measure(s) > 0),
-            (r'ative$', '', lambda s: self._get_measure(s) > 0),
-            (r'alize$', 'al', lambda s: self._get_measure(s) > 0),
-            (r'iciti$', 'ic', lambda s: self._get_measure(s) > 0),
-            (r'ical$', 'ic', lambda s: self._get_measure(s) > 0),
-            (r'ful$', '', lambda s: self._get_measure(s) > 0),
-            (r'ness$', '', lambda s: self._get_measure(s) > 0),
-        ]
-
-        self.STEP4_RULES = [
-            (r'al$', '', lambda s: self._get_measure(s) > 1),
-            (r'ance$', '', lambda s: self._get_measure(s) > 1),
-            (r'ence$', '', lambda s: self._get_measure(s) > 1),
-            (r'er$', '', lambda s: self._get_measure(s) > 1),
-            (r'ic$', '', lambda s: self._get_measure(s) > 1),
-            (r'able$', '', lambda s: self._get_measure(s) > 1),
-            (r'ible$', '', lambda s: self._get_measure(s) > 1),
-            (r'ant$', '', lambda s: self._get_measure(s) > 1),
-            (r'ement$', '', lambda s: self._get_measure(s) > 1),
-            (r'ment$', '', lambda s: self._get_measure(s) > 1),
-            (r'ent$', '', lambda s: self._get_measure(s) > 1),
-            (r'ion$', '', lambda s: self._get_measure(s) > 1 and s[-1].lower() in 'st'),
-            (r'ou$', '', lambda s: self._get_measure(s) > 1),
-            (r'ism$', '', lambda s: self._get_measure(s) > 1),
-            (r'ate$', '', lambda s: self._get_measure(s) > 1),
-            (r'iti$', '', lambda s: self._get_measure(s) > 1),
-            (r'ous$', '', lambda s: self._get_measure(s) > 1),
-            (r'ive$', '', lambda s: self._get_measure(s) > 1),
-            (r'ize$', '', lambda s: self._get_measure(s) > 1),
-        ]
-
-        self.STEP5A_RULES = [
-            (r'e$', '', lambda s: self._get_measure(s) > 1 or (self._get_measure(s) == 1 and not self._ends_with_cvc(s))),
-        ]
-
-        self.STEP5B_RULES = [
-            (r'll$', '', lambda s: self._get_measure(s) > 1 and self._ends_with_double_consonant(s) and self._get_measure(s[:-1]) > 1),
-        ]
-
-
-    def _is_consonant(self, word, i):
-        """Check if the character at index i in word is a consonant."""
-        letter = word[i].lower()
-        if letter in 'aeiou':
-            return False
-        if letter == 'y':
-            return i == 0 or not self._is_consonant(word, i - 1)
-        return True
-
-
-    def _contains_vowel(self, stem):
-        """Check if the stem contains at least one vowel."""
-        for i in range(len(stem)):
-            if not self._is_consonant(stem, i):
-                return True
-        return False
-    
+    def _query_weights(self, query, stopword_filtered=False, stemmed=False):
+        """Split a query into terms and weight them by augmented tf * idf.
 
-    def _ends_with_double_consonant(self, stem):
-        """Check if the stem ends with a double consonant."""
-        if len(stem) < 2:
-            return False
-        return (self._is_consonant(stem, len(stem) - 1) and 
-                self._is_consonant(stem, len(stem) - 2) and 
-                stem[-1].lower() == stem[-2].lower())
-    
+        Args:
+            query (str): Query string.
+            stopword_filtered (bool, optional): Take the idfs of the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem the query terms. Defaults to False.
 
-    def _ends_with_cvc(self, stem):
-        """Check if the stem ends with consonant-vowel-consonant, where the last consonant is not w, x, or y."""
-        if len(stem) < 3:
-            return False
-        return (self._is_consonant(stem, len(stem) - 3)  and
-                not self._is_consonant(stem, len(stem) - 2) and 
-                self._is_consonant(stem, len(stem) - 1) and
-                stem[-1].lower() not in 'wxy') 
-    
+        Returns:
+            tuple[dict[str, float], float]: Term -> weight in query order, and the norm of the query vector
+                (0.0 if no term can score).
+        """
+        query_terms = self._query_terms([query], stemmed)[0]
+        if not query_terms:
+            return {}, 0.0
+        return self._term_weights(query_terms, self.variant(stopword_filtered, stemmed))
 
-    def _get_measure(self, word):
-        """Calculate the measure (m) of a word: number of VC sequences.""" 
-        m = 0
-        i = 0
-        # Find [C]
-        while i < len(word) and self._is_consonant(word, i):
-            i += 1
-        # Count VC sequences
-        while i < len(word):
-            # Must have at least one vowel
-            has_vowel = False
-            while i < len(word) and not self._is_consonant(word, i):
-                has_vowel = True
-                i += 1
-            if not has_vowel:
-                break
-            # Must have at least one consonant
-            has_consonant = False
-            while i < len(word) and self._is_consonant(word, i):
-                has_consonant = True
-                i += 1
-            if has_consonant and has_vowel:
-                m += 1
-        return m
-    
+    @staticmethod
+    def _term_weights(query_terms, index):
+        """Weight query terms by augmented tf * idf.
 
-    def _apply_rule(self, word, pattern, replacement, condition):
-        """Apply a suffix removal rule using regex if the condition is met."""
-        match = re.search(pattern + '$', word, re.IGNORECASE)
-        if not match:
-            return word, False
-        stem = word[:match.start()]
-        if condition(stem):
-            return stem + replacement, True
-        return word, False
-    
+        Args:
+            query_terms (list[str]): Nonempty list of query terms.
+            index (_IndexVariant): The variant the idfs are taken from.
 
-    def stem(self, word):
-        """Stem the word based on the Porter Stemmer Rules
+        Returns:
+            tuple[dict[str, float], float]: Term -> weight in query order, and the norm of the query vector.
+        """
+        query_tf = get_term_freq(query_terms)
+        max_qtf = max(query_tf.values())
+
+        # Compute query norm (using augmented tf * idf)
+        query_weights = {}
+        query_norm = 0.0
+        for term, tf in query_tf.items():
+            weight = (0.5 + 0.5 * (tf / max_qtf)) * index.idf(term)
+            query_weights[term] = weight
+            query_norm += weight * weight
+
+        query_norm = math.sqrt(query_norm) if query_norm > 0 else 0.0
+        return query_weights, query_norm
+
+    def search(self, query, stopword_filtered=False, stemmed=False, top_k=None, hits_only=False, fuzzy=None):
+        """Rank all documents against the query by the cosine of their tf * idf vectors.
 
         Args:
-            word (_str_): Input word to be stemmed
+            query (str): Query string.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem query and document terms. Defaults to False.
+            top_k (int, optional): Only return the k best documents, skipping the documents that
+                cannot make it instead of scoring all. Defaults to None (all).
+            hits_only (bool, optional): Only return documents with a nonzero score. Defaults to False.
+            fuzzy (int, optional): Replace every query term by the terms of the collection within this
+                many edits of it, e.g. 1 or 2 to find misspelled words. Defaults to None (exact terms).
 
         Returns:
-            _str_: stemmed word
+            list[tuple[float, Document]]: Relevance score and Document, sorted by descending score.
         """
-        if not word:
-            return word
-        
-        # Apply Step_1A Rules
-        for pattern, replacement, condition in self.STEP1A_RULES:
-            new_word, applied = self._apply_rule(word, pattern, replacement, condition)
-            if applied:
-                word = new_word
-                break
-        
+        query_terms = tuple(self._query_terms([query], stemmed)[0])
+        key = self._cache_key('search', query_terms, stopword_filtered, stemmed, top_k, bool(hits_only), fuzzy)
+        result = self._cache_get(key)
+        if result is None:
+            result = self._search_terms(query_terms, stopword_filtered, stemmed, top_k, hits_only, fuzzy)
+            self._cache_put(key, result)
+        return result
+
+    def _search_terms(self, query_terms, stopword_filtered, stemmed, top_k, hits_only, fuzzy=None):
+        """Returns the search result of normalized query terms."""
+        if not query_terms:
+            return self._rank([], top_k, hits_only)
+        index = self.variant(stopword_filtered, stemmed)
+        if fuzzy is not None:
+            query_terms = self._fuzzy_terms(query_terms, stopword_filtered, stemmed, fuzzy)
+        query_weights, query_norm = self._term_weights(query_terms, index)
+        if query_norm == 0.0:
+            return self._rank([], top_k, hits_only)
+
+        if self.vectorized:
+            scores = self.matrix(stopword_filtered, stemmed).scores([(query_weights, query_norm)])[:, 0]
+            return self._rank(_MatrixVariant.hits(scores, top_k), top_k, hits_only, ranked=True)
+
+        # Accumulate dot products term at a time over the postings of the query terms only, or
+        # document at a time with pruning for a top_k (with a single term every posting is a hit)
+        hits = _score_queries([(query_weights, query_norm)], index, top_k)[0]
+        return self._rank(hits, top_k, hits_only)
+
+    def bm25_search(self, query, stopword_filtered=False, stemmed=False, top_k=None, hits_only=False,
+                    k1=BM25_K1, b=BM25_B, title_boost=BM25_TITLE_BOOST):
+        """Rank all documents against the query with BM25F over their text and title, see _bm25_hits.
 
-        # Apply Step_1B Rules
-        for i, (pattern, replacement, condition) in enumerate(self.STEP1B_RULES):
-            new_word, applied = self._apply_rule(word, pattern, replacement, condition)
+        Args:
+            query (str): Query string.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem query and document terms. Defaults to False.
+            top_k (int, optional): Only return the k best documents. Defaults to None (all).
+            hits_only (bool, optional): Only return documents with a nonzero score. Defaults to False.
+            k1 (float, optional): Term frequency saturation. Defaults to BM25_K1.
+            b (float, optional): Length normalization between 0.0 and 1.0. Defaults to BM25_B.
+            title_boost (float, optional): Weight of a title occurrence relative to one in the text,
+                0.0 for plain BM25 over the text. Defaults to BM25_TITLE_BOOST.
 
-            # Logic that handles special case words like feed, deed, etc. 
-            if not applied and re.search(pattern, word, re.IGNORECASE):
-                return word
+        Returns:
+            list[tuple[float, Document]]: Relevance score and Document, sorted by descending score.
+        """
+        query_terms = tuple(self._query_terms([query], stemmed)[0])
+        key = self._cache_key('bm25', query_terms, stopword_filtered, stemmed, top_k, bool(hits_only), k1, b, title_boost)
+        result = self._cache_get(key)
+        if result is None:
+            title = self.title_field(stemmed) if title_boost else None
+            hits = _bm25_hits(query_terms, self.variant(stopword_filtered, stemmed), title, k1, b, title_boost)
+            result = self._cache_put(key, self._rank(hits, top_k, hits_only))
+        return result
+
+    def search_many(self, queries, stopword_filtered=False, stemmed=False, top_k=None, hits_only=False,
+                    fuzzy=None, workers=1, chunk_size=SEARCH_CHUNK_SIZE):
+        """Rank all documents against each of many queries, like search does for one.
+
+        The queries are tokenized and stemmed in one pass, cached results are reused and repeated
+        queries are scored once. The postings of a term shared by several queries are decoded once
+        for all of them, and with vectorized each chunk of queries is one sparse matrix product.
 
-            if applied:
-                word = new_word
-                if i in (1,2):
-                    for pattern, replacement in self.STEP1B_RULES_EXT:
-                        if re.search(pattern, word, re.IGNORECASE):
-                            word = re.sub(pattern, replacement, word, flags=re.IGNORECASE)
-                    else:
-                        if self._ends_with_double_consonant(word) and word[-1].lower() not in 'lsz':
-                            word = word[:-1]
-                        
-                        elif self._get_measure(word) == 1 and self._ends_with_cvc(word):
-                            word = word + 'e'
-                break
-            
+        Args:
+            queries (Iterable[str]): Query strings.
+            stopword_filtered (bool, optional): Search the filtered terms. Defaults to False.
+            stemmed (bool, optional): Stem query and document terms. Defaults to False.
+            top_k (int, optional): Only return the k best documents of every query. Defaults to None (all).
+            hits_only (bool, optional): Only return documents with a nonzero score. Defaults to False.
+            fuzzy (int, optional): Expand the query terms by edit distance, see search. Defaults to None.
+            workers (int, optional): Number of worker processes scoring chunks of queries. Defaults to 1
+                (this process); None is one per CPU. Not used with vectorized.
+            chunk_size (int, optional): Queries per worker task or matrix product. Defaults to SEARCH_CHUNK_SIZE.
 
-        SUBRULES = [self.STEP1C_RULES, self.STEP2_RULES, self.STEP3_RULES, self.STEP4_RULES, self.STEP5A_RULES, self.STEP5B_RULES]
+        Returns:
+            list[list[tuple[float, Document]]]: The result of search for every query, in query order.
+        """
+        term_lists = [tuple(terms) for terms in self._query_terms(list(queries), stemmed)]
+
+        results = {}
+        keys = {}
+        for terms in dict.fromkeys(term_lists):
+            key = self._cache_key('search', terms, stopword_filtered, stemmed, top_k, bool(hits_only), fuzzy)
+            keys[terms] = key
+            result = self._cache_get(key)
+            if result is not None:
+                results[terms] = result
+        unique = [terms for terms in keys if terms and terms not in results]
+
+        weighted = []
+        if unique:
+            index = self.variant(stopword_filtered, stemmed)
+            if fuzzy is None:
+                weighted = [self._term_weights(terms, index) for terms in unique]
+            else:
+                weighted = [self._term_weights(self._fuzzy_terms(terms, stopword_filtered, stemmed, fuzzy), index)
+                            for terms in unique]
+            weighted = [(terms, weights) for terms, weights in zip(unique, weighted) if weights[1] != 0.0]
+
+        if weighted and self.vectorized:
+            matrix = self.matrix(stopword_filtered, stemmed)
+            for start in range(0, len(weighted), chunk_size):
+                chunk = weighted[start:start + chunk_size]
+                scores = matrix.scores([weights for _, weights in chunk])
+                for column, (terms, _) in enumerate(chunk):
+                    hits = _MatrixVariant.hits(scores[:, column], top_k)
+                    results[terms] = self._cache_put(keys[terms], self._rank(hits, top_k, hits_only, ranked=True))
+        elif weighted:
+            batch = [weights for _, weights in weighted]
+            chunks = [batch[i:i + chunk_size] for i in range(0, len(batch), chunk_size)]
+            if len(chunks) > 1 and workers != 1:
+                # Workers only get the postings of the query terms, not the whole index
+                batch_terms = dict.fromkeys(term for query_weights, _ in batch for term in query_weights)
+                batch_variant = _BatchVariant(index, batch_terms)
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                         initargs=(batch_variant,)) as executor:
+                    hit_lists = [hits for chunk_hits in executor.map(_search_chunk, chunks, [top_k] * len(chunks))
+                                 for hits in chunk_hits]
+            else:
+                hit_lists = _score_queries(batch, index, top_k)
+            for (terms, _), hits in zip(weighted, hit_lists):
+                results[terms] = self._cache_put(keys[terms], self._rank(hits, top_k, hits_only))
+
+        no_hits = self._rank([], top_k, hits_only)
+        return [list(results.get(terms, no_hits)) for terms in term_lists]
+
+
+def _write_section(f, data):
+    """Write a section of an index file at the next 8 byte boundary and return its [offset, length]."""
+    f.write(b'\0' * (-f.tell() % 8))
+    offset = f.tell()
+    f.write(data)
+    return [offset, len(data)]
+
+
+class _MappedDocument(Document):
+    """
+    A Document loaded from an index file. Its raw text stays in the file and is only read when accessed.
+    """
+    def __init__(self, index_file, document_id, title, author, origin, text_offset, text_length) -> None:
+        """Initialize the document.
 
-        for RULE in SUBRULES:
-            for pattern, replacement, condition in RULE:
-                new_word, applied = self._apply_rule(word, pattern, replacement, condition)
-                if applied:
-                    word = new_word
-                    break
- 
+        Args:
+            index_file (IndexFile): The open index file holding the raw text.
+            document_id (int): Unique document ID.
+            title (str): Title of the document.
+            author (str): Author of the document.
+            origin (str): Origin of the document.
+            text_offset (int): Byte offset of the raw text in the text section of the file.
+            text_length (int): Length of the utf-8 encoded raw text in bytes.
+        """
+        self._index_file = index_file
+        self._text_span = (text_offset, text_length)
+        super().__init__(document_id, title, None, [], author, origin)
+
+    @property
+    def raw_text(self):
+        if self._raw_text is not None:
+            return self._raw_text
+        return self._index_file.text(*self._text_span)
+
+    @raw_text.setter
+    def raw_text(self, value):
+        self._raw_text = value
+
+
+class _MappedPostings(Mapping):
+    """
+    Read-only term -> Postings mapping over the term dictionary of a memory mapped index file.
+
+    Terms are looked up by binary search over the dictionary records, which are sorted by the
+    utf-8 bytes of their term, and only the postings of the requested term are copied out.
+    """
+    def __init__(self, buffer, section) -> None:
+        """Initialize the mapping over one variant section of an index file.
+
+        Args:
+            buffer (mmap.mmap): The mapped index file.
+            section (dict): The variant entry of the table of contents.
+        """
+        self._buffer = buffer
+        self._count = section['terms']
+        self._dictionary = section['dictionary'][0]
+        self._strings = section['strings'][0]
+        self._postings = section['postings'][0]
+        self._skips = section['skips'][0]
+
+    def _record(self, i):
+        return _TERM_RECORD.unpack_from(self._buffer, self._dictionary + i * _TERM_RECORD.size)
+
+    def _term_bytes(self, record):
+        start = self._strings + record[0]
+        return self._buffer[start:start + record[1]]
+
+    def find(self, term):
+        """Returns the dictionary record of a term, None if it is not in the index."""
+        key = term.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            found = self._term_bytes(record)
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return record
+        return None
+
+    def __getitem__(self, term):
+        record = self.find(term)
+        if record is None:
+            raise KeyError(term)
+        _, _, count, last, offset, length, _, _, skips_offset, skips_count = record
+        start = self._postings + offset
+        skips = (array('I'), array('I'))
+        if skips_count:
+            start_skips = self._skips + skips_offset
+            for i, table in enumerate(skips):
+                table.frombytes(self._buffer[start_skips + i * 4 * skips_count:start_skips + (i + 1) * 4 * skips_count])
+                if sys.byteorder == 'big':
+                    table.byteswap()
+        return Postings.from_bytes(self._buffer[start:start + length], count, last, skips)
+
+    def __contains__(self, term):
+        return self.find(term) is not None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._term_bytes(self._record(i)).decode('utf-8')
+
+
+class _MappedVariant:
+    """
+    Read-only index variant whose term dictionary, postings, IDFs and norms stay in a memory mapped index file.
+
+    Attributes:
+        postings (Mapping[str, Postings]): Term -> postings, decoded on lookup.
+        N (int): Number of indexed documents.
+        total_length (int): Number of terms of all documents.
+    """
+    def __init__(self, buffer, section) -> None:
+        """Initialize the variant from its entry in the table of contents.
+
+        Args:
+            buffer (mmap.mmap): The mapped index file.
+            section (dict): The variant entry of the table of contents.
+        """
+        self.stopword_filtered = section['stopword_filtered']
+        self.stemmed = section['stemmed']
+        self.N = section['N']
+        self.postings = _MappedPostings(buffer, section)
+        self._buffer = buffer
+        self._norms = section['norms']
+        self._lengths = section['lengths']
+        self._doc_lengths = None
+        self.total_length = section['total_length']
+
+    def idf(self, term):
+        """Returns the stored inverse document frequency of a term, 0.0 for unknown terms."""
+        record = self.postings.find(term)
+        return record[6] if record is not None else 0.0
+
+    @property
+    def idfs(self):
+        """dict[str, float]: Term -> inverse document frequency log(N / df)."""
+        return {term: self.idf(term) for term in self.postings}
+
+    def max_weight(self, term):
+        """Returns the stored largest tf / norm of a term over its documents, 0.0 for unknown terms."""
+        record = self.postings.find(term)
+        return record[7] if record is not None else 0.0
+
+    def norm(self, doc_id):
+        """Returns the stored norm of the tf * idf vector of a document."""
+        return _NORM.unpack_from(self._buffer, self._norms[0] + doc_id * _NORM.size)[0]
+
+    @property
+    def doc_norms(self):
+        """list[float]: Norm of every doc_id."""
+        offset, length = self._norms
+        return [norm for (norm,) in _NORM.iter_unpack(self._buffer[offset:offset + length])]
+
+    @property
+    def doc_lengths(self):
+        """array: Number of terms of every doc_id, read on first use."""
+        if self._doc_lengths is None:
+            offset, length = self._lengths
+            self._doc_lengths = array('I', self._buffer[offset:offset + length])
+            if sys.byteorder == 'big':
+                self._doc_lengths.byteswap()
+        return self._doc_lengths
+
+    @property
+    def avg_length(self):
+        """float: Average number of terms of the indexed documents."""
+        return self.total_length / self.N if self.N else 0.0
+
+
+class IndexFile:
+    """
+    A binary index file written by InvertedIndex.save, opened with mmap.
+
+    Opening the file only parses the table of contents and the document table; term lookups,
+    postings, norms and raw texts are read from the mapping on demand, so a search process starts
+    in milliseconds and processes opening the same file share its pages in the page cache.
+
+    The file starts with a header (magic bytes, format version, offset and length of the table of
+    contents) and ends with the table of contents, a JSON object locating the sections in between:
+    the document table (JSON), the raw texts (utf-8) and, per term variant, the term dictionary
+    (_TERM_RECORD per term, sorted by utf-8 bytes), the term strings, the Postings bytes, their skip
+    tables (little endian uint32 doc_ids, then offsets), the document norms (little endian doubles)
+    and the document lengths (little endian uint32).
+
+    Attributes:
+        path (str): Path of the file.
+        documents (list[Document | None]): Documents by doc_id, None for documents removed before saving.
+        variants (dict[tuple[bool, bool], _MappedVariant]): Stored variants by (stopword_filtered, stemmed).
+        tokenizer (Tokenizer): The tokenizer the index was built with, for queries.
+    """
+    def __init__(self, path=INDEX_FILE) -> None:
+        """Open and map an index file.
+
+        Args:
+            path (str, optional): Path of the index file. Defaults to INDEX_FILE.
+
+        Raises:
+            ValueError: If the file is not an index file or has a different format version.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, toc_offset, toc_length = _INDEX_HEADER.unpack_from(self._buffer, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not an index file")
+        if version != INDEX_FORMAT_VERSION:
+            raise ValueError(f"{path} has index format version {version}, expected {INDEX_FORMAT_VERSION}")
+
+        toc = json.loads(self._buffer[toc_offset:toc_offset + toc_length])
+        self._text_offset = toc['text'][0]
+        offset, length = toc['documents']
+        self.documents = [None if entry is None else _MappedDocument(self, *entry)
+                          for entry in json.loads(self._buffer[offset:offset + length])]
+        self.variants = {(section['stopword_filtered'], section['stemmed']): _MappedVariant(self._buffer, section)
+                         for section in toc['variants']}
+        self.tokenizer = Tokenizer(**toc['tokenizer'])
+
+    def text(self, offset, length):
+        """Returns the raw text stored at the given span of the text section."""
+        start = self._text_offset + offset
+        return self._buffer[start:start + length].decode('utf-8')
+
+    def close(self):
+        """Unmap the file. Documents and variants of the file cannot be used afterwards."""
+        self._buffer.close()
+
+    @staticmethod
+    def write(index, path=INDEX_FILE, variants=((False, False), (False, True))):
+        """Write an index to a binary index file.
+
+        The file is written next to its destination and moved into place, so readers never see a partial file.
+
+        Args:
+            index (InvertedIndex): The index to write.
+            path (str, optional): Destination path. Defaults to INDEX_FILE.
+            variants (Iterable[tuple[bool, bool]], optional): (stopword_filtered, stemmed) variants to store,
+                built first if necessary. Defaults to the raw and the stemmed terms.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        part_path = f"{path}.{os.getpid()}.part"
+        with open(part_path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, 0, 0))
+
+            # Raw texts first, so the document table can point into them
+            f.write(b'\0' * (-f.tell() % 8))
+            text_start = f.tell()
+            doc_table = []
+            for doc in index.documents:
+                if doc is None:
+                    doc_table.append(None)
+                    continue
+                text = (doc.raw_text or "").encode('utf-8')
+                doc_table.append([doc.document_id, doc.title, doc.author, doc.origin, f.tell() - text_start, len(text)])
+                f.write(text)
+            toc = {'text': [text_start, f.tell() - text_start],
+                   'documents': _write_section(f, json.dumps(doc_table).encode('utf-8')),
+                   'tokenizer': {'punctuation': index.tokenizer.punctuation,
+                                 'normalization': index.tokenizer.normalization},
+                   'variants': []}
+
+            for stopword_filtered, stemmed in variants:
+                variant = index.variant(stopword_filtered, stemmed)
+                terms = sorted(term.encode('utf-8') for term in variant.postings)
+
+                strings = bytearray()
+                dictionary = bytearray()
+                postings_data = bytearray()
+                skips_data = bytearray()
+                for key in terms:
+                    term = key.decode('utf-8')
+                    postings = variant.postings[term]
+                    bases, offsets = postings.skips()
+                    dictionary += _TERM_RECORD.pack(len(strings), len(key), len(postings), postings.last,
+                                                    len(postings_data), len(postings.data), variant.idf(term),
+                                                    variant.max_weight(term), len(skips_data), len(bases))
+                    strings += key
+                    postings_data += postings.data
+                    for table in (bases, offsets):
+                        if sys.byteorder == 'big':
+                            table = array('I', table)
+                            table.byteswap()
+                        skips_data += table.tobytes()
+
+                norms = b''.join(_NORM.pack(norm) for norm in variant.doc_norms)
+                lengths = array('I', variant.doc_lengths)
+                if sys.byteorder == 'big':
+                    lengths.byteswap()
+                toc['variants'].append({
+                    'stopword_filtered': bool(stopword_filtered),
+                    'stemmed': bool(stemmed),
+                    'N': variant.N,
+                    'terms': len(terms),
+                    'dictionary': _write_section(f, dictionary),
+                    'strings': _write_section(f, strings),
+                    'postings': _write_section(f, postings_data),
+                    'skips': _write_section(f, skips_data),
+                    'norms': _write_section(f, norms),
+                    'lengths': _write_section(f, lengths.tobytes()),
+                    'total_length': variant.total_length,
+                })
+
+            toc_offset, toc_length = _write_section(f, json.dumps(toc).encode('utf-8'))
+            f.seek(0)
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, toc_offset, toc_length))
+        os.replace(part_path, path)
 
-        return word
-    
 
 # __________MAIN MODULE FUNCTIONS (compatible with testwrapper.py)_________
 
 # DOCUMENT RETREIVAL
 
-def load_collection_from_url(url, author, origin, start_line, end_line, search_pattern):
+def load_collection_from_url(url, author, origin, start_line, end_line, search_pattern, cache=None, stream=False):
     """Loads and parses a document collection from a given URL using gutenbergParser
 
     Args:
@@ -341,6 +3599,9 @@ def load_collection_from_url(url, author, origin, start_line, end_line, search_p
         start_line (int): The line number to start reading the content from.
         end_line (int | None): The line number to stop reading at (None for end of file).
         search_pattern (Pattern): A compiled regex pattern to identify chapters.
+        cache (TextCache, optional): On-disk cache of downloaded texts. Defaults to None.
+        stream (bool, optional): Split the text while reading it instead of reading it whole first; the
+            documents are still collected in the list (see iter_collection_from_url). Defaults to False.
 
     Returns:
         list[Document]: A list of Document objects.
@@ -350,12 +3611,101 @@ def load_collection_from_url(url, author, origin, start_line, end_line, search_p
                              origin=origin, 
                              start_line=start_line, 
                              end_line=end_line, 
-                             search_pattern=search_pattern)
+                             search_pattern=search_pattern,
+                             cache=cache,
+                             stream=stream)
     documents =  parser.get_documents()
     # print(parser._tokenize(documents[0].raw_text))
     return documents
 
 
+def iter_collection_from_url(url, author, origin, start_line, end_line, search_pattern, cache=None):
+    """Streams a document collection from a given URL, yielding every document as soon as it is parsed.
+
+    Only the current chapters are held in memory, see gutenbergParser.iter_documents.
+
+    Args:
+        url (str): The URL of the document collection.
+        author (str): Author of the book
+        origin (str): Origin of the book
+        start_line (int): The line number to start reading the content from.
+        end_line (int | None): The line number to stop reading at (None for end of file).
+        search_pattern (Pattern): A compiled regex pattern to identify chapters.
+        cache (TextCache, optional): On-disk cache of downloaded texts. Defaults to None.
+
+    Yields:
+        Document: The next parsed document.
+    """
+    parser = gutenbergParser(url=url,
+                             author=author,
+                             origin=origin,
+                             start_line=start_line,
+                             end_line=end_line,
+                             search_pattern=search_pattern,
+                             cache=cache,
+                             stream=True)
+    yield from parser.iter_documents()
+
+
+def _load_catalogue_entry(entry, search_pattern, cache, host_limit):
+    """Download one catalogue book while holding its host's connection slot, then parse it."""
+    pattern = entry.get('search_pattern', search_pattern)
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern, re.DOTALL)
+
+    with host_limit:
+        parser = gutenbergParser(url=entry['url'],
+                                 author=entry['author'],
+                                 origin=entry['origin'],
+                                 start_line=entry['start_line'],
+                                 end_line=entry['end_line'],
+                                 search_pattern=pattern,
+                                 cache=cache)
+    return parser.get_documents()
+
+
+def load_catalogue(catalogue_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gutenberg.json'),
+                   search_pattern=None, cache=None, max_workers=16, max_per_host=8):
+    """Loads every book of a catalogue file concurrently into one document collection.
+
+    Books are downloaded by a bounded thread pool with at most max_per_host connections per host,
+    and each book is parsed and tokenized as soon as it arrives, so the total load time follows the
+    slowest download rather than the sum of all downloads.
+
+    Args:
+        catalogue_file (str, optional): JSON list of books with url, author, origin, start_line and
+            end_line (and optionally search_pattern). Defaults to data/gutenberg.json.
+        search_pattern (Pattern | str, optional): Chapter pattern for books without their own.
+            Defaults to None, which loads each book as a single document.
+        cache (TextCache, optional): On-disk cache of downloaded texts. Defaults to None.
+        max_workers (int, optional): Maximum number of concurrent downloads. Defaults to 16.
+        max_per_host (int, optional): Maximum number of concurrent downloads per host. Defaults to 8.
+
+    Returns:
+        list[Document]: Documents of all books in catalogue order, with globally unique document ids.
+    """
+    with open(catalogue_file, 'r') as f:
+        catalogue = json.load(f)
+
+    host_limits = {urlparse(entry['url']).netloc: threading.BoundedSemaphore(max_per_host) for entry in catalogue}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_load_catalogue_entry, entry, search_pattern, cache,
+                                   host_limits[urlparse(entry['url']).netloc])
+                   for entry in catalogue]
+        try:
+            books = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    documents = [doc for book in books for doc in book]
+    for document_id, doc in enumerate(documents):
+        doc.document_id = document_id
+    return documents
+
+
 # STOPWORDS FILTERING
 
 def remove_stop_words(terms, stopwords=None):
@@ -364,21 +3714,18 @@ def remove_stop_words(terms, stopwords=None):
 
     Args:
         terms (list[str]): The input term list.
-        stopwords (set[str] | None): Optional custom stopword list.
+        stopwords (set[str] | None): Optional custom stopword list. Defaults to the internal list.
 
     Returns:
         list[str]: Filtered terms without stopwords.
     """
-    if stopwords is not None:
-        return [term.lower() for term in terms if term.lower() not in stopwords]
-
-    with open('helpers/stopwords.txt','r') as src:
-        stopwords = [line.strip() for line in src.readlines()]
+    if stopwords is None:
+        return StopwordFilter.from_file().filter(terms)
 
-    return [term.lower() for term in terms if term.lower() not in stopwords]    
+    return [term for term in map(str.lower, terms) if term not in stopwords]
 
 
-def remove_stop_words_by_frequency(terms, collection, low_freq, high_freq):
+def remove_stop_words_by_frequency(terms, collection, low_freq, high_freq, stats=None):
     """
     Removes stopwords based on JC Crouch's frequency-based method.
 
@@ -389,44 +3736,20 @@ def remove_stop_words_by_frequency(terms, collection, low_freq, high_freq):
         collection (list[Document]): The full document collection for computing frequencies.
         low_freq (float): Lower percentile (e.g., 0.1) to treat terms as too rare.
         high_freq (float): Upper percentile (e.g., 0.5) to treat terms as too common.
+        stats (CollectionStats, optional): Statistics of the collection, used while they are up to date.
+            Defaults to None (counted for this call).
 
     Returns:
         list[str]: Filtered terms.
     """
-    
-    term_doc_freq = defaultdict(int)
-
-    # Count total document frequency of each term
-    for doc in collection:
-        unique_terms = set(doc.terms)
-        for term in unique_terms:
-            term_doc_freq[term] += 1
-        
-
-    # Compute frequency percentile thresholds
-    term_freqs = list(term_doc_freq.values())
-    term_freqs.sort()
-
-    percentile = lambda p: term_freqs[min(int(p * len(term_freqs)), len(term_freqs) - 1)]
-
-    min_thresold = percentile(low_freq)
-    max_thresold = percentile(high_freq)
-
-
-    # Determine stop words (too rare or too frequent)
-    stopwords = {
-        term for term, freq in term_doc_freq.items() if freq <= min_thresold or freq >= max_thresold
-    }
-
-    # Filter terms from given list
-    return [term for term in terms if term not in stopwords]
+    return CollectionStats.for_collection(collection, stats).filter(terms, low_freq, high_freq)
 
 
 
 # SEARCH METHODS
 
 # 1. Boolean Search
-def linear_boolean_search(term, collection, stopword_filtered=False, stemmed=False):
+def linear_boolean_search(term, collection, stopword_filtered=False, stemmed=False, index=None, fuzzy=None):
     """
     Performs a simple linear boolean search.
 
@@ -435,29 +3758,34 @@ def linear_boolean_search(term, collection, stopword_filtered=False, stemmed=Fal
         collection (list[Document]): List of Document objects.
         stopword_filtered (bool): If True, use doc.filtered_terms instead of raw terms.
         stemmed (bool): If True, search is performed on stemmed terms.
+        index (InvertedIndex, optional): Prebuilt index over the collection, reused across queries.
+            Defaults to None, which builds a temporary index for this query.
+        fuzzy (int, optional): Also count the terms within this many edits of the term. Defaults to None.
     Returns:
         list[tuple[int, Document]]: List of tuples of relevance score and Document.
     """
-    result = []
-    term = term.lower()
-
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.boolean_search(term, stopword_filtered=stopword_filtered, stemmed=stemmed, fuzzy=fuzzy)
 
-    for doc in collection:
-        if stopword_filtered:
-            terms_to_search = doc.filtered_terms
-        else:
-            terms_to_search = doc.terms
 
-        if stemmed:
-            stemmer = PorterStemmer()
-            terms_to_search = [stemmer.stem(t) for t in terms_to_search]
-        
-        terms_lower = [t.lower() for t in terms_to_search]
-        score = terms_lower.count(term)
+def linear_boolean_search_many(terms, collection, stopword_filtered=False, stemmed=False, index=None):
+    """
+    Performs a simple linear boolean search for each of many terms over one index.
 
-        result.append((score, doc))
-    
-    return result
+    Args:
+        terms (Iterable[str]): The terms to search for.
+        collection (list[Document]): List of Document objects.
+        stopword_filtered (bool): If True, use doc.filtered_terms instead of raw terms.
+        stemmed (bool): If True, search is performed on stemmed terms.
+        index (InvertedIndex, optional): Prebuilt index over the collection. Defaults to None, which
+            builds a temporary index shared by the terms.
+    Returns:
+        list[list[tuple[int, Document]]]: The result of linear_boolean_search for every term.
+    """
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.boolean_search_many(terms, stopword_filtered=stopword_filtered, stemmed=stemmed)
 
 
 #2.  TF IDF Vector Space Search
@@ -466,114 +3794,132 @@ def get_term_freq(terms):
     for term in terms:
         term_freq[term] = term_freq.get(term, 0) + 1
     return term_freq
-    
 
-def vector_space_search(query, collection, stopword_filtered=False, stemmed=False):
-    """ Performs TF IDF vector space search.
+
+def _document_terms(doc, stopword_filtered=False):
+    """Returns the raw or stopword filtered terms of a document.
+
+    `filtered_terms` is a method of Document, but callers may have replaced it with a plain list.
+    """
+    if not stopword_filtered:
+        return doc.terms
+    terms = doc.filtered_terms
+    return terms() if callable(terms) else terms
 
 
+def vector_space_search(query, collection, stopword_filtered=False, stemmed=False, index=None, top_k=None,
+                        hits_only=False, fuzzy=None):
+    """ Performs TF IDF vector space search.
+
     Args:
-        query (_str_): Query String
-        collection (_doc_): Collection of documents
-        stopword_filtered (bool, optional):  Defaults to False.
-        stemmed (bool, optional): . Defaults to False.
         query (_str_): Query String
         collection (_doc : Document_): Collection of documents
         stopword_filtered (bool, optional):  Defaults to False.
         stemmed (bool, optional):  Defaults to False.
+        index (InvertedIndex, optional): Prebuilt index over the collection, reused across queries.
+            Defaults to None, which builds a temporary index for this query.
+        top_k (int, optional): Only return the k best documents. Defaults to None (all).
+        hits_only (bool, optional): Only return documents with a nonzero score. Defaults to False.
+        fuzzy (int, optional): Replace every query term by the terms within this many edits of it. Defaults to None.
 
     Returns:
         list[tuple[int, Document]]: List of tuples of relevance score and Document.
     """
-    N = len(collection)
-    
-    query_terms = query.lower().split()
-    if stemmed:
-        stemmer = PorterStemmer()
-        query_terms = [stemmer.stem(t) for t in query_terms]
-    if not query_terms:
-        return [(0.0, doc) for doc in collection]
-    
-    query_tf = get_term_freq(query_terms)
-    # print(f'query_tf : {query_tf}')
-    max_qtf = max(query_tf.values()) if query_tf else 0
-    # print(f'max_qtf : {max_qtf}')
-
-    # Build document terms and inverted index
-    inverted = {}
-    doc_terms = []
-    for doc_id, doc in enumerate(collection):
-        if stopword_filtered:
-            terms = doc.filtered_terms
-        else:
-            terms = doc.terms
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.search(query, stopword_filtered=stopword_filtered, stemmed=stemmed, top_k=top_k, hits_only=hits_only,
+                        fuzzy=fuzzy)
 
-        terms_lower = [t.lower() for t in terms]
-        if stemmed:
-            stemmer = PorterStemmer()
-            terms_lower = [stemmer.stem(t) for t in terms_lower]
-        
-        doc_terms.append(terms_lower)
-        doc_tf = get_term_freq(terms_lower)
-        # print(f'doctf : {doc_tf}')
-        
 
-        for term, tf in doc_tf.items():
-            inverted.setdefault(term, []).append((doc_id, tf))
+def vector_space_search_many(queries, collection, stopword_filtered=False, stemmed=False, index=None, top_k=None,
+                             hits_only=False, workers=1):
+    """ Performs TF IDF vector space search for each of many queries over one index.
 
-        # print(f'inverted : {inverted}')
+    Args:
+        queries (_Iterable[str]_): Query Strings
+        collection (_doc : Document_): Collection of documents
+        stopword_filtered (bool, optional):  Defaults to False.
+        stemmed (bool, optional):  Defaults to False.
+        index (InvertedIndex, optional): Prebuilt index over the collection. Defaults to None, which
+            builds a temporary index shared by the queries.
+        top_k (int, optional): Only return the k best documents of every query. Defaults to None (all).
+        hits_only (bool, optional): Only return documents with a nonzero score. Defaults to False.
+        workers (int, optional): Number of worker processes, see InvertedIndex.search_many. Defaults to 1.
 
+    Returns:
+        list[list[tuple[int, Document]]]: The result of vector_space_search for every query.
+    """
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.search_many(queries, stopword_filtered=stopword_filtered, stemmed=stemmed, top_k=top_k,
+                             hits_only=hits_only, workers=workers)
 
-    # Compute IDFs
-    idfs = {t: math.log(N / len(postings)) if len(postings) > 0 else 0.0 for t, postings in inverted.items()}
-    # print(f'idfs : {idfs}')
 
-    # Compute document norms (using tf * idf)
-    doc_norms = [0.0] * N
-    for doc_id in range(N):
-        doc_tf_dict = get_term_freq(doc_terms[doc_id])
-        for term, tf in doc_tf_dict.items():
-            weight = tf * idfs[term]
-            doc_norms[doc_id] += weight * weight
-        
-        doc_norms[doc_id] = math.sqrt(doc_norms[doc_id]) if doc_norms[doc_id] > 0 else 0.0
-    
+#3. BM25 Ranking
+def bm25_search(query, collection, stopword_filtered=False, stemmed=False, index=None, top_k=None, hits_only=False,
+                k1=BM25_K1, b=BM25_B, title_boost=BM25_TITLE_BOOST):
+    """ Performs BM25F search over the text and title of the documents.
 
-    # Compute query using norm (using augemented tf * idf)
-    query_norm = 0.0
-    for term, tf in query_tf.items():
-        aug_tf = 0.5 + 0.5 * (tf / max_qtf) if max_qtf > 0 else 0.0
-        idf = idfs.get(term, 0.0)
-        weight = aug_tf * idf
-        query_norm += weight * weight
-    
-    query_norm = math.sqrt(query_norm) if query_norm > 0 else 0.0
-    if query_norm == 0.0:
-        return [(0.0, doc) for doc in collection]
-
-
-    # Accumulate dot products
-    accum = [0.0] * N
-    for term, q_tf in query_tf.items():
-        aug_tf = 0.5 + 0.5 * (q_tf / max_qtf) if max_qtf > 0 else 0.0
-        q_weight = aug_tf * idfs.get(term, 0.0)
-        for doc_id, doc_tf in inverted.get(term, []):
-            d_weight = doc_tf * idfs.get(term, 0.0)
-            accum[doc_id] += q_weight * d_weight
-    
-    # Calculate Cosine scores
-    result = []
-    for doc_id in range(N):
-        if doc_norms[doc_id] == 0.0:
-            score = 0.0
-        
-        else:
-            score = accum[doc_id] / (doc_norms[doc_id] * query_norm) if query_norm * doc_norms[doc_id] != 0 else 0.0
-        result.append((score, collection[doc_id]))
-    
-    # Sort result by descending order
-    result.sort(key=lambda x: x[0], reverse=True)
-    return result
+    Args:
+        query (_str_): Query String
+        collection (_doc : Document_): Collection of documents
+        stopword_filtered (bool, optional):  Defaults to False.
+        stemmed (bool, optional):  Defaults to False.
+        index (InvertedIndex, optional): Prebuilt index over the collection, reused across queries.
+            Defaults to None, which builds a temporary index for this query.
+        top_k (int, optional): Only return the k best documents. Defaults to None (all).
+        hits_only (bool, optional): Only return documents with a nonzero score. Defaults to False.
+        k1 (float, optional): Term frequency saturation. Defaults to BM25_K1.
+        b (float, optional): Length normalization between 0.0 and 1.0. Defaults to BM25_B.
+        title_boost (float, optional): Weight of a title occurrence, 0.0 for plain BM25. Defaults to BM25_TITLE_BOOST.
+
+    Returns:
+        list[tuple[float, Document]]: List of tuples of relevance score and Document.
+    """
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.bm25_search(query, stopword_filtered=stopword_filtered, stemmed=stemmed, top_k=top_k,
+                             hits_only=hits_only, k1=k1, b=b, title_boost=title_boost)
+
+
+#4. Boolean Query Search
+def boolean_query_search(query, collection, stopword_filtered=False, stemmed=False, index=None):
+    """
+    Finds the documents matching a boolean query of AND, OR, NOT and parentheses, see InvertedIndex.boolean_query.
+
+    Args:
+        query (str): The query, e.g. 'wolf AND (lamb OR sheep) AND NOT fox'.
+        collection (list[Document]): List of Document objects.
+        stopword_filtered (bool): If True, use doc.filtered_terms instead of raw terms.
+        stemmed (bool): If True, search is performed on stemmed terms.
+        index (InvertedIndex, optional): Prebuilt index over the collection, reused across queries.
+            Defaults to None, which builds a temporary index for this query.
+    Returns:
+        list[Document]: The matching documents.
+    """
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.boolean_query(query, stopword_filtered=stopword_filtered, stemmed=stemmed)
+
+
+#5. Phrase and Proximity Search
+def phrase_search(query, collection, stopword_filtered=False, stemmed=False, index=None):
+    """
+    Counts the matches of a phrase or proximity query, see InvertedIndex.phrase_search.
+
+    Args:
+        query (str): A phrase, or phrases joined by NEAR/k operators, e.g. '"the wolf" NEAR/3 lamb'.
+        collection (list[Document]): List of Document objects.
+        stopword_filtered (bool): If True, use doc.filtered_terms instead of raw terms.
+        stemmed (bool): If True, search is performed on stemmed terms.
+        index (InvertedIndex, optional): Prebuilt index over the collection, reused across queries.
+            Defaults to None, which builds a temporary index for this query.
+    Returns:
+        list[tuple[int, Document]]: List of tuples of number of matches and Document.
+    """
+    if index is None:
+        index = InvertedIndex(collection)
+    return index.phrase_search(query, stopword_filtered=stopword_filtered, stemmed=stemmed)
     
     
 def precision_recall(retrieved, relevant):
@@ -0,0 +1,64 @@
+import unittest
+import math
+from document import Document
+from my_module import InvertedIndex, QueryCache, bm25_search
+
+
+def make_collection():
+    d1 = Document(0, "The Wolf and the Lamb", "", ["the", "wolf", "saw", "a", "lamb"], "Author", "Origin")
+    d2 = Document(1, "The Fox", "", ["the", "fox", "saw", "the", "wolf", "and", "the", "wolf", "ran"], "Author", "Origin")
+    d3 = Document(2, "The Crow", "", ["a", "crow", "saw", "a", "fox"], "Author", "Origin")
+    return [d1, d2, d3]
+
+
+def reference_bm25(query_terms, collection, k1, b):
+    n = len(collection)
+    avg_length = sum(len(doc.terms) for doc in collection) / n
+    scores = []
+    for doc in collection:
+        score = 0.0
+        for term in query_terms:
+            df = sum(term in other.terms for other in collection)
+            if df:
+                tf = doc.terms.count(term)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc.terms) / avg_length))
+        scores.append(score)
+    return scores
+
+
+class TestBM25(unittest.TestCase):
+    def test_matches_reference(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        for query in ["wolf", "fox saw", "wolf wolf lamb", "unknown"]:
+            for k1, b in [(1.2, 0.75), (2.0, 0.0), (0.5, 1.0)]:
+                result = index.bm25_search(query, k1=k1, b=b, title_boost=0.0)
+                expected = reference_bm25(query.split(), collection, k1, b)
+                self.assertEqual(len(result), 3)
+                for score, doc in result:
+                    self.assertAlmostEqual(score, expected[doc.document_id])
+                self.assertEqual([score for score, _ in result], sorted((score for score, _ in result), reverse=True))
+
+    def test_title_boost(self):
+        collection = make_collection()
+        # The longer text mentions the wolf twice, but the first title is about it
+        self.assertEqual(bm25_search("wolf", collection, title_boost=0.0, hits_only=True)[0][1], collection[1])
+        self.assertEqual(bm25_search("wolf", collection, title_boost=2.0, hits_only=True)[0][1], collection[0])
+        self.assertEqual(bm25_search("crow", collection, top_k=1), bm25_search("crow", collection)[:1])
+
+    def test_lengths_follow_updates(self):
+        collection = make_collection()
+        index = InvertedIndex(collection[:2], cache=QueryCache())
+        self.assertEqual(index.variant().avg_length, 7.0)
+        before = index.bm25_search("wolf", hits_only=True)
+        index.add_documents(collection[2:])
+        index.remove_document(collection[0])
+        self.assertEqual(index.variant().doc_lengths, [0, 9, 5])
+        self.assertEqual(index.variant().avg_length, 7.0)
+        self.assertNotEqual(index.bm25_search("wolf", hits_only=True), before)
+        self.assertEqual(index.bm25_search("crow", hits_only=True, title_boost=1.0)[0][1], collection[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
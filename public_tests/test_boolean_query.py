@@ -0,0 +1,66 @@
+import unittest
+from document import Document
+from my_module import InvertedIndex, QueryCache, boolean_query_search, _gallop_intersect
+
+
+def make_collection():
+    d1 = Document(0, "Doc1", "", ["the", "wolf", "and", "the", "lamb"], "Author", "Origin")
+    d2 = Document(1, "Doc2", "", ["the", "fox", "and", "the", "crow"], "Author", "Origin")
+    d3 = Document(2, "Doc3", "", ["the", "wolf", "and", "the", "crane"], "Author", "Origin")
+    d4 = Document(3, "Doc4", "", ["the", "lamb", "and", "the", "wolves"], "Author", "Origin")
+    return [d1, d2, d3, d4]
+
+
+def ids(documents):
+    return [doc.document_id for doc in documents]
+
+
+class TestBooleanQuery(unittest.TestCase):
+    def test_operators(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        self.assertEqual(ids(index.boolean_query("wolf AND lamb")), [0])
+        self.assertEqual(ids(index.boolean_query("wolf lamb")), [0])
+        self.assertEqual(ids(index.boolean_query("lamb OR crow")), [0, 1, 3])
+        self.assertEqual(ids(index.boolean_query("wolf AND NOT lamb")), [2])
+        self.assertEqual(ids(index.boolean_query("NOT wolf")), [1, 3])
+        self.assertEqual(ids(index.boolean_query("Wolf AND (Lamb OR Crane)")), [0, 2])
+        self.assertEqual(ids(index.boolean_query("unknown OR fox")), [1])
+        self.assertEqual(index.boolean_query(""), [])
+
+    def test_precedence(self):
+        collection = make_collection()
+        # NOT binds tighter than AND, AND tighter than OR; lowercase operators are terms
+        self.assertEqual(ids(boolean_query_search("crow OR wolf AND NOT crane", collection)), [0, 1])
+        self.assertEqual(ids(boolean_query_search("(crow OR wolf) AND NOT crane", collection)), [0, 1])
+        self.assertEqual(ids(boolean_query_search("NOT NOT fox", collection)), [1])
+        self.assertEqual(ids(boolean_query_search("fox and", collection)), [1])
+
+    def test_phrases_and_stemming(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        self.assertEqual(ids(index.boolean_query('"the lamb" AND NOT "wolf and"')), [3])
+        self.assertEqual(ids(index.boolean_query('"lamb NEAR/2 wolves" OR fox')), [1, 3])
+        self.assertEqual(ids(index.boolean_query("wolves AND lamb", stemmed=True)), [3])
+        self.assertEqual(ids(index.boolean_query("wolf AND lambs", stemmed=True)), [0])
+
+    def test_malformed(self):
+        index = InvertedIndex(make_collection())
+        for query in ["wolf AND", "(wolf OR lamb", "wolf )", "OR lamb", "NOT"]:
+            with self.assertRaises(ValueError):
+                index.boolean_query(query)
+
+    def test_cached(self):
+        index = InvertedIndex(make_collection(), cache=QueryCache())
+        result = index.boolean_query("wolf AND lamb")
+        self.assertEqual(index.boolean_query("(WOLF) lamb"), result)
+        self.assertEqual(index.cache.info()['hits'], 1)
+
+    def test_gallop_intersect(self):
+        large = list(range(0, 1000, 3))
+        for small in ([], [0], [999], [1, 3, 4, 6, 500, 501, 996, 2000], list(range(0, 1000, 7))):
+            self.assertEqual(_gallop_intersect(small, large), sorted(set(small) & set(large)))
+
+
+if __name__ == "__main__":
+    unittest.main()
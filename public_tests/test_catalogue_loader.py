@@ -0,0 +1,75 @@
+import unittest
+import os
+import json
+import time
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from my_module import load_catalogue
+
+BOOK = "Preface\nTHE FIRST TALE\n\n\nOnce upon a time.\n\n\n\n\nTHE SECOND TALE\n\n\nThe end.\n"
+PATTERN = r"([A-Z ]+)\n{3}(.*?)(?=\n{5}|$)"
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.3)
+        body = BOOK.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCatalogueLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_catalogue(self, entries):
+        path = os.path.join(self.tmp.name, 'catalogue.json')
+        with open(path, 'w') as f:
+            json.dump(entries, f)
+        return path
+
+    def test_merged_collection(self):
+        book_path = os.path.join(self.tmp.name, 'book.txt')
+        with open(book_path, 'w') as f:
+            f.write(BOOK)
+        url = 'file://' + book_path
+        catalogue = self.write_catalogue([
+            {"doc_id": 1, "url": url, "author": "A", "origin": "Chapters", "start_line": 1, "end_line": None,
+             "search_pattern": PATTERN},
+            {"doc_id": 2, "url": url, "author": "B", "origin": "Whole Book", "start_line": 1, "end_line": None},
+        ])
+
+        docs = load_catalogue(catalogue)
+        self.assertEqual([doc.document_id for doc in docs], [0, 1, 2])
+        self.assertEqual([doc.title for doc in docs], ["THE FIRST TALE", "THE SECOND TALE", "Whole Book"])
+        self.assertEqual(docs[2].author, "B")
+        self.assertIn("upon", docs[2].terms)
+
+    def test_downloads_run_concurrently(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            entries = [{"doc_id": i, "url": f"http://127.0.0.1:{server.server_port}/{i}.txt", "author": "A",
+                        "origin": "O", "start_line": 1, "end_line": None} for i in range(6)]
+            start = time.time()
+            docs = load_catalogue(self.write_catalogue(entries), search_pattern=PATTERN, max_per_host=6)
+            elapsed = time.time() - start
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(docs), 12)
+        self.assertLess(elapsed, 6 * 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import copy
+from unittest import mock
+from document import Document
+from my_module import InvertedIndex, StopwordFilter, PorterStemmer
+import test_wrapper
+
+
+class TestDocumentTermVariants(unittest.TestCase):
+    def test_variants_are_computed_lazily(self):
+        doc = Document(0, "Doc1", "", ["The", "Connected", "devices", "and"], "Author", "Origin")
+        self.assertIsNone(doc._stemmed_terms)
+        self.assertEqual(doc.filtered_terms(), ["connected", "devices"])
+        self.assertEqual(doc.stemmed_terms(), ["the", "connect", "devic", "and"])
+        self.assertEqual(doc.filtered_stemmed_terms(), ["connect", "devic"])
+
+    def test_variants_are_memoized(self):
+        doc = Document(0, "Doc1", "", ["connected", "devices"], "Author", "Origin")
+        stemmed = doc.stemmed_terms()
+        with mock.patch.object(PorterStemmer, 'stem_many') as stem_many:
+            self.assertIs(doc.stemmed_terms(), stemmed)
+            InvertedIndex([doc]).variant(stemmed=True)
+        stem_many.assert_not_called()
+
+    def test_new_terms_and_filters_reset_variants(self):
+        doc = Document(0, "Doc1", "", ["connected"], "Author", "Origin")
+        self.assertEqual(doc.filtered_stemmed_terms(), ["connect"])
+        StopwordFilter(["connected"]).filter_collection([doc])
+        self.assertEqual(doc.filtered_stemmed_terms(), [])
+        doc.terms = ["devices"]
+        self.assertEqual((doc.stemmed_terms(), doc.filtered_terms()), (["devic"], ["devices"]))
+
+    def test_set_terms_keeps_the_list(self):
+        terms = ["connected"]
+        doc = Document(0, "Doc1", "", terms, "Author", "Origin")
+        self.assertIs(doc.terms, terms)
+        self.assertEqual(doc.stemmed_terms(), ["connect"])
+        version = doc.terms_version
+        terms.append("devices")
+        doc.set_terms(terms)
+        self.assertGreater(doc.terms_version, version)
+        self.assertEqual(doc.stemmed_terms(), ["connect", "devic"])
+
+    def test_copies_reset_their_own_variants(self):
+        doc = Document(0, "Doc1", "", ["connected"], "Author", "Origin")
+        self.assertEqual(doc.stemmed_terms(), ["connect"])
+        other = copy.copy(doc)
+        other.terms = ["devices"]
+        self.assertEqual((doc.stemmed_terms(), other.stemmed_terms()), (["connect"], ["devic"]))
+
+    def test_filter_after_stem(self):
+        doc = Document(0, "Doc1", "", ["connected", "wolves", "running"], "Author", "Origin")
+        self.assertEqual(doc.filtered_stemmed_terms(), ["connect", "wolv", "run"])
+        test_wrapper.remove_stopwords_by_list(doc, {"wolves"})
+        self.assertEqual(doc.filtered_stemmed_terms(), ["connect", "run"])
+        self.assertEqual(test_wrapper.linear_boolean_search("wolv", [doc], True, True), [(0, doc)])
+
+        test_wrapper.remove_stopwords_by_frequency(doc, [doc], 0.0, 1.0)
+        self.assertEqual(doc.filtered_stemmed_terms(), [])
+        doc.set_filtered_terms(["running"])
+        self.assertEqual((doc.filtered_terms(), doc.filtered_stemmed_terms()), (["running"], ["run"]))
+
+    def test_stem_documents_fills_missing_variants(self):
+        docs = [Document(0, "Doc1", "", ["connecting", "the"], "Author", "Origin")]
+        PorterStemmer().stem_documents(docs, workers=1)
+        self.assertEqual((docs[0]._stemmed_terms, docs[0]._filtered_stemmed_terms), (["connect", "the"], ["connect"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
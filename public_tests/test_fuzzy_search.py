@@ -0,0 +1,66 @@
+import unittest
+import random
+import Levenshtein
+from document import Document
+from my_module import FuzzyVocabulary, InvertedIndex, vector_space_search, linear_boolean_search
+
+
+def make_collection():
+    d1 = Document(0, "Doc1", "", ["the", "tortoise", "and", "the", "hare"], "Author", "Origin")
+    d2 = Document(1, "Doc2", "", ["the", "wolf", "and", "the", "lamb"], "Author", "Origin")
+    d3 = Document(2, "Doc3", "", ["the", "wolves", "and", "the", "wool"], "Author", "Origin")
+    return [d1, d2, d3]
+
+
+class TestFuzzyVocabulary(unittest.TestCase):
+    def test_matches_levenshtein_scan(self):
+        rng = random.Random(0)
+        terms = {"".join(rng.choices("abcde", k=rng.randint(1, 8))) for _ in range(2000)}
+        vocabulary = FuzzyVocabulary(terms)
+        for query in rng.sample(sorted(terms), 20) + ["", "a", "abcdeabcde", "xyz"]:
+            for max_dist in (0, 1, 2, 3):
+                expected = sorted(((term, Levenshtein.distance(query, term)) for term in terms
+                                   if Levenshtein.distance(query, term, max_dist=max_dist) <= max_dist),
+                                  key=lambda match: (match[1], match[0]))
+                self.assertEqual(vocabulary.search(query, max_dist), expected)
+
+    def test_closest_first(self):
+        vocabulary = FuzzyVocabulary(["wolf", "wolves", "wool", "golf", "woolf"])
+        self.assertEqual(vocabulary.search("wolff", 2), [("wolf", 1), ("golf", 2), ("woolf", 2)])
+        self.assertEqual(vocabulary.search("wolf", 1), [("wolf", 0), ("golf", 1), ("woolf", 1)])
+
+
+class TestFuzzySearch(unittest.TestCase):
+    def test_vector_space_search(self):
+        collection = make_collection()
+        self.assertEqual(vector_space_search("tortise", collection, hits_only=True), [])
+        result = vector_space_search("tortise", collection, hits_only=True, fuzzy=1)
+        self.assertEqual([doc for _, doc in result], [collection[0]])
+        self.assertEqual(result, vector_space_search("tortoise", collection, hits_only=True))
+
+    def test_exact_terms_are_kept(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        for query in ["wolf lamb", "wolf unknown unknown"]:
+            self.assertEqual(index.search(query, fuzzy=0), index.search(query))
+        self.assertEqual(index.search_many(["wolff", "tortise"], fuzzy=1),
+                         [index.search("wolff", fuzzy=1), index.search("tortise", fuzzy=1)])
+
+    def test_boolean_search(self):
+        collection = make_collection()
+        self.assertEqual(linear_boolean_search("wolff", collection, fuzzy=1),
+                         [(0, collection[0]), (1, collection[1]), (0, collection[2])])
+        self.assertEqual(linear_boolean_search("wolf", collection, fuzzy=2),
+                         [(0, collection[0]), (1, collection[1]), (1, collection[2])])
+
+    def test_vocabulary_follows_updates(self):
+        collection = make_collection()
+        index = InvertedIndex(collection[:2])
+        vocabulary = index.fuzzy_vocabulary()
+        index.add_documents(collection[2:])
+        self.assertIsNot(index.fuzzy_vocabulary(), vocabulary)
+        self.assertEqual(index.fuzzy_vocabulary().search("wolvs", 1), [("wolves", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
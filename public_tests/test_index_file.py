@@ -0,0 +1,74 @@
+import unittest
+import os
+import tempfile
+from document import Document
+from my_module import InvertedIndex, IndexFile, INDEX_FORMAT_VERSION, _INDEX_HEADER
+
+
+def make_collection():
+    d1 = Document(0, "The Fox", "The quick brown fox.", ["the", "quick", "brown", "fox"], "Aesop", "Fables")
+    d2 = Document(1, "The Dog", "Jumps over the lazy dog.", ["jumps", "over", "the", "lazy", "dog"], "Aesop", "Fables")
+    d3 = Document(2, "Größe", "The fox and the dog, größer.", ["the", "fox", "and", "the", "dog", "größer"], "Grimm", "Tales")
+    return [d1, d2, d3]
+
+
+def as_tuples(results):
+    return [(score, doc.document_id) for score, doc in results]
+
+
+class TestIndexFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'index.bin')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        index.save(self.path)
+        loaded = InvertedIndex.load(self.path)
+
+        for query in ["fox dog", "lazy", "größer", "unknown", ""]:
+            for stemmed in (False, True):
+                self.assertEqual(as_tuples(loaded.search(query, stemmed=stemmed)),
+                                 as_tuples(index.search(query, stemmed=stemmed)))
+        self.assertEqual(as_tuples(loaded.boolean_search("The")), as_tuples(index.boolean_search("The")))
+        self.assertEqual(as_tuples(loaded.search("fox dog", top_k=2)), as_tuples(index.search("fox dog", top_k=2)))
+        self.assertEqual(as_tuples(loaded.bm25_search("fox dog")), as_tuples(index.bm25_search("fox dog")))
+        self.assertEqual(list(loaded.variant().postings["fox"]), [(0, 1), (2, 1)])
+        self.assertEqual(loaded.variant().idfs, index.variant().idfs)
+        loaded.index_file.close()
+
+    def test_documents_read_text_lazily(self):
+        collection = make_collection()
+        InvertedIndex(collection).save(self.path)
+        documents = IndexFile(self.path).documents
+        self.assertEqual([(doc.document_id, doc.title, doc.author, doc.origin) for doc in documents],
+                         [(doc.document_id, doc.title, doc.author, doc.origin) for doc in collection])
+        self.assertIsNone(documents[2]._raw_text)
+        self.assertEqual(documents[2].raw_text, "The fox and the dog, größer.")
+        self.assertEqual(str(documents[0]), str(collection[0]))
+
+    def test_loaded_index_is_read_only(self):
+        collection = make_collection()
+        InvertedIndex(collection).save(self.path, variants=[(False, False)])
+        loaded = InvertedIndex.load(self.path)
+        with self.assertRaises(ValueError):
+            loaded.variant(stemmed=True)
+        with self.assertRaises(ValueError):
+            loaded.add_documents([Document(3, "New", "", ["new"], "A", "O")])
+
+    def test_version_mismatch(self):
+        InvertedIndex(make_collection()).save(self.path)
+        with open(self.path, 'r+b') as f:
+            magic, version, toc_offset, toc_length = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            f.seek(0)
+            f.write(_INDEX_HEADER.pack(magic, INDEX_FORMAT_VERSION + 1, toc_offset, toc_length))
+        with self.assertRaises(ValueError):
+            IndexFile(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import unittest
+import random
+import sys
+from document import Document
+from my_module import InvertedIndex, Postings, _PostingsCursor, vector_space_search, linear_boolean_search, \
+    vector_space_search_many, linear_boolean_search_many
+
+
+def make_collection():
+    d1 = Document(0, "Doc1", "the quick brown fox", ["the", "quick", "brown", "fox"], "Author", "Origin")
+    d2 = Document(1, "Doc2", "jumps over the lazy dog", ["jumps", "over", "the", "lazy", "dog"], "Author", "Origin")
+    d3 = Document(2, "Doc3", "the fox and the dog", ["the", "fox", "and", "the", "dog"], "Author", "Origin")
+    return [d1, d2, d3]
+
+
+class TestInvertedIndex(unittest.TestCase):
+    def test_search_matches_vector_space_search(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        for query in ["quick dog", "fox", "the fox fox", "unknown", ""]:
+            expected = vector_space_search(query, collection, stopword_filtered=False, stemmed=False)
+            self.assertEqual(index.search(query), expected)
+            self.assertEqual(vector_space_search(query, collection, index=index), expected)
+
+    def test_variant_is_built_once(self):
+        index = InvertedIndex(make_collection())
+        raw = index.variant()
+        index.search("fox")
+        index.search("dog")
+        self.assertIs(index.variant(), raw)
+        self.assertIsNot(index.variant(stemmed=True), raw)
+
+    def test_postings_and_idf(self):
+        index = InvertedIndex(make_collection()).variant()
+        self.assertEqual(list(index.postings["the"]), [(0, 1), (1, 1), (2, 2)])
+        self.assertEqual(list(index.postings["fox"]), [(0, 1), (2, 1)])
+        self.assertEqual(index.idfs["the"], 0.0)
+        self.assertGreater(index.idfs["quick"], index.idfs["fox"])
+
+    def test_filtered_terms_method(self):
+        collection = make_collection()
+        for doc in collection:
+            doc._filtered_terms = [t for t in doc.terms if t not in ("the", "and")]
+        result = InvertedIndex(collection).search("fox", stopword_filtered=True)
+        self.assertEqual({doc.document_id for score, doc in result if score > 0}, {0, 2})
+
+    def assertSameRanking(self, result, expected):
+        self.assertEqual([doc for score, doc in result], [doc for score, doc in expected])
+        for (score, _), (expected_score, _) in zip(result, expected):
+            self.assertAlmostEqual(score, expected_score, places=12)
+
+    def test_add_and_remove_documents(self):
+        collection = make_collection()
+        index = InvertedIndex(collection[:2])
+        index.search("fox")
+        self.assertEqual(index.add_documents(collection[2:]), [2])
+        self.assertSameRanking(index.search("the fox dog"), InvertedIndex(collection).search("the fox dog"))
+
+        index.remove_document(collection[0])
+        self.assertEqual(list(index.variant().postings["fox"]), [(2, 1)])
+        self.assertNotIn("quick", index.variant().postings)
+        self.assertEqual(index.collection, collection[1:])
+        self.assertSameRanking(index.search("lazy fox"), InvertedIndex(collection[1:]).search("lazy fox"))
+        self.assertEqual(index.boolean_search("dog"), [(1, collection[1]), (1, collection[2])])
+        with self.assertRaises(KeyError):
+            index.remove_document(collection[0])
+
+    def test_update_document(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        index.search("fox")
+        generation = index.generation
+        collection[1].terms = ["the", "red", "fox"]
+        index.update_document(collection[1])
+        self.assertGreater(index.generation, generation)
+        self.assertEqual(list(index.variant().postings["fox"]), [(0, 1), (1, 1), (2, 1)])
+        self.assertSameRanking(index.search("red fox"), InvertedIndex(collection).search("red fox"))
+
+    def test_updates_match_a_rebuild(self):
+        # Mostly stopwords, so the few content terms decide close scores
+        rng = random.Random(3)
+        words = ["the", "and", "of", "a", "to", "in"] * 5 + ["fox", "wolf", "lamb", "crow", "lion", "mouse"]
+        collection = [Document(i, f"Doc{i}", "", rng.choices(words, k=rng.randint(5, 40)), "Author", "Origin")
+                      for i in range(60)]
+        index = InvertedIndex(collection[:20])
+        index.search("fox wolf")
+        index.add_documents(collection[20:])
+        for doc in collection[5:50:3]:
+            index.remove_document(doc)
+        for doc in collection[1:60:7]:
+            if doc in index.collection:
+                doc.terms = doc.terms + ["lamb", "the"]
+                index.update_document(doc)
+        rebuilt = InvertedIndex(index.collection)
+        norms = [norm for norm in index.variant().doc_norms if norm]
+        self.assertEqual(norms, [norm for norm in rebuilt.variant().doc_norms if norm])
+        for query in ["fox", "the wolf", "lamb and crow", "mouse lion fox the"]:
+            self.assertEqual(index.search(query), rebuilt.search(query))
+            self.assertEqual(index.search(query, top_k=5), rebuilt.search(query, top_k=5))
+
+    def test_top_k(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        full = index.search("quick fox")
+        self.assertEqual(index.search("quick fox", top_k=2), full[:2])
+        self.assertEqual(index.search("quick fox", top_k=3), full)
+        self.assertEqual(index.search("lazy", top_k=2), index.search("lazy")[:2])
+        self.assertEqual(vector_space_search("quick fox", collection, index=index, top_k=1), full[:1])
+
+    def test_hits_only(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        self.assertEqual(index.search("quick fox", hits_only=True), [(s, d) for s, d in index.search("quick fox") if s != 0])
+        self.assertEqual([doc for _, doc in index.search("lazy", hits_only=True)], [collection[1]])
+        self.assertEqual(index.search("lazy", top_k=5, hits_only=True), index.search("lazy", hits_only=True))
+        self.assertEqual(index.search("unknown", hits_only=True), [])
+
+    def test_top_k_pruning_matches_exhaustive(self):
+        rng = random.Random(0)
+        words = [f"w{i}" for i in range(60)]
+        weights = [1 / (rank + 1) for rank in range(len(words))]
+        collection = [Document(i, f"Doc{i}", "", rng.choices(words, weights, k=rng.randint(1, 40)), "Author", "Origin")
+                      for i in range(400)]
+        index = InvertedIndex(collection)
+        for _ in range(40):
+            query = " ".join(rng.choices(words, weights, k=rng.randint(2, 5)))
+            full = index.search(query)
+            for k in (1, 10, 50):
+                self.assertEqual(index.search(query, top_k=k), full[:k])
+
+    def test_search_many_matches_search(self):
+        rng = random.Random(1)
+        words = [f"w{i}" for i in range(60)]
+        weights = [1 / (rank + 1) for rank in range(len(words))]
+        collection = [Document(i, f"Doc{i}", "", rng.choices(words, weights, k=rng.randint(1, 40)), "Author", "Origin")
+                      for i in range(200)]
+        index = InvertedIndex(collection)
+        queries = [" ".join(rng.choices(words, weights, k=rng.randint(1, 4))) for _ in range(30)]
+        queries += queries[:5] + ["", "unknown"]
+        for top_k, hits_only, stemmed in [(None, False, False), (5, True, False), (10, False, True)]:
+            expected = [index.search(query, stemmed=stemmed, top_k=top_k, hits_only=hits_only) for query in queries]
+            self.assertEqual(index.search_many(queries, stemmed=stemmed, top_k=top_k, hits_only=hits_only), expected)
+            self.assertEqual(index.search_many(queries, stemmed=stemmed, top_k=top_k, hits_only=hits_only,
+                                               workers=2, chunk_size=8), expected)
+        collection = make_collection()
+        self.assertEqual(vector_space_search_many(["fox dog"], collection), [vector_space_search("fox dog", collection)])
+
+    def test_boolean_search(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        self.assertEqual(index.boolean_search("THE"), [(1, collection[0]), (1, collection[1]), (2, collection[2])])
+        self.assertEqual(linear_boolean_search("dog", collection, index=index),
+                         [(0, collection[0]), (1, collection[1]), (1, collection[2])])
+
+    def test_boolean_search_stems_term(self):
+        d1 = Document(0, "Doc1", "connected devices", ["connected", "devices"], "Author", "Origin")
+        d2 = Document(1, "Doc2", "unrelated", ["unrelated"], "Author", "Origin")
+        result = linear_boolean_search("connecting", [d1, d2], stemmed=True)
+        self.assertEqual(result, [(1, d1), (0, d2)])
+
+    def test_boolean_search_many(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        terms = ["THE", "dog", "unknown", "the"]
+        self.assertEqual(index.boolean_search_many(terms), [index.boolean_search(term) for term in terms])
+        self.assertEqual(linear_boolean_search_many(["foxes", "dogs"], collection, stemmed=True),
+                         [linear_boolean_search(term, collection, stemmed=True) for term in ["foxes", "dogs"]])
+
+
+class TestPostings(unittest.TestCase):
+    def test_round_trip(self):
+        pairs = [(0, 1), (5, 300), (200, 2), (70000, 1), (70001, 100000)]
+        postings = Postings(pairs)
+        self.assertEqual(list(postings), pairs)
+        self.assertEqual(len(postings), 5)
+        self.assertEqual(len(postings.data), 1 + 1 + 1 + 2 + 2 + 1 + 3 + 1 + 1 + 3)
+        flat = [value for pair in pairs for value in pair]
+        from_pairs = Postings.from_pairs(flat)
+        self.assertEqual((from_pairs.data, len(from_pairs), from_pairs.last), (postings.data, 5, 70001))
+        with self.assertRaises(ValueError):
+            Postings.from_pairs([3, 1, 3, 1])
+
+    def test_insert_and_remove(self):
+        postings = Postings([(1, 1), (9, 2)])
+        postings.insert(4, 3)
+        postings.insert(10, 1)
+        self.assertEqual(list(postings), [(1, 1), (4, 3), (9, 2), (10, 1)])
+        postings.remove(9)
+        self.assertEqual(list(postings), [(1, 1), (4, 3), (10, 1)])
+        with self.assertRaises(ValueError):
+            postings.remove(9)
+        with self.assertRaises(ValueError):
+            postings.append(2, 1)
+
+
+    def test_cursor_skips(self):
+        pairs = [(doc_id, doc_id % 7 + 1) for doc_id in range(0, 3000, 3)]
+        postings = Postings(pairs)
+        bases, offsets = postings.skips()
+        self.assertEqual(len(bases), (len(pairs) - 1) // 32)
+        cursor = _PostingsCursor(postings)
+        for target in (0, 1, 100, 101, 1500, 2997):
+            cursor.advance(target)
+            self.assertEqual((cursor.doc_id, cursor.tf), next(p for p in pairs if p[0] >= target))
+        cursor.advance(3000)
+        self.assertEqual(cursor.doc_id, sys.maxsize)
+
+
+if __name__ == "__main__":
+    unittest.main()
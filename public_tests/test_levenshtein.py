@@ -0,0 +1,48 @@
+import unittest
+import random
+import Levenshtein
+
+
+def matrix_distance(s, t):
+    # The original full (m+1) x (n+1) matrix computation
+    dp = [[i + j if i * j == 0 else 0 for j in range(len(t) + 1)] for i in range(len(s) + 1)]
+    for i in range(1, len(s) + 1):
+        for j in range(1, len(t) + 1):
+            dp[i][j] = min(dp[i - 1][j] + 1, dp[i][j - 1] + 1, dp[i - 1][j - 1] + (s[i - 1] != t[j - 1]))
+    return dp[-1][-1]
+
+
+class TestLevenshtein(unittest.TestCase):
+    def test_known_distances(self):
+        self.assertEqual(Levenshtein.distance("kitten", "sitting"), 3)
+        self.assertEqual(Levenshtein.distance("", "abc"), 3)
+        self.assertEqual(Levenshtein.distance("flaw", "lawn"), 2)
+        self.assertEqual(Levenshtein.distance("größe", "grosse"), 3)
+        self.assertEqual(Levenshtein.distance("same", "same", max_dist=0), 0)
+
+    def test_max_dist(self):
+        self.assertEqual(Levenshtein.distance("kitten", "sitting", max_dist=3), 3)
+        self.assertEqual(Levenshtein.distance("kitten", "sitting", max_dist=2), 3)
+        self.assertEqual(Levenshtein.distance("a", "abcdefgh", max_dist=1), 2)
+        self.assertEqual(Levenshtein.distance("a" * 1000, "b" * 1000, max_dist=5), 6)
+
+    def test_matches_matrix_distance(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            alphabet = rng.choice(["ab", "abcdef", "aéß日"])
+            # Lengths around the word size take the bit-parallel path, the band or both
+            s = "".join(rng.choices(alphabet, k=rng.choice([0, 3, 12, 64, 65, 90])))
+            t = list(s)
+            for _ in range(rng.randint(0, 8)):
+                t.insert(rng.randint(0, len(t)), rng.choice(alphabet))
+                t[rng.randrange(len(t))] = rng.choice(alphabet)
+                del t[rng.randrange(len(t))]
+            t = "".join(t[rng.randint(0, 2):])
+            expected = matrix_distance(s, t)
+            self.assertEqual(Levenshtein.distance(s, t), expected)
+            for max_dist in (0, 1, 4, 40):
+                self.assertEqual(Levenshtein.distance(s, t, max_dist=max_dist), min(expected, max_dist + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from document import Document
+from my_module import InvertedIndex, QueryCache, StopwordFilter, phrase_search
+
+
+def make_collection():
+    d1 = Document(0, "Doc1", "", ["the", "wolf", "and", "the", "lamb"], "Author", "Origin")
+    d2 = Document(1, "Doc2", "", ["the", "lamb", "saw", "the", "wolf", "the", "wolf"], "Author", "Origin")
+    d3 = Document(2, "Doc3", "", ["wolves", "and", "lambs", "and", "a", "wolf"], "Author", "Origin")
+    return [d1, d2, d3]
+
+
+def counts(results):
+    return [count for count, _ in results]
+
+
+class TestPhraseSearch(unittest.TestCase):
+    def test_phrases(self):
+        collection = make_collection()
+        self.assertEqual(counts(phrase_search("the wolf", collection)), [1, 2, 0])
+        self.assertEqual(counts(phrase_search('"The Lamb"', collection)), [1, 1, 0])
+        self.assertEqual(counts(phrase_search("wolf the", collection)), [0, 1, 0])
+        self.assertEqual(counts(phrase_search("the", collection)), [2, 3, 0])
+        self.assertEqual(counts(phrase_search("the unknown", collection)), [0, 0, 0])
+        self.assertEqual(counts(phrase_search("", collection)), [0, 0, 0])
+
+    def test_near(self):
+        collection = make_collection()
+        self.assertEqual(counts(phrase_search("wolf NEAR/1 lamb", collection)), [0, 0, 0])
+        self.assertEqual(counts(phrase_search("wolf NEAR/2 lamb", collection)), [1, 1, 0])
+        self.assertEqual(counts(phrase_search("lamb near/0 saw", collection)), [0, 1, 0])
+        self.assertEqual(counts(phrase_search('"the wolf" NEAR/1 "the lamb"', collection)), [1, 1, 0])
+        self.assertEqual(counts(phrase_search("wolves NEAR/1 lambs NEAR/2 wolf", collection)), [0, 0, 1])
+        with self.assertRaises(ValueError):
+            phrase_search("NEAR/2 wolf", collection)
+
+    def test_stemmed_and_filtered(self):
+        collection = make_collection()
+        index = InvertedIndex(collection)
+        self.assertEqual(counts(index.phrase_search("wolves and lamb", stemmed=True)), [0, 0, 1])
+        StopwordFilter(["the", "and", "a"]).filter_collection(collection)
+        self.assertEqual(counts(index.phrase_search("wolf lamb", stopword_filtered=True)), [1, 0, 0])
+
+    def test_positions_follow_updates(self):
+        collection = make_collection()
+        index = InvertedIndex(collection[:2], cache=QueryCache())
+        self.assertEqual(counts(index.phrase_search("a wolf")), [0, 0])
+        index.add_documents(collection[2:])
+        index.remove_document(collection[0])
+        self.assertEqual(counts(index.phrase_search("a wolf")), [0, 1])
+        self.assertEqual(counts(index.phrase_search("the wolf")), [2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
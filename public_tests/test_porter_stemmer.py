@@ -0,0 +1,90 @@
+import unittest
+from document import Document
+from my_module import PorterStemmer, StemCache, DEFAULT_STEM_CACHE
+from test_wrapper import stem_term
+
+
+class TestStemCache(unittest.TestCase):
+    def test_repeated_words_hit_the_cache(self):
+        stemmer = PorterStemmer(cache=StemCache(maxsize=10))
+        for word in ["connected", "connecting", "connected", "connected"]:
+            stemmer.stem(word)
+        info = stemmer.cache.info()
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['size'], 2)
+
+    def test_lru_eviction(self):
+        cache = StemCache(maxsize=2)
+        cache.put("a", "a")
+        cache.put("b", "b")
+        cache.get("a")
+        cache.put("c", "c")
+        self.assertEqual(cache.get("a"), "a")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("a"), "a")
+
+    def test_cached_stem_is_unchanged(self):
+        stemmer = PorterStemmer(cache=StemCache(maxsize=0))
+        for word in ["caresses", "ponies", "hopping", "relational", "generalization"]:
+            self.assertEqual(PorterStemmer().stem(word), stemmer.stem(word))
+        self.assertEqual(len(stemmer.cache), 0)
+
+    def test_cache_is_shared(self):
+        stem_term("koalas")
+        hits = DEFAULT_STEM_CACHE.hits
+        PorterStemmer().stem("koalas")
+        self.assertEqual(DEFAULT_STEM_CACHE.hits, hits + 1)
+
+
+class TestPorterRules(unittest.TestCase):
+    # Stems produced by the original regex based rule tables
+    EXPECTED = {
+        'caresses': 'caress', 'ponies': 'poni', 'feed': 'feed', 'agreed': 'agre', 'plastered': 'plaster',
+        'bled': 'bled', 'motoring': 'motor', 'sing': 'sing', 'conflated': 'conflat', 'troubled': 'troubl',
+        'hopping': 'hop', 'falling': 'fall', 'filing': 'file', 'happy': 'happi', 'sky': 'sky',
+        'relational': 'relat', 'rational': 'ration', 'digitizer': 'digit', 'vietnamization': 'vietnam',
+        'operator': 'oper', 'hopefulness': 'hope', 'sensibiliti': 'sensibl', 'triplicate': 'triplic',
+        'electrical': 'electr', 'goodness': 'good', 'revival': 'reviv', 'adjustment': 'adjust',
+        'adoption': 'adopt', 'bowdlerize': 'bowdler', 'probate': 'probat', 'rate': 'rate',
+        'controll': 'controll', 'Connected': 'Connect', 'bedroom': 'bedroom',
+    }
+
+    def test_known_stems(self):
+        stemmer = PorterStemmer(cache=StemCache(maxsize=0))
+        for word, expected in self.EXPECTED.items():
+            self.assertEqual(stemmer.stem(word), expected, word)
+
+
+class TestBatchStemming(unittest.TestCase):
+    WORDS = ["connected", "connecting", "", "Connected", "ponies", "connected", "hopping", "relational"]
+
+    def test_stem_many_matches_stem(self):
+        stemmer = PorterStemmer(cache=StemCache())
+        expected = [PorterStemmer(cache=StemCache(maxsize=0)).stem(w) for w in self.WORDS]
+        self.assertEqual(stemmer.stem_many(self.WORDS, workers=1), expected)
+        # Every distinct word was stemmed exactly once
+        self.assertEqual(len(stemmer.cache), len(set(self.WORDS)) - 1)
+
+    def test_stem_many_process_pool(self):
+        stemmer = PorterStemmer(cache=StemCache())
+        expected = [PorterStemmer(cache=StemCache(maxsize=0)).stem(w) for w in self.WORDS]
+        self.assertEqual(stemmer.stem_many(self.WORDS, workers=2, chunk_size=2), expected)
+
+    def test_stem_documents(self):
+        d1 = Document(0, "Doc1", "", ["The", "connected", "devices"], "Author", "Origin")
+        d2 = Document(1, "Doc2", "", ["connecting"], "Author", "Origin")
+        d1.filtered_terms = ["connected", "devices"]
+        PorterStemmer().stem_documents([d1, d2], workers=1)
+        self.assertEqual(d1.stemmed_terms(), ["the", "connect", "devic"])
+        self.assertEqual(d1.filtered_stemmed_terms(), ["connect", "devic"])
+        self.assertEqual(d2.stemmed_terms(), ["connect"])
+        self.assertEqual(d2.filtered_stemmed_terms(), ["connect"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+from document import Document
+from my_module import QueryCache, InvertedIndex, StopwordFilter, CollectionStats, linear_boolean_search, \
+    vector_space_search
+
+
+def make_collection():
+    d1 = Document(0, "Doc1", "the quick brown fox", ["the", "quick", "brown", "fox"], "Author", "Origin")
+    d2 = Document(1, "Doc2", "jumps over the lazy dog", ["jumps", "over", "the", "lazy", "dog"], "Author", "Origin")
+    d3 = Document(2, "Doc3", "the fox and the dog", ["the", "fox", "and", "the", "dog"], "Author", "Origin")
+    return [d1, d2, d3]
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_lru_eviction_and_stats(self):
+        cache = QueryCache(maxsize=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        self.assertEqual(cache.get("a"), [1])
+        cache.put("c", [3])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), [3])
+        info = cache.info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (2, 1, 2))
+        self.assertAlmostEqual(info['hit_rate'], 2 / 3)
+
+    def test_max_age(self):
+        cache = QueryCache(max_age=10)
+        with mock.patch('my_module.time.monotonic', return_value=100.0):
+            cache.put("a", [1])
+        with mock.patch('my_module.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.get("a"), [1])
+        with mock.patch('my_module.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.info()['expired'], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_repeated_queries_hit_the_cache(self):
+        index = InvertedIndex(make_collection(), cache=QueryCache())
+        result = index.search("Fox, dog!")
+        self.assertEqual(index.search("fox dog"), result)
+        self.assertEqual(index.search_many(["fox   dog", "lazy"]), [result, index.search("lazy")])
+        self.assertEqual(index.boolean_search("FOX"), index.boolean_search("fox"))
+        # Normalized to the same terms; flags and options are part of the key
+        self.assertEqual(index.cache.info()['hits'], 4)
+        index.search("fox dog", top_k=1)
+        index.search("fox dog", stemmed=True)
+        self.assertEqual(index.cache.info()['hits'], 4)
+
+        # Callers get their own copy of a cached result
+        index.search("fox dog").clear()
+        self.assertEqual(index.search("fox dog"), result)
+
+    def test_updates_make_results_stale(self):
+        collection = make_collection()
+        index = InvertedIndex(collection[:2], cache=QueryCache())
+        self.assertEqual(len(index.search("fox", hits_only=True)), 1)
+        index.add_documents(collection[2:])
+        self.assertEqual(len(index.search("fox", hits_only=True)), 2)
+
+        StopwordFilter(["fox"]).filter_collection(collection)
+        self.assertEqual(len(index.search("dog", stopword_filtered=True, hits_only=True)), 2)
+        StopwordFilter(["dog"]).filter_collection(collection)
+        index.update_filtered_terms()
+        self.assertEqual(index.search("dog", stopword_filtered=True, hits_only=True), [])
+        self.assertEqual(index.cache.info()['hits'], 0)
+
+    def test_filtering_again_makes_results_stale(self):
+        collection = make_collection()
+        index = InvertedIndex(collection, cache=QueryCache())
+        self.assertEqual([tf for tf, _ in index.boolean_search("fox", stopword_filtered=True)], [1, 0, 1])
+        CollectionStats(collection).filter_collection(0.0, 0.5)
+        self.assertEqual(index.boolean_search("fox", stopword_filtered=True),
+                         InvertedIndex(collection).boolean_search("fox", stopword_filtered=True))
+        self.assertEqual(index.generation, 1)
+
+        # Single documents are re-indexed in place, new terms reach every variant
+        collection[1].set_filtered_terms(["fox"])
+        self.assertEqual([tf for tf, _ in index.boolean_search("fox", stopword_filtered=True)], [0, 1, 0])
+        collection[1].terms = ["lazy", "fox"]
+        self.assertEqual([tf for tf, _ in index.boolean_search("fox")], [1, 1, 1])
+        self.assertEqual(index.cache.info()['hits'], 0)
+
+    def test_index_is_reused_for_the_collection(self):
+        collection = make_collection()
+        index = InvertedIndex.for_collection(collection)
+        self.assertEqual([tf for tf, _ in linear_boolean_search("fox", collection, index=index)], [1, 0, 1])
+        vector_space_search("fox dog", collection, index=index)
+        linear_boolean_search("fox", collection, index=index)
+        self.assertIs(InvertedIndex.for_collection(collection, index), index)
+        self.assertEqual(index.cache.info()['hits'], 1)
+
+        # Appended documents are indexed in place, new terms and filtering are picked up by the index
+        collection.append(Document(3, "Doc4", "a fox", ["a", "fox"], "Author", "Origin"))
+        self.assertIs(InvertedIndex.for_collection(collection, index), index)
+        self.assertEqual([tf for tf, _ in linear_boolean_search("fox", collection, index=index)], [1, 0, 1, 1])
+        collection[1].terms = collection[1].terms + ["fox"]
+        StopwordFilter(["fox"]).filter_collection(collection)
+        self.assertEqual([tf for tf, _ in linear_boolean_search("fox", collection, index=index)], [1, 1, 1, 1])
+        self.assertEqual([tf for tf, _ in linear_boolean_search("fox", collection, True, index=index)], [0, 0, 0, 0])
+
+        # Any other change of the list, or another list, gets a new index
+        collection.pop(0)
+        self.assertIsNot(InvertedIndex.for_collection(collection, index), index)
+        self.assertIsNot(InvertedIndex.for_collection(list(collection), index), index)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import tempfile
+from document import Document
+from my_module import StopwordFilter, CollectionStats, remove_stop_words, remove_stop_words_by_frequency
+from test_wrapper import remove_stopwords_by_frequency
+
+test_dir = os.path.dirname(__file__)
+stopword_file_path = os.path.join(test_dir, "englishST.txt")
+
+
+class TestStopwordFilter(unittest.TestCase):
+    def test_file_is_loaded_once(self):
+        self.assertIs(StopwordFilter.from_file(stopword_file_path), StopwordFilter.from_file(stopword_file_path))
+        self.assertIsInstance(StopwordFilter.from_file(stopword_file_path).stopwords, frozenset)
+
+    def test_internal_list_independent_of_working_directory(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                self.assertEqual(remove_stop_words(["The", "fox", "and", "the", "Crow"]), ["fox", "crow"])
+            finally:
+                os.chdir(cwd)
+
+    def test_changed_file_is_reloaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stop.txt")
+            with open(path, "w") as f:
+                f.write("fox\n")
+            self.assertEqual(StopwordFilter.from_file(path).filter(["Fox", "crow"]), ["crow"])
+            with open(path, "w") as f:
+                f.write("crow\n")
+            os.utime(path, (0, 0))
+            self.assertEqual(StopwordFilter.from_file(path).filter(["Fox", "crow"]), ["fox"])
+
+    def test_filter_collection(self):
+        d1 = Document(0, "Doc1", "", ["The", "QUICK", "brown", "fox", "IN"], "Author", "Origin")
+        d2 = Document(1, "Doc2", "", ["over", "the", "lazy", "dog"], "Author", "Origin")
+        stopword_filter = StopwordFilter(["the", "IN", "over"])
+        stopword_filter.filter_collection([d1, d2])
+        self.assertEqual(d1.filtered_terms(), ["quick", "brown", "fox"])
+        self.assertEqual(d2.filtered_terms(), ["lazy", "dog"])
+        self.assertEqual(d1.terms, ["The", "QUICK", "brown", "fox", "IN"])
+        self.assertIn("The", stopword_filter)
+
+
+class TestCollectionStats(unittest.TestCase):
+    def make_collection(self):
+        return [
+            Document(0, "Doc1", "", ["the", "fox", "and", "the", "crow"], "Author", "Origin"),
+            Document(1, "Doc2", "", ["the", "wolf", "and", "the", "lamb"], "Author", "Origin"),
+            Document(2, "Doc3", "", ["the", "fox", "and", "the", "grapes"], "Author", "Origin"),
+            Document(3, "Doc4", "", ["the", "lion", "and", "the", "mouse"], "Author", "Origin"),
+        ]
+
+    def test_statistics(self):
+        stats = CollectionStats(self.make_collection())
+        self.assertEqual(stats.doc_freqs["the"], 4)
+        self.assertEqual(stats.doc_freqs["fox"], 2)
+        self.assertEqual(stats.sorted_freqs, [1, 1, 1, 1, 1, 1, 2, 4, 4])
+        self.assertEqual(stats.stopwords(0.1, 0.9), frozenset(["the", "and", "crow", "wolf", "lamb", "grapes", "lion", "mouse"]))
+
+    def test_reused_until_collection_changes(self):
+        collection = self.make_collection()
+        stats = CollectionStats.for_collection(collection)
+        self.assertIs(CollectionStats.for_collection(collection, stats), stats)
+        self.assertIsNot(CollectionStats.for_collection(list(collection), stats), stats)
+        self.assertEqual(remove_stop_words_by_frequency(collection[0].terms, collection, 0.1, 0.9, stats), ["fox"])
+
+        collection.append(Document(4, "Doc5", "", ["crow"], "Author", "Origin"))
+        self.assertTrue(stats.is_stale())
+        updated = CollectionStats.for_collection(collection, stats)
+        self.assertIsNot(updated, stats)
+        self.assertEqual(updated.doc_freqs["crow"], 2)
+
+        # Replacing a document by another one of the same size is noticed, new unrelated documents are not
+        updated_again = CollectionStats.for_collection(collection, updated)
+        collection[1] = Document(1, "Doc2", "", ["the", "fox", "and", "the", "lamb"], "Author", "Origin")
+        self.assertTrue(updated_again.is_stale())
+        stats = CollectionStats.for_collection(collection, updated_again)
+        Document(5, "Doc6", "", ["fox"], "Author", "Origin")
+        self.assertFalse(stats.is_stale())
+
+    def test_new_terms_and_filtering(self):
+        collection = self.make_collection()
+        stats = CollectionStats.for_collection(collection)
+        # Filtering the documents one by one reuses the statistics
+        for doc in collection:
+            remove_stopwords_by_frequency(doc, collection, 0.9, 0.1)
+        self.assertFalse(stats.is_stale())
+
+        collection[1].terms = ["the", "fox", "and", "the", "lamb"]
+        self.assertTrue(stats.is_stale())
+        self.assertEqual(CollectionStats.for_collection(collection, stats).doc_freqs["fox"], 3)
+
+    def test_filter_collection(self):
+        collection = self.make_collection()
+        CollectionStats(collection).filter_collection(0.1, 0.9)
+        self.assertEqual([doc.filtered_terms() for doc in collection], [["fox"], [], ["fox"], []])
+
+
+if __name__ == "__main__":
+    unittest.main()
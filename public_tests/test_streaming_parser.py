@@ -0,0 +1,104 @@
+import unittest
+import os
+import re
+import tempfile
+import my_module
+from my_module import gutenbergParser, iter_collection_from_url
+
+AESOP_PATTERN = re.compile(r'([^\n]+)\n\n(.*?)(?=\n{5}(?=[^\n]+\n\n)|$)', re.DOTALL)
+GRIMM_PATTERN = re.compile(r"([A-Z0-9 ,.'!?-]+)\n{3}(.*?)(?=\n{5}|$)", re.DOTALL)
+
+AESOP = ("Title page\r\n\r\nThe Wolf and the Lamb\r\n\r\nOnce upon a time a Wolf was lapping.\r\n"
+         "\r\n\r\n\r\n\r\nThe Dog and the Shadow\r\n\r\nIt happened that a Dog had got a piece of meat.\r\n"
+         "\r\n\r\n\r\n\r\nThe Lion’s Share\r\n\r\nThe Lion went once a-hunting.\r\n\r\nTrailer\r\n")
+GRIMM = ("THE GOLDEN BIRD\n\n\nA certain king had a beautiful garden.\n\n\n\n\n"
+         "HANS IN LUCK\n\n\nSome men are born to good luck.\n\n\n\n\n"
+         "SNOW-WHITE AND ROSE-RED\n\n\nThere was once a poor widow.\n")
+
+
+def as_tuples(docs):
+    return [(doc.document_id, doc.title, doc.raw_text, doc.terms) for doc in docs]
+
+
+class CountingPattern:
+    """A pattern that counts the characters it is asked to scan."""
+    def __init__(self, pattern):
+        self.pattern = pattern.pattern
+        self.groups = pattern.groups
+        self._pattern = pattern
+        self.scanned = 0
+
+    def finditer(self, string):
+        self.scanned += len(string)
+        return self._pattern.finditer(string)
+
+
+class TestStreamingParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.chunk_size = my_module.STREAM_CHUNK_SIZE
+        self.lookahead = my_module.STREAM_LOOKAHEAD
+
+    def tearDown(self):
+        my_module.STREAM_CHUNK_SIZE = self.chunk_size
+        my_module.STREAM_LOOKAHEAD = self.lookahead
+        self.tmp.cleanup()
+
+    def url(self, text):
+        path = os.path.join(self.tmp.name, 'book.txt')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        return 'file://' + path
+
+    def assertSameDocuments(self, text, start_line, end_line, pattern):
+        url = self.url(text)
+        expected = gutenbergParser(url, "A", "O", start_line, end_line, pattern).get_documents()
+        self.assertGreater(len(expected), 0)
+        for lookahead in (64, self.lookahead):
+            my_module.STREAM_LOOKAHEAD = lookahead
+            for chunk_size in (1, 5, 64, 65536):
+                my_module.STREAM_CHUNK_SIZE = chunk_size
+                parser = gutenbergParser(url, "A", "O", start_line, end_line, pattern, stream=True)
+                self.assertIsNone(parser.full_text)
+                self.assertEqual(as_tuples(parser.iter_documents()), as_tuples(expected))
+
+    def test_aesop_pattern(self):
+        self.assertSameDocuments(AESOP, 2, 20, AESOP_PATTERN)
+        self.assertSameDocuments(AESOP, 2, None, AESOP_PATTERN)
+
+    def test_grimm_pattern(self):
+        self.assertSameDocuments(GRIMM, 0, None, GRIMM_PATTERN)
+        self.assertSameDocuments(GRIMM, 0, 9, GRIMM_PATTERN)
+
+    def test_long_text(self):
+        self.assertSameDocuments(AESOP * 20, 2, None, AESOP_PATTERN)
+        self.assertSameDocuments(GRIMM * 20, 0, None, GRIMM_PATTERN)
+
+    def test_text_is_scanned_a_bounded_number_of_times(self):
+        text = GRIMM.replace("A certain king had a beautiful garden.", "The king walked. " * 2000) * 3
+        my_module.STREAM_CHUNK_SIZE = 64
+        my_module.STREAM_LOOKAHEAD = 64
+        url = self.url(text)
+        pattern = CountingPattern(GRIMM_PATTERN)
+        docs = gutenbergParser(url, "A", "O", 0, None, pattern, stream=True).iter_documents()
+        self.assertEqual(as_tuples(docs), as_tuples(gutenbergParser(url, "A", "O", 0, None, GRIMM_PATTERN).get_documents()))
+        self.assertLess(pattern.scanned, 4 * len(text))
+
+    def test_unsupported_patterns_fail(self):
+        for pattern in (re.compile(r"([A-Z ]+)\n{3}(.*?)\n{5}", re.DOTALL), re.compile(r"(.*?)(?=\n{5}|$)", re.DOTALL)):
+            parser = gutenbergParser(self.url(GRIMM), "A", "O", 0, None, pattern, stream=True)
+            with self.assertRaises(ValueError):
+                next(parser.iter_documents())
+
+    def test_iter_collection_from_url(self):
+        docs = iter_collection_from_url(self.url(GRIMM), "A", "O", 0, None, GRIMM_PATTERN)
+        self.assertEqual(next(docs).title, "THE GOLDEN BIRD")
+        self.assertEqual([doc.document_id for doc in docs], [1, 2])
+
+    def test_get_documents_in_streaming_mode(self):
+        docs = gutenbergParser(self.url(GRIMM), "A", "O", 0, None, GRIMM_PATTERN, stream=True).get_documents()
+        self.assertEqual([doc.title for doc in docs], ["THE GOLDEN BIRD", "HANS IN LUCK", "SNOW-WHITE AND ROSE-RED"])
+
+
+if __name__ == "__main__":
+    unittest.main()
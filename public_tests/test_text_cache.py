@@ -0,0 +1,120 @@
+import unittest
+import os
+import re
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.error import HTTPError, URLError
+from my_module import TextCache, load_collection_from_url
+
+BOOK = "Header\n\nTHE FIRST TALE\n\n\nOnce upon a time.\n\n\n\n\nTHE SECOND TALE\n\n\nThe end.\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+    # Status to fail every request with, None to serve the book
+    error = None
+
+    def do_GET(self):
+        _Handler.requests.append(self.headers.get('If-None-Match'))
+        if _Handler.error is not None:
+            self.send_response(_Handler.error)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = BOOK.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'cache')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_offline_fixture(self):
+        url = "https://www.gutenberg.org/files/0/0-0.txt"
+        TextCache(self.directory).put(url, BOOK.encode('utf-8'))
+
+        cache = TextCache(self.directory, offline=True)
+        self.assertEqual(cache.fetch(url), BOOK.encode('utf-8'))
+        with self.assertRaises(URLError):
+            cache.fetch("https://www.gutenberg.org/files/1/1-0.txt")
+
+        docs = load_collection_from_url(url, "Author", "Origin", 0, None,
+                                        re.compile(r"([A-Z ]+)\n{3}(.*?)(?=\n{5}|$)", re.DOTALL), cache=cache)
+        self.assertEqual([doc.title for doc in docs], ["THE FIRST TALE", "THE SECOND TALE"])
+
+    def test_fresh_entries_skip_the_network(self):
+        path = os.path.join(self.tmp.name, 'book.txt')
+        with open(path, 'w') as f:
+            f.write("first version")
+        url = 'file://' + path
+
+        cache = TextCache(self.directory)
+        self.assertEqual(cache.fetch(url), b"first version")
+        with open(path, 'w') as f:
+            f.write("second version")
+        self.assertEqual(cache.fetch(url), b"first version")
+        self.assertEqual(TextCache(self.directory, max_age=0).fetch(url), b"second version")
+
+    def serve(self):
+        _Handler.requests = []
+        _Handler.error = None
+        server = HTTPServer(('127.0.0.1', 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}/book.txt"
+
+    def test_etag_revalidation(self):
+        url = self.serve()
+        cache = TextCache(self.directory, max_age=0)
+        self.assertEqual(cache.fetch(url), BOOK.encode('utf-8'))
+        self.assertEqual(cache.fetch(url), BOOK.encode('utf-8'))
+        self.assertEqual(_Handler.requests, [None, '"v1"'])
+
+    def test_server_errors(self):
+        url = self.serve()
+        cache = TextCache(self.directory, max_age=0)
+        _Handler.error = 503
+        with self.assertRaises(HTTPError):
+            cache.fetch(url)
+        self.assertFalse(os.path.exists(self.directory))
+
+        # A failing server serves the stale copy, a missing text does not
+        _Handler.error = None
+        cache.fetch(url)
+        _Handler.error = 503
+        self.assertEqual(cache.fetch(url), BOOK.encode('utf-8'))
+        _Handler.error = 404
+        with self.assertRaises(HTTPError):
+            cache.fetch(url)
+
+    def test_eviction(self):
+        cache = TextCache(self.directory, max_bytes=25)
+        cache.put("http://a", b"a" * 10)
+        cache.put("http://b", b"b" * 10)
+        cache.get("http://a")
+        os.utime(cache._paths("http://b")[0], (0, 0))
+        cache.put("http://c", b"c" * 10)
+        self.assertIsNone(cache.get("http://b"))
+        self.assertEqual(cache.get("http://a"), b"a" * 10)
+        self.assertLessEqual(cache.size(), 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from document import Document
+from my_module import Tokenizer, DEFAULT_TOKENIZER, InvertedIndex, PUNCT
+
+
+def replace_tokenize(content):
+    # The original tokenizer: one replace per punctuation symbol, then split and lower every word
+    for punct in PUNCT:
+        content = content.replace(punct, ' ')
+    return [word.lower() for word in content.split() if word]
+
+
+class TestTokenizer(unittest.TestCase):
+    TEXTS = [
+        "The Wolf and the Lamb.",
+        "“Once upon a time,” said he; (the fox!) ran away? Yes: 'no'.",
+        "A WOLF, who had been bitten by Dogs [and] {was} lying\n\nill in his lair",
+        "The Lion’s Share\r\nΟΔΟΣ.ΑΒ  İstanbul\tend",
+        "",
+    ]
+
+    def test_matches_replace_tokenizer(self):
+        for text in self.TEXTS:
+            self.assertEqual(DEFAULT_TOKENIZER.tokenize(text), replace_tokenize(text))
+
+    def test_unicode_normalization(self):
+        self.assertEqual(Tokenizer().tokenize("ﬁne Café"), ["ﬁne", "café"])
+        self.assertEqual(Tokenizer(normalization='NFKC').tokenize("ﬁne Café"), ["fine", "café"])
+
+    def test_custom_punctuation(self):
+        self.assertEqual(Tokenizer(punctuation="-").tokenize("snow-white, rose-red"), ["snow", "white,", "rose", "red"])
+
+    def test_queries_use_the_tokenizer(self):
+        d1 = Document(0, "Doc1", "the fox", ["the", "fox"], "Author", "Origin")
+        d2 = Document(1, "Doc2", "the dog", ["the", "dog"], "Author", "Origin")
+        result = InvertedIndex([d1, d2]).search("Fox, please!")
+        self.assertEqual(result[0][1], d1)
+        self.assertGreater(result[0][0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import my_module
+from document import Document
+from my_module import InvertedIndex, vector_space_search
+
+
+def make_collection():
+    return [
+        Document(0, "Doc1", "", ["the", "quick", "brown", "fox"], "Author", "Origin"),
+        Document(1, "Doc2", "", ["jumps", "over", "the", "lazy", "dog"], "Author", "Origin"),
+        Document(2, "Doc3", "", ["the", "fox", "and", "the", "dog", "fox"], "Author", "Origin"),
+        Document(3, "Doc4", "", ["a", "lazy", "afternoon"], "Author", "Origin"),
+    ]
+
+
+@unittest.skipIf(my_module.np is None, "NumPy/SciPy not installed")
+class TestVectorizedSearch(unittest.TestCase):
+    def assertSameRanking(self, result, expected):
+        self.assertEqual([doc for _, doc in result], [doc for _, doc in expected])
+        for (score, _), (expected_score, _) in zip(result, expected):
+            self.assertAlmostEqual(score, expected_score, places=12)
+
+    def test_matches_pure_python_scores(self):
+        collection = make_collection()
+        index = InvertedIndex(collection, vectorized=True)
+        self.assertTrue(index.vectorized)
+        for query in ["fox dog", "lazy fox fox", "the", "unknown", ""]:
+            for top_k in (None, 1, 3):
+                self.assertSameRanking(index.search(query, top_k=top_k),
+                                       vector_space_search(query, collection, top_k=top_k))
+            self.assertSameRanking(index.search(query, hits_only=True), vector_space_search(query, collection, hits_only=True))
+
+    def test_batch_scores(self):
+        index = InvertedIndex(make_collection(), vectorized=True)
+        queries = [index._query_weights(query) for query in ["fox", "lazy dog"]]
+        scores = index.matrix().scores(queries)
+        self.assertEqual(scores.shape, (4, 2))
+        self.assertAlmostEqual(scores[2, 0], index.search("fox")[0][0], places=12)
+        self.assertEqual(scores[3, 0], 0.0)
+
+    def test_search_many(self):
+        index = InvertedIndex(make_collection(), vectorized=True)
+        queries = ["fox dog", "lazy", "unknown", "fox dog", "the fox"]
+        for result, query in zip(index.search_many(queries, top_k=2, chunk_size=2), queries):
+            self.assertEqual(result, index.search(query, top_k=2))
+
+    def test_matrix_follows_updates(self):
+        collection = make_collection()
+        index = InvertedIndex(collection[:3], vectorized=True)
+        matrix = index.matrix()
+        index.add_documents(collection[3:])
+        self.assertIsNot(index.matrix(), matrix)
+        self.assertSameRanking(index.search("lazy"), vector_space_search("lazy", collection))
+
+
+class TestVectorizedFallback(unittest.TestCase):
+    def test_without_numpy(self):
+        np = my_module.np
+        my_module.np = None
+        try:
+            index = InvertedIndex(make_collection(), vectorized=True)
+            self.assertFalse(index.vectorized)
+            self.assertEqual(index.search("fox"), vector_space_search("fox", index.documents))
+        finally:
+            my_module.np = np
+
+
+if __name__ == "__main__":
+    unittest.main()
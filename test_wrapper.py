@@ -11,6 +11,10 @@
 from document import Document
 from re import Pattern
 
+# Statistics and index of the collection the functions below were last called with, reused while they are up to date
+_collection_stats = None
+_index = None
+
 
 def remove_stopwords_by_list(doc: Document, stopwords: set[str]):
     """
@@ -29,7 +33,7 @@ def remove_stopwords_by_list(doc: Document, stopwords: set[str]):
 
     # The following code is an example. You may replace it how you see fit:
     from my_module import remove_stop_words
-    doc._filtered_terms = remove_stop_words(doc.terms, stopwords)
+    doc.set_filtered_terms(remove_stop_words(doc.terms, stopwords))
 
 
 def remove_stopwords_by_frequency(doc, collection: list[Document], common_frequency: float, rare_frequency: float):
@@ -53,8 +57,10 @@ def remove_stopwords_by_frequency(doc, collection: list[Document], common_freque
     # from my_module import remove_stopwords
     # remove_stopwords_by_frequency(doc, collection, common_frequency, rare_frequency)
 
-    from my_module import remove_stop_words_by_frequency
-    doc._filtered_terms = remove_stop_words_by_frequency(doc.terms, collection, low_freq=rare_frequency, high_freq=common_frequency)
+    global _collection_stats
+    from my_module import CollectionStats
+    _collection_stats = CollectionStats.for_collection(collection, _collection_stats)
+    doc.set_filtered_terms(_collection_stats.filter(doc.terms, low_freq=rare_frequency, high_freq=common_frequency))
 
 
 def load_documents_from_url(url: str, author: str, origin: str, start_line: int, end_line: int,
@@ -101,8 +107,10 @@ def linear_boolean_search(term, collection, stopword_filtered=False, stemmed=Fal
     """
 
     # The following code is an example. You may replace it how you see fit:
-    from my_module import linear_boolean_search
-    return linear_boolean_search(term, collection, stopword_filtered, stemmed)
+    global _index
+    from my_module import InvertedIndex, linear_boolean_search
+    _index = InvertedIndex.for_collection(collection, _index)
+    return linear_boolean_search(term, collection, stopword_filtered, stemmed, index=_index)
 
 
 def vector_space_search(query, collection, stopword_filtered=False, stemmed=False):
@@ -114,8 +122,10 @@ def vector_space_search(query, collection, stopword_filtered=False, stemmed=Fals
         stopword_filtered (bool, optional): _description_. Defaults to False.
         stemmed (bool, optional): _description_. Defaults to False.
     """
-    from my_module import vector_space_search
-    return vector_space_search(query, collection, stopword_filtered, stemmed)
+    global _index
+    from my_module import InvertedIndex, vector_space_search
+    _index = InvertedIndex.for_collection(collection, _index)
+    return vector_space_search(query, collection, stopword_filtered, stemmed, index=_index)
 
 
 def precision_recall(retrieved, relevant):